@@ -6,8 +6,32 @@ import json
 from typing import Any, Dict
 import pyglet
 
+from amonite.tracer import TRACER
 from amonite.utils import utils
 
+# Size (in pixels) of each animation atlas texture.
+ANIMATION_ATLAS_SIZE: int = 2048
+
+# Shared texture bin holding the frames of all loaded animations, so that frame changes only need new texture coordinates
+# and all animated sprites can share the same group (and draw call).
+# Only created on first use (see [get_animation_atlas]), since creating it requires a GL context.
+ANIMATION_ATLAS: pyglet.image.atlas.TextureBin | None = None
+
+def get_animation_atlas() -> pyglet.image.atlas.TextureBin:
+    """
+    Returns the shared animation atlas, creating it if not done yet.
+    """
+
+    global ANIMATION_ATLAS
+
+    if ANIMATION_ATLAS is None:
+        ANIMATION_ATLAS = pyglet.image.atlas.TextureBin(
+            texture_width = ANIMATION_ATLAS_SIZE,
+            texture_height = ANIMATION_ATLAS_SIZE
+        )
+
+    return ANIMATION_ATLAS
+
 class Animation:
     """
     Generic animation.
@@ -24,6 +48,7 @@ class Animation:
     center_y[bool](optional): whether the animation should be centered on the y axis. If present, this overrides the "anchor_y" parameter.
     duration[float](optional): the duration of each animation frame.
     loop[bool](optional): whether the animation should loop or not.
+    atlas[bool](optional): whether the animation frames should be packed into the shared animation atlas or not, defaults to true.
     """
 
     __slots__ = (
@@ -36,14 +61,13 @@ class Animation:
     def __init__(
         self,
         source: str,
+        source_data: Dict[str, Any] | None = None
     ) -> None:
         # Store the source path.
         self.source: str = source
 
-        # Read source file.
-        self.source_data: Dict[str, Any] = {}
-        with open(file = f"{pyglet.resource.path[0]}/{source}", mode = "r", encoding = "UTF-8") as content:
-            self.source_data = json.load(content)
+        # Read source file if not already provided.
+        self.source_data: Dict[str, Any] = source_data if source_data is not None else Animation.read_definition(source = source)
 
         # Make sure all mandatory fields are present in the definition file.
         assert "path" in self.source_data.keys() and "name" in self.source_data.keys()
@@ -62,6 +86,10 @@ class Animation:
             image_grid = pyglet.image.ImageGrid(image_sheet, rows = self.source_data["rows"], columns = self.source_data["columns"])
             self.content = pyglet.image.Animation.from_image_sequence(image_grid, duration = 0.1)
 
+        # Pack all frames into the shared atlas, before anchors are set since packing drops them.
+        if self.source_data.get("atlas", True):
+            Animation.pack(self.content)
+
         # Set animation anchor if defined.
         if "anchor_x" in self.source_data.keys():
             utils.set_animation_anchor_x(
@@ -89,4 +117,33 @@ class Animation:
 
         # Set not looping if so specified.
         if "loop" in self.source_data.keys() and self.source_data["loop"] is False:
-            self.content.frames[-1].duration = None
\ No newline at end of file
+            self.content.frames[-1].duration = None
+
+    @staticmethod
+    def pack(animation: pyglet.image.animation.Animation) -> None:
+        """
+        Moves all frames of [animation] into the shared animation atlas.
+        Frames are left untouched if they don't fit in an atlas texture.
+        """
+
+        with TRACER.span("Animation.pack", "loader"):
+            # Check all frames beforehand, so that an animation never ends up split between the atlas and its own textures.
+            if any(frame.image.width + 2 > ANIMATION_ATLAS_SIZE or frame.image.height + 2 > ANIMATION_ATLAS_SIZE for frame in animation.frames):
+                return
+
+            atlas: pyglet.image.atlas.TextureBin = get_animation_atlas()
+            for frame in animation.frames:
+                # Frames may already live on the GPU, so read their pixels back before packing them.
+                # Leave a 1 pixel border around each frame to avoid bleeding between neighbors.
+                frame.image = atlas.add(frame.image.get_image_data(), border = 1)
+
+    @staticmethod
+    def read_definition(source: str) -> Dict[str, Any]:
+        """
+        Reads and returns the content of the definition file provided in [source].
+        No graphics resource is created, so this is safe to call off the main thread.
+        """
+
+        with TRACER.span("Animation.read_definition", "loader"):
+            with open(file = f"{pyglet.resource.path[0]}/{source}", mode = "r", encoding = "UTF-8") as content:
+                return json.load(content)
\ No newline at end of file
@@ -1,4 +1,5 @@
 from amonite.collision.collision_node import CollisionMethod, CollisionType, CollisionNode
+from amonite.tracer import TRACER
 from amonite.utils.utils import CollisionHit
 
 VELOCITY_TOLERANCE: float = 1e-5
@@ -19,6 +20,16 @@ class CollisionController:
         else:
             self.__colliders[collider.type] = [collider]
 
+    def contains(
+        self,
+        collider: CollisionNode
+    ) -> bool:
+        """
+        Tells whether [collider] is currently registered or not.
+        """
+
+        return collider.type in self.__colliders and collider in self.__colliders[collider.type]
+
     def __scale_velocity(self, dt: float) -> None:
         if CollisionType.DYNAMIC in self.__colliders:
             for collider in self.__colliders[CollisionType.DYNAMIC]:
@@ -110,8 +121,9 @@ class CollisionController:
                 self.__handle_actor_collisions(actor = actor)
 
     def update(self, dt: float) -> None:
-        self.__scale_velocity(dt = dt)
-        self.__handle_collisions()
+        with TRACER.span("CollisionController.update"):
+            self.__scale_velocity(dt = dt)
+            self.__handle_collisions()
 
     def clear(self) -> None:
         self.__colliders[CollisionType.STATIC].clear()
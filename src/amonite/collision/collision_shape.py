@@ -1,14 +1,12 @@
 import pyglet
 import pyglet.math as pm
 
+from amonite.debug_draw import DEBUG_DRAW, DebugDrawLayer
 from amonite.node import PositionNode
-from amonite.shapes.circle_node import CircleNode
-from amonite.shapes.rect_node import RectNode
-from amonite.shapes.shape_node import ShapeNode
 import amonite.utils.utils as utils
 from amonite.settings import SETTINGS, Keys
 
-COLLIDING_COLOR = (0x7FF, 0x7F, 0x7F, 0x7F)
+COLLIDING_COLOR = (0xFF, 0x7F, 0x7F, 0x7F)
 FREE_COLOR = (0x7F, 0xFF, 0xFF, 0x7F)
 
 class CollisionShape(PositionNode):
@@ -26,7 +24,9 @@ class CollisionShape(PositionNode):
         self.velocity_y = 0.0
         self.color: tuple[int, int, int, int] = color
 
-        self.render_shape: ShapeNode | None = None
+        # Debug geometry is drawn by the shared debug draw layer, which can be toggled at runtime.
+        if SETTINGS[Keys.DEBUG]:
+            DEBUG_DRAW.add_source(self.draw_debug, Keys.SHOW_COLLISIONS)
 
     # def set_position(
     #     self,
@@ -67,6 +67,11 @@ class CollisionShape(PositionNode):
     def set_color(self, color: tuple[int, int, int, int]) -> None:
         self.color = color
 
+    def draw_debug(self, layer: DebugDrawLayer) -> None:
+        """
+        Submits the shape's debug geometry to [layer].
+        """
+
     def swept_collide(self, other) -> utils.CollisionHit | None:
         return None
 
@@ -77,8 +82,7 @@ class CollisionShape(PositionNode):
         return (0.0, 0.0)
 
     def delete(self) -> None:
-        if self.render_shape is not None:
-            self.render_shape.delete()
+        DEBUG_DRAW.remove_source(self.draw_debug)
 
 class CollisionRect(CollisionShape):
     def __init__(
@@ -100,20 +104,6 @@ class CollisionRect(CollisionShape):
         self.anchor_x: int = anchor_x
         self.anchor_y: int = anchor_y
 
-        if SETTINGS[Keys.DEBUG] and SETTINGS[Keys.SHOW_COLLISIONS]:
-            self.render_shape = RectNode(
-                x = 0.0,
-                y = 0.0,
-                z = 0.0,
-                width = width,
-                height = height,
-                anchor_x = anchor_x,
-                anchor_y = anchor_y,
-                color = self.color,
-                batch = batch
-            )
-            self.add_component(self.render_shape)
-
     def get_collision_bounds(self):
         return (
             self.x - self.anchor_x,
@@ -122,6 +112,9 @@ class CollisionRect(CollisionShape):
             self.height
         )
 
+    def draw_debug(self, layer: DebugDrawLayer) -> None:
+        layer.rect(*self.get_collision_bounds(), color = self.color)
+
     def swept_collide(self, other) -> utils.CollisionHit | None:
         return utils.sweep_rect_rect(
             collider = utils.Rect(
@@ -157,13 +150,6 @@ class CollisionRect(CollisionShape):
             # Other.
             return (0, 0)
 
-    def set_color(self, color: tuple[int, int, int, int]) -> None:
-        super().set_color(color = color)
-
-        # Set render shape color.
-        if self.render_shape is not None:
-            self.render_shape.set_color(color = color[:-1])
-
 class CollisionCircle(CollisionShape):
     def __init__(
         self,
@@ -179,15 +165,8 @@ class CollisionCircle(CollisionShape):
         self.width = radius * 2
         self.height = radius * 2
 
-
-        if SETTINGS[Keys.DEBUG] and SETTINGS[Keys.SHOW_COLLISIONS]:
-            self.render_shape = CircleNode(
-                x = x,
-                y = y,
-                radius = radius,
-                color = (0x7F, 0xFF, 0xFF, 0x7F),
-                batch = batch
-            )
+    def draw_debug(self, layer: DebugDrawLayer) -> None:
+        layer.circle(self.x, self.y, self.radius, color = self.color)
 
     def overlap(self, other) -> bool:
         if isinstance(other, CollisionRect):
@@ -0,0 +1,312 @@
+"""
+This file contains the debug draw layer, used to render all debug geometry (collisions, grids...) in a single pass.
+"""
+
+import math
+from typing import Callable
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+from amonite.debug_stats import set_stat
+from amonite.settings import GLOBALS, SETTINGS, Keys
+from amonite.utils.vertex_utils import write_attribute
+
+# Minimum amount of vertices allocated for each primitive type.
+MIN_CAPACITY: int = 256
+
+# Amount of segments used to approximate circles.
+CIRCLE_SEGMENTS: int = 16
+
+class DebugDrawLayer:
+    """
+    Single debug draw layer for all debug geometry.
+
+    Rects, lines and circles are accumulated every frame, either directly or by registered sources,
+    then uploaded in bulk to two shared dynamic vertex lists (triangles and lines) and drawn with a single call each.
+    Sources bound to a setting (e.g. [Keys.SHOW_COLLISIONS]) are skipped altogether while the setting is off,
+    so that debug geometry can be toggled at runtime without recreating its owners.
+
+    All coordinates are in world units, scaling is applied by the layer.
+
+    Attributes
+    ----------
+    enabled: bool
+        Whether the layer should be built and drawn or not.
+    """
+
+    __slots__ = (
+        "enabled",
+        "__sources",
+        "__rects",
+        "__lines",
+        "__circles",
+        "__bulk_lines",
+        "__program",
+        "__batch",
+        "__triangles_list",
+        "__lines_list",
+        "__circle_offsets"
+    )
+
+    def __init__(self) -> None:
+        self.enabled: bool = True
+
+        # Registered sources, called every frame, by the setting that toggles them (if any).
+        self.__sources: dict[Callable[[DebugDrawLayer], None], Keys | None] = {}
+
+        # Primitives submitted in the current frame, as (x, y, width, height, r, g, b, a),
+        # (x, y, x2, y2, r, g, b, a) and (x, y, radius, r, g, b, a) tuples respectively.
+        self.__rects: list[tuple[float, ...]] = []
+        self.__lines: list[tuple[float, ...]] = []
+        self.__circles: list[tuple[float, ...]] = []
+
+        # Lines submitted in bulk in the current frame, as (n, 8) arrays.
+        self.__bulk_lines: list[np.ndarray] = []
+
+        # Graphics resources are only created on first draw, since a GL context is needed.
+        self.__program: pyglet.graphics.shader.ShaderProgram | None = None
+        self.__batch: pyglet.graphics.Batch | None = None
+        self.__triangles_list = None
+        self.__lines_list = None
+
+        # Unit circle triangles (center, current point, next point), as (x, y) offsets.
+        angles: np.ndarray = np.linspace(0.0, 2.0 * math.pi, CIRCLE_SEGMENTS + 1, dtype = np.float32)
+        points: np.ndarray = np.stack((np.cos(angles), np.sin(angles)), axis = 1)
+        self.__circle_offsets: np.ndarray = np.stack(
+            (np.zeros((CIRCLE_SEGMENTS, 2), dtype = np.float32), points[:-1], points[1:]),
+            axis = 1
+        ).reshape((-1, 2))
+
+    def add_source(
+        self,
+        source: Callable,
+        setting: Keys | None = None
+    ) -> None:
+        """
+        Registers [source], which is called with the layer every frame in order to submit its primitives.
+        If [setting] is provided, then [source] is only called while the setting is on.
+        """
+
+        self.__sources[source] = setting
+
+    def remove_source(self, source: Callable) -> None:
+        self.__sources.pop(source, None)
+
+    def rect(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float,
+        color: tuple[int, ...]
+    ) -> None:
+        """
+        Submits a filled rect for the current frame.
+        """
+
+        self.__rects.append((x, y, width, height, *color[:3], color[3] if len(color) > 3 else 0xFF))
+
+    def line(
+        self,
+        x: float,
+        y: float,
+        x2: float,
+        y2: float,
+        color: tuple[int, ...]
+    ) -> None:
+        """
+        Submits a line from ([x], [y]) to ([x2], [y2]) for the current frame.
+        """
+
+        self.__lines.append((x, y, x2, y2, *color[:3], color[3] if len(color) > 3 else 0xFF))
+
+    def lines(self, lines: np.ndarray) -> None:
+        """
+        Submits multiple lines at once for the current frame, as an (n, 8) array of (x, y, x2, y2, r, g, b, a) rows.
+        """
+
+        self.__bulk_lines.append(lines)
+
+    def circle(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        color: tuple[int, ...]
+    ) -> None:
+        """
+        Submits a filled circle for the current frame.
+        """
+
+        self.__circles.append((x, y, radius, *color[:3], color[3] if len(color) > 3 else 0xFF))
+
+    def draw(self) -> None:
+        """
+        Collects all primitives from registered sources, uploads them and draws them.
+        Should be called while the camera is active.
+        """
+
+        if not self.enabled:
+            self.clear()
+            return
+
+        for source, setting in list(self.__sources.items()):
+            if setting is None or SETTINGS[setting]:
+                source(self)
+
+        triangles: tuple[np.ndarray, np.ndarray] = self.__build_triangles()
+        lines: tuple[np.ndarray, np.ndarray] = self.__build_lines()
+        self.clear()
+
+        triangles_count: int = len(triangles[0])
+        lines_count: int = len(lines[0])
+        set_stat("debug draw", f"{triangles_count // 3} tris, {lines_count // 2} lines")
+
+        if triangles_count == 0 and lines_count == 0:
+            return
+
+        if self.__program is None:
+            self.__program = pyglet.shapes.get_default_shader()
+            self.__batch = pyglet.graphics.Batch()
+
+        self.__triangles_list = self.__upload(self.__triangles_list, gl.GL_TRIANGLES, *triangles)
+        self.__lines_list = self.__upload(self.__lines_list, gl.GL_LINES, *lines)
+
+        self.__program.bind()
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+
+        for (vertex_list, mode, count) in (
+            (self.__triangles_list, gl.GL_TRIANGLES, triangles_count),
+            (self.__lines_list, gl.GL_LINES, lines_count)
+        ):
+            if count == 0:
+                continue
+
+            # Only draw the part of the (oversized) vertex list that was actually written.
+            vertex_list.domain.vao.bind()
+            for buffer, _ in vertex_list.domain.buffer_attributes:
+                buffer.commit()
+            gl.glDrawArrays(mode, vertex_list.start, count)
+
+        gl.glDisable(gl.GL_BLEND)
+        self.__program.unbind()
+
+    def clear(self) -> None:
+        """
+        Drops all primitives submitted in the current frame.
+        """
+
+        self.__rects.clear()
+        self.__lines.clear()
+        self.__circles.clear()
+        self.__bulk_lines.clear()
+
+    def delete(self) -> None:
+        if self.__triangles_list is not None:
+            self.__triangles_list.delete()
+            self.__triangles_list = None
+
+        if self.__lines_list is not None:
+            self.__lines_list.delete()
+            self.__lines_list = None
+
+        self.__sources.clear()
+        self.clear()
+
+    def __build_triangles(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns positions (n, 2) and colors (n, 4) of all vertices needed to draw all submitted rects and circles.
+        """
+
+        positions: list[np.ndarray] = []
+        colors: list[np.ndarray] = []
+
+        if len(self.__rects) > 0:
+            rects: np.ndarray = np.array(self.__rects, dtype = np.float32)
+            (x, y, width, height) = (rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3])
+
+            # Two triangles per rect.
+            xs: np.ndarray = np.stack((x, x + width, x + width, x, x + width, x), axis = 1)
+            ys: np.ndarray = np.stack((y, y, y + height, y, y + height, y + height), axis = 1)
+            positions.append(np.stack((xs, ys), axis = 2).reshape((-1, 2)))
+            colors.append(np.repeat(rects[:, 4:8], 6, axis = 0))
+
+        if len(self.__circles) > 0:
+            circles: np.ndarray = np.array(self.__circles, dtype = np.float32)
+            positions.append(
+                (circles[:, None, 0:2] + circles[:, None, 2:3] * self.__circle_offsets[None, :, :]).reshape((-1, 2))
+            )
+            colors.append(np.repeat(circles[:, 3:7], len(self.__circle_offsets), axis = 0))
+
+        return self.__join(positions, colors)
+
+    def __build_lines(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns positions (n, 2) and colors (n, 4) of all vertices needed to draw all submitted lines.
+        """
+
+        lines: list[np.ndarray] = list(self.__bulk_lines)
+        if len(self.__lines) > 0:
+            lines.append(np.array(self.__lines, dtype = np.float32))
+
+        return self.__join(
+            [line[:, 0:4].reshape((-1, 2)) for line in lines],
+            [np.repeat(line[:, 4:8], 2, axis = 0) for line in lines]
+        )
+
+    @staticmethod
+    def __join(
+        positions: list[np.ndarray],
+        colors: list[np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if len(positions) == 0:
+            return (np.empty((0, 2), dtype = np.float32), np.empty((0, 4), dtype = np.uint8))
+
+        return (
+            np.ascontiguousarray(np.concatenate(positions) * float(GLOBALS[Keys.SCALING]), dtype = np.float32),
+            np.ascontiguousarray(np.concatenate(colors), dtype = np.uint8)
+        )
+
+    def __upload(
+        self,
+        vertex_list,
+        mode: int,
+        positions: np.ndarray,
+        colors: np.ndarray
+    ):
+        """
+        Writes [positions] and [colors] to [vertex_list], which is reallocated (with room to grow) if too small.
+        Returns the vertex list to use from now on.
+        """
+
+        count: int = len(positions)
+        if count == 0:
+            return vertex_list
+
+        if vertex_list is None or vertex_list.count < count:
+            if vertex_list is not None:
+                vertex_list.delete()
+
+            # Grow to the next power of two, so that reallocations stay rare.
+            capacity: int = max(MIN_CAPACITY, 1 << (count - 1).bit_length())
+
+            assert self.__program is not None
+            vertex_list = self.__program.vertex_list(
+                capacity,
+                mode,
+                batch = self.__batch,
+                position = ("f", (0.0,) * capacity * 2),
+                translation = ("f", (0.0,) * capacity * 2),
+                color = ("Bn", (0,) * capacity * 4),
+                zposition = ("f", (0.0,) * capacity),
+                rotation = ("f", (0.0,) * capacity)
+            )
+
+        write_attribute(vertex_list, "position", positions, count)
+        write_attribute(vertex_list, "color", colors, count)
+
+        return vertex_list
+
+DEBUG_DRAW: DebugDrawLayer = DebugDrawLayer()
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""
+This file contains a global registry for debug statistics.
+"""
+
+# All debug statistics by name.
+DEBUG_STATS: dict[str, str | int | float] = {}
+
+def set_stat(key: str, value: str | int | float) -> None:
+    """
+    Sets the debug statistic [key] to [value].
+    """
+
+    DEBUG_STATS[key] = value
+
+def clear_stat(key: str) -> None:
+    """
+    Removes the debug statistic [key] if present.
+    """
+
+    DEBUG_STATS.pop(key, None)
\ No newline at end of file
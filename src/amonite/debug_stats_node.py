@@ -0,0 +1,79 @@
+"""
+This file contains the node used to display debug statistics.
+"""
+
+import pyglet
+
+from amonite.debug_stats import DEBUG_STATS
+from amonite.node import PositionNode
+from amonite.settings import SETTINGS, Keys
+from amonite.text_node import TextNode
+
+class DebugStatsNode(PositionNode):
+    """
+    Displays all debug statistics as a text overlay.
+    Nothing is shown if debug is disabled in settings.
+    """
+
+    def __init__(
+        self,
+        x: float = 0.0,
+        y: float = 0.0,
+        z: float = 0.0,
+        width: float = 120.0,
+        font_size: int = 6,
+        update_period: float = 0.5,
+        batch: pyglet.graphics.Batch | None = None
+    ) -> None:
+        super().__init__(x, y, z)
+
+        self.__update_period: float = update_period
+        self.__elapsed: float = 0.0
+
+        self.__label: TextNode | None = None
+        if SETTINGS[Keys.DEBUG]:
+            self.__label = TextNode(
+                x = x,
+                y = y,
+                z = z,
+                text = "",
+                align = "left",
+                anchor_x = "left",
+                anchor_y = "top",
+                width = width,
+                color = (0xFF, 0xFF, 0xFF, 0xFF),
+                font_name = str(SETTINGS[Keys.FONT_NAME]),
+                font_size = font_size,
+                batch = batch
+            )
+
+    def update(self, dt: float) -> None:
+        super().update(dt = dt)
+
+        if self.__label is None:
+            return
+
+        # Only refresh text once in a while, since text layout is expensive.
+        self.__elapsed += dt
+        if self.__elapsed < self.__update_period:
+            return
+
+        self.__elapsed = 0.0
+        self.__label.set_text("\n".join(f"{key}: {value}" for key, value in DEBUG_STATS.items()))
+
+    def set_position(
+        self,
+        position: tuple[float, float],
+        z: float | None = None
+    ) -> None:
+        super().set_position(position, z)
+
+        if self.__label is not None:
+            self.__label.set_position(position, z)
+
+    def delete(self) -> None:
+        if self.__label is not None:
+            self.__label.delete()
+            self.__label = None
+
+        super().delete()
\ No newline at end of file
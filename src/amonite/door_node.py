@@ -18,11 +18,15 @@ class DoorNode(PositionNode):
         anchor_x: float = 0,
         anchor_y: float = 0,
         tags: list[str] = [],
+        destination: str | None = None,
         on_triggered: Callable[[list[str], bool], None] | None = None,
         batch: pyglet.graphics.Batch | None = None
     ) -> None:
         super().__init__(x, y)
 
+        # Name of the room the door leads to, if any.
+        self.destination: str | None = destination
+
         self.collider = CollisionNode(
             x = x,
             y = y,
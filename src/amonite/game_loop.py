@@ -0,0 +1,289 @@
+"""
+This file contains the game loop runner, used to drive a scene with precise frame pacing.
+"""
+
+from collections import deque
+import statistics
+import time
+from typing import Callable
+import pyglet
+
+from amonite.debug_stats import set_stat
+from amonite.profiler import PROFILER
+from amonite.settings import SETTINGS, Keys
+
+# Default time step (in s) for fixed updates.
+FIXED_DT: float = 1.0 / 60.0
+
+# Refresh rate (in Hz) assumed when the display doesn't report one.
+DEFAULT_REFRESH_RATE: float = 60.0
+
+# Bounds (in s) of the time spent spinning before each frame deadline, adapted to the measured sleep accuracy.
+MIN_SPIN_MARGIN: float = 0.0005
+MAX_SPIN_MARGIN: float = 0.004
+
+class GameLoop:
+    """
+    Paced game loop for a single window.
+
+    Every frame dispatches window events, runs scheduled pyglet clock functions, runs fixed updates (at [fixed_dt] steps),
+    updates and draws the current scene and flips the window, then waits for the next frame deadline.
+    Waiting is hybrid: the loop sleeps until shortly before the deadline, then spins for the rest,
+    where the spin margin adapts to how late sleeps actually wake up on the current machine.
+    Late frames are dropped rather than caught up, so that a hitch doesn't turn into a burst of frames.
+
+    When vsync is on and the target fps is not below the display refresh rate, flipping already paces frames and the loop doesn't wait.
+    While the window is hidden or inactive the loop drops to [idle_fps].
+    Scenes rendering on demand are only drawn (and the window flipped) when they need to, the last frame staying on screen otherwise.
+
+    Frame time and jitter (standard deviation of frame times) are published to debug stats.
+
+    Usage::
+
+        loop = GameLoop(window = window, scene = scene)
+        loop.run()
+
+    Attributes
+    ----------
+    window: pyglet.window.BaseWindow
+        The window to draw to.
+    scene: SceneNode | None
+        The scene to update and draw.
+    target_fps: float
+        Frames per second to aim for, 0 (the default) to match the display refresh rate.
+        The target fps setting is not used, since its high value only makes sense for unpaced loops.
+    idle_fps: float
+        Frames per second to aim for while the window is hidden or inactive, 0 to keep [target_fps].
+    fixed_dt: float
+        Time step (in s) of fixed updates.
+    max_fixed_steps: int
+        Maximum amount of fixed updates per frame, remaining time is dropped after a long hitch.
+    custom_draw: Callable[[], None] | None
+        Custom draw function, called in place of clearing the window and drawing the scene (e.g. to wrap it in an upscaler).
+    """
+
+    __slots__ = (
+        "window",
+        "scene",
+        "target_fps",
+        "idle_fps",
+        "fixed_dt",
+        "max_fixed_steps",
+        "custom_draw",
+        "__running",
+        "__idle",
+        "__accumulator",
+        "__spin_margin",
+        "__refresh_rate",
+        "__frame_times",
+        "__stats_elapsed",
+        "__weakref__"
+    )
+
+    def __init__(
+        self,
+        window: pyglet.window.BaseWindow,
+        scene = None,
+        target_fps: float = 0.0,
+        idle_fps: float = 10.0,
+        fixed_dt: float = FIXED_DT,
+        max_fixed_steps: int = 5,
+        custom_draw: Callable[[], None] | None = None,
+        samples: int = 240
+    ) -> None:
+        self.window: pyglet.window.BaseWindow = window
+        self.scene = scene
+        self.target_fps: float = target_fps
+        self.idle_fps: float = idle_fps
+        self.fixed_dt: float = fixed_dt
+        self.max_fixed_steps: int = max_fixed_steps
+        self.custom_draw: Callable[[], None] | None = custom_draw
+
+        self.__running: bool = False
+
+        # Tells whether the window is hidden or inactive.
+        self.__idle: bool = False
+
+        # Time (in s) yet to be consumed by fixed updates.
+        self.__accumulator: float = 0.0
+
+        # Time (in s) spent spinning before each frame deadline.
+        self.__spin_margin: float = MAX_SPIN_MARGIN
+
+        # Display refresh rate (in Hz), only queried again when the window may have changed screen or mode.
+        self.__refresh_rate: float = 0.0
+        self.__update_refresh_rate()
+
+        # Last frame times (in s), from one frame start to the next.
+        self.__frame_times: deque[float] = deque(maxlen = samples)
+        self.__stats_elapsed: float = 0.0
+
+        window.push_handlers(self)
+
+    def on_activate(self) -> None:
+        self.__idle = False
+
+    def on_deactivate(self) -> None:
+        self.__idle = True
+
+    def on_show(self) -> None:
+        self.__idle = False
+
+    def on_hide(self) -> None:
+        self.__idle = True
+
+    def on_resize(self, width: int, height: int) -> None:
+        self.__update_refresh_rate()
+
+        if self.scene is not None:
+            self.scene.mark_dirty()
+
+    def on_move(self, x: int, y: int) -> None:
+        self.__update_refresh_rate()
+
+    def on_expose(self) -> None:
+        if self.scene is not None:
+            self.scene.mark_dirty()
+
+    def get_frame_period(self, flipped: bool = True) -> float:
+        """
+        Returns the time (in s) between two frames the loop currently aims for, 0 if frames are paced by vsync alone.
+        [flipped] tells whether the last frame was flipped, since skipped frames can't be paced by vsync.
+        """
+
+        refresh_rate: float = self.__refresh_rate
+        target_fps: float = self.target_fps if self.target_fps > 0.0 else refresh_rate if refresh_rate > 0.0 else DEFAULT_REFRESH_RATE
+
+        if self.__idle and self.idle_fps > 0.0:
+            target_fps = min(target_fps, self.idle_fps)
+
+        # Flipping already blocks until the next refresh.
+        if flipped and self.window.vsync and refresh_rate > 0.0 and target_fps >= refresh_rate:
+            return 0.0
+
+        return 1.0 / target_fps
+
+    def get_stats(self) -> dict[str, float]:
+        """
+        Returns mean frame time, frame time jitter (standard deviation) and worst frame time over the last frames, all in ms.
+        """
+
+        if len(self.__frame_times) < 2:
+            return {"mean": 0.0, "jitter": 0.0, "max": 0.0}
+
+        return {
+            "mean": statistics.fmean(self.__frame_times) * 1000.0,
+            "jitter": statistics.pstdev(self.__frame_times) * 1000.0,
+            "max": max(self.__frame_times) * 1000.0
+        }
+
+    def run(self) -> None:
+        """
+        Runs the loop until the window is closed or [stop] is called.
+        """
+
+        self.__running = True
+
+        last_time: float = time.perf_counter()
+        deadline: float = last_time
+
+        while self.__running and not self.window.has_exit:
+            frame_start: float = time.perf_counter()
+            dt: float = frame_start - last_time
+            last_time = frame_start
+
+            flipped: bool = self.step(dt)
+
+            # Schedule the next frame, dropping missed deadlines instead of catching up.
+            period: float = self.get_frame_period(flipped = flipped)
+            deadline += period
+            now: float = time.perf_counter()
+            if deadline < now:
+                deadline = now
+            else:
+                self.__wait(deadline)
+
+        self.__running = False
+
+    def stop(self) -> None:
+        self.__running = False
+
+    def step(self, dt: float) -> bool:
+        """
+        Runs a single frame, [dt] being the time (in s) since the previous one.
+        Returns whether the frame was drawn and flipped or not.
+        """
+
+        self.window.dispatch_events()
+        pyglet.clock.tick()
+
+        if self.window.has_exit:
+            return False
+
+        if self.scene is not None:
+            # Run fixed updates, dropping time that can't be caught up.
+            self.__accumulator = min(self.__accumulator + dt, self.fixed_dt * self.max_fixed_steps)
+            while self.__accumulator >= self.fixed_dt:
+                self.scene.fixed_update(self.fixed_dt)
+                self.__accumulator -= self.fixed_dt
+
+            self.scene.update(dt)
+
+        # Close the profiled frame once all updates ran.
+        if PROFILER.enabled:
+            PROFILER.end_frame()
+
+        self.__record(dt)
+
+        # Keep presenting the last frame if nothing changed.
+        if self.scene is not None and not self.scene.needs_draw():
+            return False
+
+        self.window.switch_to()
+        if self.custom_draw is not None:
+            self.custom_draw()
+        else:
+            self.window.clear()
+            if self.scene is not None:
+                self.scene.draw()
+        self.window.flip()
+
+        return True
+
+    def delete(self) -> None:
+        self.stop()
+        self.window.remove_handlers(self)
+
+    def __wait(self, deadline: float) -> None:
+        """
+        Waits until [deadline] (in perf counter time), sleeping as long as possible and spinning for the rest.
+        """
+
+        sleep_time: float = deadline - time.perf_counter() - self.__spin_margin
+        if sleep_time > 0.0:
+            sleep_start: float = time.perf_counter()
+            time.sleep(sleep_time)
+
+            # Adapt the spin margin to how late the sleep woke up.
+            oversleep: float = time.perf_counter() - sleep_start - sleep_time
+            self.__spin_margin = min(max(self.__spin_margin * 0.9 + oversleep * 1.5 * 0.1, MIN_SPIN_MARGIN), MAX_SPIN_MARGIN)
+
+        while time.perf_counter() < deadline:
+            pass
+
+    def __update_refresh_rate(self) -> None:
+        screen = self.window.screen
+        mode = screen.get_mode() if screen is not None else None
+        self.__refresh_rate = float(mode.rate) if mode is not None and mode.rate else 0.0
+
+    def __record(self, dt: float) -> None:
+        if dt <= 0.0:
+            return
+
+        self.__frame_times.append(dt)
+
+        self.__stats_elapsed += dt
+        if self.__stats_elapsed >= 0.5 and SETTINGS[Keys.DEBUG]:
+            self.__stats_elapsed = 0.0
+            stats: dict[str, float] = self.get_stats()
+            set_stat("frame", f"{stats['mean']:.2f} ms, jitter {stats['jitter']:.2f} ms, max {stats['max']:.2f} ms")
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+This file contains the instanced sprite renderer, used to draw huge amounts of copies of the same few images in a single call.
+"""
+
+from typing import Sequence
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+from amonite.settings import GLOBALS, Keys
+from amonite.shaded_sprite import FRAGMENT_SOURCE
+from amonite.shaders_utils import get_shader_program
+from amonite.utils import utils
+
+# Maximum amount of frames a single renderer can draw.
+MAX_FRAMES: int = 64
+
+# Per-instance data layout.
+INSTANCE_DTYPE: np.dtype = np.dtype([
+    ("position", np.float32, 2),
+    ("frame", np.float32),
+    ("depth", np.float32),
+    ("tint", np.uint8, 4)
+])
+
+INSTANCED_VERTEX_SOURCE: str = """#version 150 core
+    // Quad corner, between (0, 0) and (1, 1).
+    in vec2 corner;
+
+    in vec2 instance_position;
+    in float instance_frame;
+    in float instance_depth;
+    in vec4 instance_tint;
+
+    out vec4 vertex_colors;
+    out vec3 texture_coords;
+
+    uniform WindowBlock
+    {
+        mat4 projection;
+        mat4 view;
+    } window;
+
+    // Frames geometry as (x, y, width, height), relative to the anchor point, and texture coordinates as (u0, v0, u1, v1).
+    uniform vec4 frame_rects[MAX_FRAMES];
+    uniform vec4 frame_uvs[MAX_FRAMES];
+    uniform float scaling;
+
+    void main()
+    {
+        int frame = int(instance_frame);
+        vec4 rect = frame_rects[frame];
+        vec4 uvs = frame_uvs[frame];
+
+        vec2 position = (instance_position + rect.xy + corner * rect.zw) * scaling;
+        gl_Position = window.projection * window.view * vec4(position, instance_depth, 1.0);
+
+        vertex_colors = instance_tint;
+        texture_coords = vec3(mix(uvs.xy, uvs.zw, corner), 0.0);
+    }
+"""
+
+class InstancedSpriteRenderer:
+    """
+    Instanced sprite renderer.
+
+    Draws any amount of copies (instances) of a few frames, all sharing the same texture, with a single draw call.
+    Each instance only holds its own position, frame index, tint and depth, which are read from a NumPy array,
+    so that huge crowds can be moved by vectorized code instead of one sprite at a time.
+
+    Instances are drawn by [draw], which should be called while the camera is active.
+    Positions are in world units, scaling is applied by the renderer. Depths default to -y, as for y-sorted sprites.
+
+    Usage::
+
+        renderer = InstancedSpriteRenderer(frames = [grass_a, grass_b])
+        renderer.set_instances(positions = positions, frames = frame_indices)
+        renderer.draw()
+    """
+
+    __slots__ = (
+        "program",
+        "texture",
+        "blend_src",
+        "blend_dest",
+        "__frame_rects",
+        "__frame_uvs",
+        "__instances",
+        "__count",
+        "__dirty",
+        "__vao",
+        "__corners_buffer",
+        "__instances_buffer"
+    )
+
+    def __init__(
+        self,
+        frames: Sequence[pyglet.image.AbstractImage],
+        capacity: int = 1024,
+        blend_src: int = gl.GL_SRC_ALPHA,
+        blend_dest: int = gl.GL_ONE_MINUS_SRC_ALPHA
+    ) -> None:
+        textures: list[pyglet.image.Texture] = [frame.get_texture() for frame in frames]
+
+        if len(textures) == 0 or len(textures) > MAX_FRAMES:
+            raise ValueError(f"Instanced sprites need between 1 and {MAX_FRAMES} frames, got {len(textures)}")
+
+        if len(set((texture.target, texture.id) for texture in textures)) > 1:
+            raise ValueError("All instanced sprite frames should share the same texture (e.g. an atlas)")
+
+        self.program: pyglet.graphics.shader.ShaderProgram = get_shader_program(
+            INSTANCED_VERTEX_SOURCE,
+            FRAGMENT_SOURCE,
+            {"MAX_FRAMES": MAX_FRAMES}
+        )
+        self.texture: pyglet.image.Texture = textures[0]
+
+        # Make sure the texture is filtered using a nearest neighbor filter, as for sprite nodes.
+        utils.set_texture_filter(texture = self.texture, filter = gl.GL_NEAREST)
+
+        self.blend_src: int = blend_src
+        self.blend_dest: int = blend_dest
+
+        # Uniform values for all frames, padded to the uniform arrays size.
+        self.__frame_rects: list[tuple[float, float, float, float]] = [(0.0, 0.0, 0.0, 0.0)] * MAX_FRAMES
+        self.__frame_uvs: list[tuple[float, float, float, float]] = [(0.0, 0.0, 0.0, 0.0)] * MAX_FRAMES
+        for (index, texture) in enumerate(textures):
+            self.__frame_rects[index] = (-texture.anchor_x, -texture.anchor_y, texture.width, texture.height)
+            self.__frame_uvs[index] = (*texture.tex_coords[0:2], *texture.tex_coords[6:8])
+
+        # Instances data, only the first [__count] entries are drawn.
+        self.__instances: np.ndarray = np.zeros(max(capacity, 1), dtype = INSTANCE_DTYPE)
+        self.__count: int = 0
+        self.__dirty: bool = False
+
+        self.__vao: pyglet.graphics.vertexarray.VertexArray = pyglet.graphics.vertexarray.VertexArray()
+        self.__vao.bind()
+
+        # Quad corners, shared by all instances and drawn as a triangle strip.
+        corners: np.ndarray = np.array([0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 1.0], dtype = np.float32)
+        self.__corners_buffer: pyglet.graphics.vertexbuffer.BufferObject = pyglet.graphics.vertexbuffer.BufferObject(corners.nbytes, gl.GL_STATIC_DRAW)
+        self.__corners_buffer.set_data(corners.ctypes.data)
+        self.__set_attribute("corner", 2, gl.GL_FLOAT, False, corners.itemsize * 2, 0, 0)
+
+        self.__instances_buffer: pyglet.graphics.vertexbuffer.BufferObject = pyglet.graphics.vertexbuffer.BufferObject(self.__instances.nbytes)
+        self.__instances_buffer.set_data(self.__instances.ctypes.data)
+        self.__bind_instance_attributes()
+
+        self.__vao.unbind()
+
+    def __set_attribute(
+        self,
+        name: str,
+        count: int,
+        gl_type: int,
+        normalize: bool,
+        stride: int,
+        offset: int,
+        divisor: int
+    ) -> None:
+        location: int = self.program.attributes[name]["location"]
+        gl.glEnableVertexAttribArray(location)
+        gl.glVertexAttribPointer(location, count, gl_type, normalize, stride, offset)
+        gl.glVertexAttribDivisor(location, divisor)
+
+    def __bind_instance_attributes(self) -> None:
+        """
+        Points all per-instance attributes to the current instances buffer, the vertex array must be bound.
+        """
+
+        self.__instances_buffer.bind()
+
+        stride: int = INSTANCE_DTYPE.itemsize
+        fields = INSTANCE_DTYPE.fields
+        assert fields is not None
+        self.__set_attribute("instance_position", 2, gl.GL_FLOAT, False, stride, fields["position"][1], 1)
+        self.__set_attribute("instance_frame", 1, gl.GL_FLOAT, False, stride, fields["frame"][1], 1)
+        self.__set_attribute("instance_depth", 1, gl.GL_FLOAT, False, stride, fields["depth"][1], 1)
+        self.__set_attribute("instance_tint", 4, gl.GL_UNSIGNED_BYTE, True, stride, fields["tint"][1], 1)
+
+    @property
+    def instances(self) -> np.ndarray:
+        """
+        Data of all drawn instances, as a structured array with position, frame, depth and tint fields.
+        Call [invalidate] after editing it in place.
+        """
+
+        return self.__instances[:self.__count]
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def set_count(self, count: int) -> None:
+        """
+        Sets the amount of drawn instances, growing storage if needed.
+        New instances are zeroed, except for their tint which is set to opaque white.
+        """
+
+        if count > len(self.__instances):
+            # Grow to the next power of two, so that reallocations stay rare.
+            instances: np.ndarray = np.zeros(1 << (count - 1).bit_length(), dtype = INSTANCE_DTYPE)
+            instances[:self.__count] = self.__instances[:self.__count]
+            self.__instances = instances
+            self.__instances_buffer.resize(instances.nbytes)
+
+        if count > self.__count:
+            self.__instances[self.__count:count] = np.zeros(count - self.__count, dtype = INSTANCE_DTYPE)
+            self.__instances["tint"][self.__count:count] = 0xFF
+
+        self.__count = count
+        self.__dirty = True
+
+    def set_instances(
+        self,
+        positions: np.ndarray,
+        frames: np.ndarray | int = 0,
+        tints: np.ndarray | tuple[int, int, int, int] = (0xFF, 0xFF, 0xFF, 0xFF),
+        depths: np.ndarray | None = None
+    ) -> None:
+        """
+        Replaces all instances with the ones described by the provided arrays.
+        [positions] is an (n, 2) array, [frames] and [depths] are (n,) arrays (or scalars) and [tints] an (n, 4) array (or a single color).
+        """
+
+        count: int = len(positions)
+        self.set_count(count)
+
+        instances: np.ndarray = self.__instances[:count]
+        instances["position"] = positions
+        instances["frame"] = frames
+        instances["tint"] = tints
+        instances["depth"] = depths if depths is not None else -np.asarray(positions, dtype = np.float32)[:, 1]
+
+    def invalidate(self) -> None:
+        """
+        Marks instances data as changed, so that it's uploaded again before the next draw.
+        """
+
+        self.__dirty = True
+
+    def draw(self) -> None:
+        if self.__count == 0:
+            return
+
+        if self.__dirty:
+            # Upload all instances at once.
+            self.__instances_buffer.set_data_region(self.__instances.ctypes.data, 0, self.__count * INSTANCE_DTYPE.itemsize)
+            self.__dirty = False
+
+        self.program.use()
+        self.program["frame_rects"] = self.__frame_rects
+        self.program["frame_uvs"] = self.__frame_uvs
+        self.program["scaling"] = float(GLOBALS[Keys.SCALING])
+
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+        gl.glBindTexture(self.texture.target, self.texture.id)
+
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(self.blend_src, self.blend_dest)
+        gl.glEnable(gl.GL_DEPTH_TEST)
+        gl.glDepthFunc(gl.GL_LESS)
+
+        self.__vao.bind()
+        gl.glDrawArraysInstanced(gl.GL_TRIANGLE_STRIP, 0, 4, self.__count)
+        self.__vao.unbind()
+
+        gl.glDisable(gl.GL_BLEND)
+        gl.glDisable(gl.GL_DEPTH_TEST)
+        self.program.stop()
+
+    def delete(self) -> None:
+        self.__instances_buffer.delete()
+        self.__corners_buffer.delete()
+        self.__vao.delete()
+        self.__count = 0
\ No newline at end of file
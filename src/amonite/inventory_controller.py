@@ -5,7 +5,7 @@ from typing import Callable
 
 import pyglet
 
-from amonite.utils.utils import idx2to1
+from amonite.utils.utils import idx1to2, idx2to1
 
 SECTION_OVERFLOW_NONE: str = "none"
 SECTION_OVERFLOW_WRAP: str = "wrap"
@@ -242,6 +242,13 @@ class InventoryController:
         if len(data) <= 0:
             return
 
+        self.load_data(data = data)
+
+    def load_data(self, data: dict) -> None:
+        """
+        Stores all inventory data from the provided [data], structured as an inventory file.
+        """
+
         # Read consumables size.
         size_str: str = data["consumables_size"]
         cons_size: list[int] = list(map(lambda item: int(item), size_str.split(",")))
@@ -281,4 +288,25 @@ class InventoryController:
             id: str = element["id"]
             position_str: str = element["position"]
             position: list[int] = list(map(lambda item: int(item), position_str.split(",")))
-            self.consumables_position[id] = idx2to1(i = position[0], j = position[1], m = self.consumables_size[0])
\ No newline at end of file
+            self.consumables_position[id] = idx2to1(i = position[0], j = position[1], m = self.consumables_size[0])
+
+    def dump_data(self) -> dict:
+        """
+        Returns all inventory data, structured as an inventory file.
+        """
+
+        return {
+            "consumables_size": f"{self.consumables_size[0]},{self.consumables_size[1]}",
+            "quicks_count": self.quicks_count,
+            "quicks": list(self.quicks),
+            "currencies": [{"id": id, "count": count} for id, count in self.currencies.items()],
+            "current_ammo": self.current_ammo,
+            "ammo": [{"id": id, "count": count} for id, count in self.ammo.items()],
+            "consumables_count": [{"id": id, "count": count} for id, count in self.consumables_count.items()],
+            "consumables_position": [
+                {
+                    "id": id,
+                    "position": ",".join(map(str, idx1to2(i = position, m = self.consumables_size[0])))
+                } for id, position in self.consumables_position.items()
+            ]
+        }
\ No newline at end of file
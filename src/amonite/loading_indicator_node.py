@@ -3,6 +3,7 @@ from typing import Callable
 import pyglet
 
 from amonite.node import PositionNode
+from amonite.shaders_utils import UniformsGroup, get_shader_program
 from amonite.sprite_node import SpriteNode
 from amonite.utils.tween import Tween
 from amonite.utils.types import OptionalSpriteRes, SpriteRes
@@ -92,13 +93,16 @@ class LoadingIndicatorNode(PositionNode):
                 center = True
             )
 
-        # Create shader program from vector and fragment.
-        vert_shader: pyglet.graphics.shader.Shader = pyglet.graphics.shader.Shader(pyglet.sprite.vertex_source, "vertex")
-        frag_shader: pyglet.graphics.shader.Shader = pyglet.graphics.shader.Shader(fragment_source, "fragment")
-        self.shader_program = pyglet.graphics.shader.ShaderProgram(vert_shader, frag_shader)
-
-        # Pass non sampler uniforms to the shader.
-        self.shader_program["fill"] = self.__fill
+        # The shader program is shared by all loading indicators, so fill values are applied by each indicator's own group.
+        self.shader_program: pyglet.graphics.shader.ShaderProgram = get_shader_program(pyglet.sprite.vertex_source, fragment_source)
+        self.__uniforms_group: UniformsGroup = UniformsGroup(
+            program = self.shader_program,
+            uniforms = {
+                "fill": self.__fill,
+                "sw_coord": (0.0, 0.0, 0.0),
+                "ne_coord": (0.0, 0.0, 0.0)
+            }
+        )
 
         if start_visible:
             self.__init_sprites()
@@ -111,8 +115,10 @@ class LoadingIndicatorNode(PositionNode):
                 y = self.y,
                 z = self.y,
                 shader = self.shader_program,
+                group = self.__uniforms_group,
                 batch = self.__batch
             )
+            self.__set_texture_coords()
 
         if self.background_sprite is None and self.__background_sprite_res is not None:
             self.background_sprite = SpriteNode(
@@ -159,23 +165,35 @@ class LoadingIndicatorNode(PositionNode):
         self.__fill = fill
 
         if self.foreground_sprite is not None:
-            # Fetch texture coordinates from sprite.
-            sprite_texture: pyglet.image.Texture = self.foreground_sprite.sprite.get_texture()
-            texture_coords: tuple[
-                # South west.
-                float, float, float,
-                # North west.
-                float, float, float,
-                # North east.
-                float, float, float,
-                # South east.
-                float, float, float
-            ] = sprite_texture.tex_coords
-
-            # Also pass bottom-left and top-right texture coords.
-            self.shader_program["sw_coord"] = texture_coords[0:3]
-            self.shader_program["ne_coord"] = texture_coords[6:9]
-            self.shader_program["fill"] = Tween.compute(fill, self.__ease_function)
+            self.__set_texture_coords()
+            self.__uniforms_group.uniforms["fill"] = Tween.compute(fill, self.__ease_function)
+
+            # The fill is a uniform, so no vertex is touched: mark the scene through the sprite.
+            self.foreground_sprite.mark_dirty()
+
+    def __set_texture_coords(self) -> None:
+        """
+        Passes the foreground sprite's bottom-left and top-right texture coordinates to the shader.
+        """
+
+        if self.foreground_sprite is None:
+            return
+
+        # Fetch texture coordinates from sprite.
+        sprite_texture: pyglet.image.Texture = self.foreground_sprite.sprite.get_texture()
+        texture_coords: tuple[
+            # South west.
+            float, float, float,
+            # North west.
+            float, float, float,
+            # North east.
+            float, float, float,
+            # South east.
+            float, float, float
+        ] = sprite_texture.tex_coords
+
+        self.__uniforms_group.uniforms["sw_coord"] = texture_coords[0:3]
+        self.__uniforms_group.uniforms["ne_coord"] = texture_coords[6:9]
 
     def show(self) -> None:
         self.__init_sprites()
@@ -1,6 +1,36 @@
+import pyglet
+
+from amonite.profiler import PROFILER
 from amonite.settings import GLOBALS, Keys
 
 
+class RenderState:
+    """
+    Tracks whether anything visible changed since the last drawn frame, for scenes rendering on demand.
+    Each scene owns its own state, which is shared by its batches so that nodes can reach it through the batch they draw to.
+
+    Attributes
+    ----------
+    dirty: bool
+        Whether the next frame should be drawn or not.
+    """
+
+    __slots__ = (
+        "dirty"
+    )
+
+    def __init__(self) -> None:
+        self.dirty: bool = True
+
+def mark_batch_dirty(batch: pyglet.graphics.Batch | None) -> None:
+    """
+    Requests a new frame from the scene owning [batch], if any.
+    """
+
+    render_state: RenderState | None = getattr(batch, "render_state", None)
+    if render_state is not None:
+        render_state.dirty = True
+
 class Node:
     __slots__ = (
         "components"
@@ -14,6 +44,15 @@ class Node:
         Renders the object.
         """
 
+    def mark_dirty(self) -> None:
+        """
+        Requests a new frame from the scene drawing the node, only relevant to scenes rendering on demand.
+        Nodes should call it on any visual change, nodes drawing to a batch override it in order to mark the batch's scene.
+        """
+
+        for component in self.components:
+            component.mark_dirty()
+
     def add_component(self, component) -> None:
         """
         Adds a component to self.
@@ -49,6 +88,19 @@ class Node:
             Time (in s) since the last frame was calculated.
         """
 
+    def cull(
+        self,
+        view_bounds: tuple[float, float, float, float]
+    ) -> None:
+        """
+        Hides any renderable content lying outside of the provided view.
+
+        Parameters
+        ----------
+        view_bounds: tuple[float, float, float, float]
+            Currently visible area (in scaled pixels), defined as (x, y, width, height).
+        """
+
     def delete(self) -> None:
         """
         Deletes all components.
@@ -171,8 +223,19 @@ class GroupNode(PositionNode):
         super().update(dt)
 
         # Update all children.
+        if PROFILER.enabled:
+            for child in self.children:
+                PROFILER.update(child, dt = dt)
+        else:
+            for child in self.children:
+                child.update(dt = dt)
+
+    def cull(self, view_bounds: tuple[float, float, float, float]) -> None:
+        super().cull(view_bounds = view_bounds)
+
+        # Cull all children.
         for child in self.children:
-            child.update(dt = dt)
+            child.cull(view_bounds = view_bounds)
 
     def delete(self) -> None:
         for child in self.children:
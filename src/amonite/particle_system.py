@@ -0,0 +1,352 @@
+"""
+This file contains the particle emitter, used to simulate and render thousands of short-lived sprites (sparks, dust, rain...).
+"""
+
+import math
+from typing import Sequence
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+from amonite.node import PositionNode, mark_batch_dirty
+from amonite.settings import GLOBALS, Keys
+from amonite.shaded_sprite import ShadedSpriteGroup, depth_shader_program
+from amonite.utils import utils
+from amonite.utils.vertex_utils import map_attribute
+
+class ParticleEmitter(PositionNode):
+    """
+    Particle emitter.
+
+    All particles state (position, velocity, life, frame) is held in NumPy arrays and updated in vectorized steps,
+    then written straight into a single vertex list drawn with the shared sprite shader and group,
+    so that the whole emitter costs one draw and no per-particle Python code.
+    Live particles are kept packed at the start of all arrays.
+
+    Particles are emitted from the emitter position (in world units), either continuously ([rate]) or in bursts ([emit]).
+    Frames are played once over each particle's lifetime and its color fades from [color_start] to [color_end].
+
+    Attributes
+    ----------
+    rate: float
+        Amount of particles emitted per second, 0 to only emit in bursts.
+    lifetime: tuple[float, float]
+        Minimum and maximum particle lifetime (in s).
+    speed: tuple[float, float]
+        Minimum and maximum particle start speed (in world units per s).
+    angle: tuple[float, float]
+        Minimum and maximum particle start direction (in degrees, counterclockwise from the x axis).
+    spread: tuple[float, float]
+        Size of the area (in world units) particles are spawned in, centered on the emitter.
+    gravity: tuple[float, float]
+        Acceleration applied to all particles (in world units per s^2).
+    damping: float
+        Fraction of velocity lost each second.
+    color_start: tuple[int, int, int, int]
+        Particles color at birth, set through [set_colors].
+    color_end: tuple[int, int, int, int]
+        Particles color at death, set through [set_colors].
+    y_sort: bool
+        Whether to sort particles using their own y position or not, if not then all particles share the emitter z.
+    """
+
+    __slots__ = (
+        "rate",
+        "lifetime",
+        "speed",
+        "angle",
+        "spread",
+        "gravity",
+        "damping",
+        "color_start",
+        "color_end",
+        "y_sort",
+        "__capacity",
+        "__count",
+        "__written",
+        "__accumulator",
+        "__rng",
+        "__state",
+        "__spare",
+        "__scratch",
+        "__alive",
+        "__indices",
+        "__shaped",
+        "__frame_vertices",
+        "__frame_tex_coords",
+        "__colors",
+        "__batch",
+        "__vertex_list"
+    )
+
+    def __init__(
+        self,
+        frames: Sequence[pyglet.image.AbstractImage],
+        x: float = 0.0,
+        y: float = 0.0,
+        z: float = 0.0,
+        capacity: int = 1024,
+        rate: float = 0.0,
+        lifetime: tuple[float, float] = (0.5, 1.0),
+        speed: tuple[float, float] = (10.0, 20.0),
+        angle: tuple[float, float] = (0.0, 360.0),
+        spread: tuple[float, float] = (0.0, 0.0),
+        gravity: tuple[float, float] = (0.0, 0.0),
+        damping: float = 0.0,
+        color_start: tuple[int, int, int, int] = (0xFF, 0xFF, 0xFF, 0xFF),
+        color_end: tuple[int, int, int, int] = (0xFF, 0xFF, 0xFF, 0x00),
+        y_sort: bool = True,
+        batch: pyglet.graphics.Batch | None = None
+    ) -> None:
+        super().__init__(x, y, z)
+
+        textures: list[pyglet.image.Texture] = [frame.get_texture() for frame in frames]
+
+        if len(textures) == 0:
+            raise ValueError("Particle emitters need at least one frame")
+
+        if len(set((texture.target, texture.id) for texture in textures)) > 1:
+            raise ValueError("All particle frames should share the same texture (e.g. an atlas)")
+
+        self.rate: float = rate
+        self.lifetime: tuple[float, float] = lifetime
+        self.speed: tuple[float, float] = speed
+        self.angle: tuple[float, float] = angle
+        self.spread: tuple[float, float] = spread
+        self.gravity: tuple[float, float] = gravity
+        self.damping: float = damping
+        self.color_start: tuple[int, int, int, int] = color_start
+        self.color_end: tuple[int, int, int, int] = color_end
+        self.y_sort: bool = y_sort
+
+        self.__capacity: int = capacity
+
+        # Amount of live particles and of particles written to the vertex list in the last update.
+        self.__count: int = 0
+        self.__written: int = 0
+
+        # Particles yet to be emitted, carried over between updates.
+        self.__accumulator: float = 0.0
+        self.__rng: np.random.Generator = np.random.default_rng()
+
+        # Particles state as x, y, velocity x, velocity y, age and lifetime rows, one column per particle.
+        # Rows are contiguous, which keeps all vectorized steps on packed memory.
+        self.__state: np.ndarray = np.zeros((6, capacity), dtype = np.float32)
+        self.__state[5] = 1.0
+
+        # Preallocated buffers, so that updates create no temporary arrays:
+        # compaction writes live particles to the spare state, which is then swapped with the current one.
+        self.__spare: np.ndarray = np.zeros((6, capacity), dtype = np.float32)
+        self.__scratch: np.ndarray = np.zeros((2, capacity), dtype = np.float32)
+        self.__alive: np.ndarray = np.zeros(capacity, dtype = np.bool_)
+        self.__indices: np.ndarray = np.zeros(capacity, dtype = np.intp)
+
+        # Amount of leading slots already holding the quad of single frame emitters, which never changes.
+        self.__shaped: int = 0
+
+        # Vertices (relative to the anchor point, in pixels) and texture coordinates of each frame's quad.
+        self.__frame_vertices: np.ndarray = np.array([
+            (
+                -texture.anchor_x, -texture.anchor_y, 0.0,
+                texture.width - texture.anchor_x, -texture.anchor_y, 0.0,
+                texture.width - texture.anchor_x, texture.height - texture.anchor_y, 0.0,
+                -texture.anchor_x, texture.height - texture.anchor_y, 0.0
+            ) for texture in textures
+        ], dtype = np.float32)
+        self.__frame_tex_coords: np.ndarray = np.array([texture.tex_coords for texture in textures], dtype = np.float32)
+
+        # Colors lookup table by life progress (256 steps), as packed RGBA values.
+        self.__colors: np.ndarray = np.zeros(256, dtype = np.uint32)
+        self.set_colors(color_start, color_end)
+
+        # Make sure the texture is filtered using a nearest neighbor filter, as for sprite nodes.
+        utils.set_texture_filter(texture = textures[0], filter = gl.GL_NEAREST)
+
+        self.__batch: pyglet.graphics.Batch | None = batch
+
+        # A single vertex list for all particles, dead particles are collapsed to a point.
+        indices: np.ndarray = (np.arange(capacity, dtype = np.int32)[:, None] * 4 + np.array([0, 1, 2, 0, 2, 3], dtype = np.int32)).ravel()
+        self.__vertex_list = depth_shader_program.vertex_list_indexed(
+            capacity * 4,
+            gl.GL_TRIANGLES,
+            indices.tolist(),
+            batch,
+            ShadedSpriteGroup.get(texture = textures[0]),
+            position = ("f", (0.0,) * capacity * 12),
+            colors = ("Bn", (0,) * capacity * 16),
+            translate = ("f", (0.0,) * capacity * 12),
+            scale = ("f", (float(GLOBALS[Keys.SCALING]),) * capacity * 8),
+            rotation = ("f", (0.0,) * capacity * 4),
+            tex_coords = ("f", (0.0,) * capacity * 12)
+        )
+
+    def emit(self, count: int) -> None:
+        """
+        Emits [count] particles at once, as long as there's room left.
+        """
+
+        count = min(count, self.__capacity - self.__count)
+        if count <= 0:
+            return
+
+        start: int = self.__count
+        end: int = start + count
+        rng: np.random.Generator = self.__rng
+        state: np.ndarray = self.__state[:, start:end]
+
+        state[0] = self.x + (rng.random(count, dtype = np.float32) - 0.5) * self.spread[0]
+        state[1] = self.y + (rng.random(count, dtype = np.float32) - 0.5) * self.spread[1]
+
+        angles: np.ndarray = np.radians(rng.uniform(self.angle[0], self.angle[1], count))
+        speeds: np.ndarray = rng.uniform(self.speed[0], self.speed[1], count)
+        state[2] = np.cos(angles) * speeds
+        state[3] = np.sin(angles) * speeds
+
+        state[4] = 0.0
+        state[5] = rng.uniform(self.lifetime[0], self.lifetime[1], count)
+
+        self.__count = end
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def update(self, dt: float) -> None:
+        super().update(dt = dt)
+
+        # Emit new particles.
+        if self.rate > 0.0:
+            self.__accumulator += self.rate * dt
+            emitted: int = math.floor(self.__accumulator)
+            self.__accumulator -= emitted
+            self.emit(emitted)
+
+        count: int = self.__count
+        if count > 0:
+            state: np.ndarray = self.__state[:, :count]
+            scratch: np.ndarray = self.__scratch[:, :count]
+
+            # Integrate, in place.
+            state[4] += dt
+            if self.gravity[0] != 0.0:
+                state[2] += self.gravity[0] * dt
+            if self.gravity[1] != 0.0:
+                state[3] += self.gravity[1] * dt
+            if self.damping > 0.0:
+                state[2:4] *= max(0.0, 1.0 - self.damping * dt)
+            np.multiply(state[2:4], dt, out = scratch)
+            state[0:2] += scratch
+
+            # Remove dead particles, keeping live ones packed at the start. Only done when particles actually died.
+            alive: np.ndarray = self.__alive[:count]
+            np.less(state[4], state[5], out = alive)
+            alive_count: int = int(np.count_nonzero(alive))
+            if alive_count < count:
+                np.compress(alive, state, axis = 1, out = self.__spare[:, :alive_count])
+                (self.__state, self.__spare) = (self.__spare, self.__state)
+
+                self.__count = alive_count
+
+        self.__write()
+
+    def set_colors(
+        self,
+        color_start: tuple[int, int, int, int],
+        color_end: tuple[int, int, int, int]
+    ) -> None:
+        """
+        Sets the colors particles fade between over their lifetime.
+        """
+
+        self.color_start = color_start
+        self.color_end = color_end
+
+        start: np.ndarray = np.array(color_start, dtype = np.float32)
+        colors: np.ndarray = (start + (np.array(color_end, dtype = np.float32) - start) * np.linspace(0.0, 1.0, 256, dtype = np.float32)[:, None]).astype(np.uint8)
+        self.__colors[:] = colors.view(np.uint32).ravel()
+
+    def __write(self) -> None:
+        """
+        Writes all live particles straight into the vertex list and collapses the ones that died since the last write.
+        """
+
+        count: int = self.__count
+        written: int = max(count, self.__written)
+        self.__written = count
+
+        if written == 0:
+            return
+
+        self.mark_dirty()
+
+        state: np.ndarray = self.__state[:, :count]
+        frames_count: int = len(self.__frame_vertices)
+
+        # Life progress, between 0 and 1.
+        progress: np.ndarray = self.__scratch[0, :count]
+        np.divide(state[4], state[5], out = progress)
+        np.minimum(progress, 1.0, out = progress)
+
+        indices: np.ndarray = self.__indices[:count]
+        if frames_count > 1:
+            # Particles move between slots when compacted, so quads are rewritten for all of them.
+            # Clipping the indices keeps particles at the end of their life on the last frame.
+            np.multiply(progress, frames_count, out = indices, casting = "unsafe")
+
+            vertices: np.ndarray = map_attribute(self.__vertex_list, "position", written * 4).reshape((written, 12))
+            np.take(self.__frame_vertices, indices, axis = 0, out = vertices[:count], mode = "clip")
+            vertices[count:] = 0.0
+
+            tex_coords: np.ndarray = map_attribute(self.__vertex_list, "tex_coords", count * 4).reshape((count, 12))
+            np.take(self.__frame_tex_coords, indices, axis = 0, out = tex_coords, mode = "clip")
+        else:
+            # All particles share the same quad, so only slots that changed since the last write need it:
+            # new particles get the quad and dead ones are collapsed to a point.
+            shaped: int = min(self.__shaped, count)
+            if shaped < written:
+                vertices = map_attribute(self.__vertex_list, "position", written * 4).reshape((written, 12))
+                vertices[shaped:count] = self.__frame_vertices[0]
+                vertices[count:] = 0.0
+
+            if shaped < count:
+                tex_coords = map_attribute(self.__vertex_list, "tex_coords", count * 4).reshape((count, 12))
+                tex_coords[shaped:] = self.__frame_tex_coords[0]
+
+            self.__shaped = count
+
+        if count == 0:
+            return
+
+        # All 4 vertices of each particle share the same translation and color:
+        # write them straight into the vertex buffers, one component (or value) per vertex column.
+        scaling: float = float(GLOBALS[Keys.SCALING])
+        translate: np.ndarray = map_attribute(self.__vertex_list, "translate", count * 4).reshape((count, 4, 3))
+        np.multiply(state[0, :, None], scaling, out = translate[:, :, 0])
+        np.multiply(state[1, :, None], scaling, out = translate[:, :, 1])
+        if self.y_sort:
+            np.negative(state[1, :, None], out = translate[:, :, 2])
+        else:
+            translate[:, :, 2] = self.z
+
+        np.multiply(progress, 255, out = indices, casting = "unsafe")
+        colors: np.ndarray = map_attribute(self.__vertex_list, "colors", count * 4).view(np.uint32).reshape((count, 4))
+        colors[:] = np.take(self.__colors, indices, mode = "clip")[:, None]
+
+    def clear(self) -> None:
+        """
+        Kills all particles.
+        """
+
+        self.__count = 0
+        self.__accumulator = 0.0
+        self.__write()
+
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__batch)
+
+        super().mark_dirty()
+
+    def delete(self) -> None:
+        self.mark_dirty()
+        self.__vertex_list.delete()
+
+        super().delete()
\ No newline at end of file
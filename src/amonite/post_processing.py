@@ -0,0 +1,335 @@
+"""
+This file contains the post-processing pipeline, used to run full screen effects (palette, CRT, bloom, grading...) at render resolution.
+"""
+
+from ctypes import byref
+from typing import Any
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+from amonite.shaders_utils import get_shader_program
+
+POST_VERTEX_SOURCE: str = """#version 150 core
+    // Full screen quad corner, between (0, 0) and (1, 1).
+    in vec2 corner;
+
+    out vec2 texture_coords;
+
+    void main()
+    {
+        gl_Position = vec4(corner * 2.0 - 1.0, 0.0, 1.0);
+        texture_coords = corner;
+    }
+"""
+
+# Fragment shader which copies its source as is, both a fallback and a template for pass shaders.
+# All pass shaders are provided with the previous pass output as [source] and the render resolution (in pixels) as [resolution].
+COPY_FRAGMENT_SOURCE: str = """#version 150 core
+    in vec2 texture_coords;
+
+    out vec4 final_colors;
+
+    uniform sampler2D source;
+    uniform vec2 resolution;
+
+    void main()
+    {
+        final_colors = texture(source, texture_coords);
+    }
+"""
+
+class RenderTarget:
+    """
+    Framebuffer with a color texture and an optional depth renderbuffer, all of the same size.
+    """
+
+    __slots__ = (
+        "width",
+        "height",
+        "depth",
+        "texture",
+        "framebuffer_id",
+        "depthbuffer_id"
+    )
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        depth: bool = False
+    ) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.depth: bool = depth
+
+        self.texture: pyglet.image.Texture = pyglet.image.Texture.create(
+            width = width,
+            height = height,
+            min_filter = gl.GL_NEAREST,
+            mag_filter = gl.GL_NEAREST
+        )
+
+        self.framebuffer_id: gl.GLuint = gl.GLuint()
+        gl.glGenFramebuffers(1, byref(self.framebuffer_id))
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer_id)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, self.texture.target, self.texture.id, 0)
+
+        self.depthbuffer_id: gl.GLuint = gl.GLuint()
+        if depth:
+            # The depth buffer should match the color texture, not the window.
+            gl.glGenRenderbuffers(1, byref(self.depthbuffer_id))
+            gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.depthbuffer_id)
+            gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH_COMPONENT, width, height)
+            gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depthbuffer_id)
+
+        # Make sure the framebuffer is complete.
+        assert gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER) == gl.GL_FRAMEBUFFER_COMPLETE, "framebuffer is not complete"
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+
+    def bind(self) -> None:
+        """
+        Sets the target as the current render target, covering all of it.
+        """
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer_id)
+        gl.glViewport(0, 0, self.width, self.height)
+
+    def delete(self) -> None:
+        gl.glDeleteFramebuffers(1, byref(self.framebuffer_id))
+        if self.depth:
+            gl.glDeleteRenderbuffers(1, byref(self.depthbuffer_id))
+        self.texture.delete()
+
+class RenderTargetPool:
+    """
+    Pool of render targets, reused across frames by size.
+
+    Targets are only allocated the first time a size is needed and kept once released,
+    so that per-frame effects never allocate GPU memory.
+    """
+
+    __slots__ = (
+        "__free",
+        "__targets"
+    )
+
+    def __init__(self) -> None:
+        # Released targets by (width, height, depth).
+        self.__free: dict[tuple[int, int, bool], list[RenderTarget]] = {}
+
+        # All targets ever allocated.
+        self.__targets: list[RenderTarget] = []
+
+    def acquire(
+        self,
+        width: int,
+        height: int,
+        depth: bool = False
+    ) -> RenderTarget:
+        """
+        Returns a free render target of the given size, allocating one if none is left.
+        """
+
+        free: list[RenderTarget] = self.__free.get((width, height, depth), [])
+        if len(free) > 0:
+            return free.pop()
+
+        target: RenderTarget = RenderTarget(width = width, height = height, depth = depth)
+        self.__targets.append(target)
+
+        return target
+
+    def release(self, target: RenderTarget) -> None:
+        """
+        Gives [target] back to the pool, its content is kept until it's acquired again.
+        """
+
+        self.__free.setdefault((target.width, target.height, target.depth), []).append(target)
+
+    def get_count(self) -> int:
+        return len(self.__targets)
+
+    def delete(self) -> None:
+        for target in self.__targets:
+            target.delete()
+
+        self.__targets.clear()
+        self.__free.clear()
+
+class PostProcessPass:
+    """
+    Single full screen effect, drawn by a fragment shader reading the previous pass output.
+
+    Attributes
+    ----------
+    program: pyglet.graphics.shader.ShaderProgram
+        The shader program running the effect, built from the shared full screen vertex shader.
+    uniforms: dict[str, Any]
+        Custom uniform values, set before every run.
+    enabled: bool
+        Whether the pass should run or be skipped.
+    """
+
+    __slots__ = (
+        "program",
+        "uniforms",
+        "enabled"
+    )
+
+    def __init__(
+        self,
+        fragment_source: str,
+        uniforms: dict[str, Any] | None = None,
+        defines: dict[str, Any] | None = None
+    ) -> None:
+        self.program: pyglet.graphics.shader.ShaderProgram = get_shader_program(
+            POST_VERTEX_SOURCE,
+            fragment_source,
+            defines
+        )
+        self.uniforms: dict[str, Any] = uniforms if uniforms is not None else {}
+        self.enabled: bool = True
+
+class PostProcessChain:
+    """
+    Ordered list of post-processing passes, chained through ping-pong render targets.
+
+    The chain reads a source target and leaves the final result back in it, so that its owner can keep presenting the same texture.
+    Intermediate targets come from a [RenderTargetPool] at the source size, so effects cost as much as the (low) render resolution.
+    """
+
+    __slots__ = (
+        "passes",
+        "pool",
+        "__owns_pool",
+        "__vao",
+        "__corners_buffer",
+        "__locations"
+    )
+
+    def __init__(self, pool: RenderTargetPool | None = None) -> None:
+        self.passes: list[PostProcessPass] = []
+        self.pool: RenderTargetPool = pool if pool is not None else RenderTargetPool()
+
+        # Pools provided by the caller may be shared, so they're left to their owner on delete.
+        self.__owns_pool: bool = pool is None
+
+        # Graphics resources are only created on first run.
+        self.__vao: pyglet.graphics.vertexarray.VertexArray | None = None
+        self.__corners_buffer: pyglet.graphics.vertexbuffer.BufferObject | None = None
+
+        # Corner attribute locations already pointed to the quad, since each pass program may use its own.
+        self.__locations: set[int] = set()
+
+    def add_pass(self, post_pass: PostProcessPass) -> None:
+        self.passes.append(post_pass)
+
+    def remove_pass(self, post_pass: PostProcessPass) -> None:
+        if post_pass in self.passes:
+            self.passes.remove(post_pass)
+
+    def run(self, target: RenderTarget) -> None:
+        """
+        Runs all enabled passes on [target] content, in order, and writes the result back to [target].
+        """
+
+        passes: list[PostProcessPass] = [post_pass for post_pass in self.passes if post_pass.enabled]
+        if len(passes) == 0:
+            return
+
+        # Copy the source to a pooled target first, so that the last pass can write straight back to [target].
+        pooled: list[RenderTarget] = [self.pool.acquire(target.width, target.height) for _ in range(min(len(passes), 2))]
+        source: RenderTarget = pooled[0]
+        spare: RenderTarget | None = pooled[1] if len(pooled) > 1 else None
+        self.__copy(target, source)
+
+        gl.glDisable(gl.GL_DEPTH_TEST)
+        gl.glDisable(gl.GL_BLEND)
+        gl.glActiveTexture(gl.GL_TEXTURE0)
+
+        self.__bind_quad()
+
+        for (index, post_pass) in enumerate(passes):
+            destination: RenderTarget | None = target if index == len(passes) - 1 else spare
+            assert destination is not None
+            destination.bind()
+
+            program: pyglet.graphics.shader.ShaderProgram = post_pass.program
+            program.use()
+            self.__set_corner_location(program.attributes["corner"]["location"])
+            if "source" in program.uniforms:
+                program["source"] = 0
+            if "resolution" in program.uniforms:
+                program["resolution"] = (float(target.width), float(target.height))
+            for (name, value) in post_pass.uniforms.items():
+                program[name] = value
+
+            gl.glBindTexture(source.texture.target, source.texture.id)
+            gl.glDrawArrays(gl.GL_TRIANGLE_STRIP, 0, 4)
+
+            # Ping-pong: this pass output is the next pass source.
+            (source, spare) = (destination, source)
+
+        assert self.__vao is not None
+        self.__vao.unbind()
+        gl.glUseProgram(0)
+
+        for pooled_target in pooled:
+            self.pool.release(pooled_target)
+
+    def delete(self) -> None:
+        if self.__vao is not None:
+            self.__vao.delete()
+            self.__vao = None
+
+        if self.__corners_buffer is not None:
+            self.__corners_buffer.delete()
+            self.__corners_buffer = None
+
+        self.__locations.clear()
+
+        if self.__owns_pool:
+            self.pool.delete()
+
+    @staticmethod
+    def __copy(source: RenderTarget, destination: RenderTarget) -> None:
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, source.framebuffer_id)
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, destination.framebuffer_id)
+        gl.glBlitFramebuffer(
+            0, 0, source.width, source.height,
+            0, 0, destination.width, destination.height,
+            gl.GL_COLOR_BUFFER_BIT,
+            gl.GL_NEAREST
+        )
+
+    def __bind_quad(self) -> None:
+        """
+        Binds the full screen quad, creating it if not done yet.
+        """
+
+        if self.__vao is not None:
+            self.__vao.bind()
+            return
+
+        self.__vao = pyglet.graphics.vertexarray.VertexArray()
+        self.__vao.bind()
+
+        corners: np.ndarray = np.array([0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1.0, 1.0], dtype = np.float32)
+        self.__corners_buffer = pyglet.graphics.vertexbuffer.BufferObject(corners.nbytes, gl.GL_STATIC_DRAW)
+        self.__corners_buffer.set_data(corners.ctypes.data)
+
+    def __set_corner_location(self, location: int) -> None:
+        """
+        Points the corner attribute at [location] to the quad corners, the quad must be bound.
+        """
+
+        if location in self.__locations:
+            return
+
+        assert self.__corners_buffer is not None
+        self.__corners_buffer.bind()
+        gl.glEnableVertexAttribArray(location)
+        gl.glVertexAttribPointer(location, 2, gl.GL_FLOAT, False, 8, 0)
+        self.__locations.add(location)
\ No newline at end of file
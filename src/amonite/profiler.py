@@ -0,0 +1,151 @@
+"""
+This file contains the profiler used to measure node updates by node class.
+"""
+
+import time
+
+from amonite.debug_stats import DEBUG_STATS, clear_stat, set_stat
+
+# Prefix for all profiler debug stats.
+STATS_PREFIX: str = "upd "
+
+class UpdateProfiler:
+    """
+    Opt-in profiler for node updates, records cumulative and per-frame time per node class (and optionally per instance).
+
+    Scenes and group nodes route their children updates through the profiler only while it's enabled,
+    so leaving the hooks in place costs a single attribute check per update loop.
+    Recorded times are exclusive: time spent updating nested children is only accounted to the children.
+    Frames are closed by [end_frame], which should be called once per frame: [GameLoop] does, custom loops should as well.
+
+    Attributes
+    ----------
+    enabled: bool
+        Whether updates should be recorded or not.
+    per_instance: bool
+        Whether to record each node instance separately or not.
+    overlay_entries: int
+        Amount of entries (the most expensive in the last frame) published to debug stats.
+    """
+
+    __slots__ = (
+        "enabled",
+        "per_instance",
+        "overlay_entries",
+        "__totals",
+        "__frame",
+        "__last_frame",
+        "__stack"
+    )
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.per_instance: bool = False
+        self.overlay_entries: int = 5
+
+        # Cumulative time (in s) and calls count by key.
+        self.__totals: dict[str, list[float]] = {}
+
+        # Time (in s) spent by key in the current and in the last frame.
+        self.__frame: dict[str, float] = {}
+        self.__last_frame: dict[str, float] = {}
+
+        # Time spent by nested updates, one entry per nesting level.
+        self.__stack: list[float] = []
+
+    def __record(self, node, elapsed: float) -> None:
+        key: str = type(node).__qualname__
+        if self.per_instance:
+            key = f"{key}#{id(node):x}"
+
+        if key in self.__totals:
+            total: list[float] = self.__totals[key]
+            total[0] += elapsed
+            total[1] += 1
+        else:
+            self.__totals[key] = [elapsed, 1]
+
+        self.__frame[key] = self.__frame.get(key, 0.0) + elapsed
+
+    def __measure(self, node, method, dt: float) -> None:
+        self.__stack.append(0.0)
+        start: float = time.perf_counter()
+
+        try:
+            method(dt = dt)
+        finally:
+            # Always pop the nesting level, so that an exception doesn't leave the stack unbalanced.
+            elapsed: float = time.perf_counter() - start
+            nested: float = self.__stack.pop()
+
+        # Let the parent know how much time was spent by its children.
+        if len(self.__stack) > 0:
+            self.__stack[-1] += elapsed
+
+        self.__record(node, elapsed - nested)
+
+    def update(self, node, dt: float) -> None:
+        """
+        Updates [node] and records the time it took.
+        """
+
+        self.__measure(node, node.update, dt)
+
+    def fixed_update(self, node, dt: float) -> None:
+        """
+        Fixed-updates [node] and records the time it took.
+        """
+
+        self.__measure(node, node.fixed_update, dt)
+
+    def end_frame(self) -> None:
+        """
+        Closes the current frame and publishes the most expensive entries to debug stats.
+        """
+
+        self.__last_frame = self.__frame
+        self.__frame = {}
+
+        # Clear previously published stats.
+        for key in [key for key in DEBUG_STATS.keys() if key.startswith(STATS_PREFIX)]:
+            clear_stat(key)
+
+        entries: list[tuple[str, float]] = sorted(self.__last_frame.items(), key = lambda entry: entry[1], reverse = True)
+        for key, elapsed in entries[:self.overlay_entries]:
+            set_stat(f"{STATS_PREFIX}{key}", f"{elapsed * 1000:.3f}ms")
+
+    def get_totals(self) -> dict[str, tuple[float, int]]:
+        """
+        Returns cumulative time (in s) and calls count by key.
+        """
+
+        return {key: (total[0], int(total[1])) for key, total in self.__totals.items()}
+
+    def get_last_frame(self) -> dict[str, float]:
+        """
+        Returns the time (in s) spent by key in the last frame.
+        """
+
+        return dict(self.__last_frame)
+
+    def dump(self) -> str:
+        """
+        Returns a text report of all recorded entries, sorted by cumulative time.
+        """
+
+        lines: list[str] = [f"{'node':<48}{'calls':>10}{'total ms':>12}{'avg us':>10}{'frame ms':>10}"]
+        for key, (total, calls) in sorted(self.get_totals().items(), key = lambda entry: entry[1][0], reverse = True):
+            lines.append(f"{key:<48}{calls:>10}{total * 1000:>12.3f}{total / calls * 1000000:>10.2f}{self.__last_frame.get(key, 0.0) * 1000:>10.3f}")
+
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Clears all recorded entries.
+        """
+
+        self.__totals.clear()
+        self.__frame.clear()
+        self.__last_frame.clear()
+
+PROFILER: UpdateProfiler = UpdateProfiler()
\ No newline at end of file
@@ -0,0 +1,350 @@
+"""
+This file contains the classes needed to preload and cache rooms, so that moving between them never stalls.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import sys
+from typing import Sequence
+import pyglet
+
+from amonite.debug_stats import set_stat
+from amonite.door_node import DoorNode
+from amonite.node import Node
+from amonite.tilemap_node import TilemapNode, Tileset
+from amonite.utils.hittables_loader import HittableNode, HittablesLoader
+from amonite.utils.tmx_loader import TmxLoader, TmxMap
+
+# Default maximum amount of memory (in bytes) used by cached rooms' map data.
+DEFAULT_MAX_MEMORY: int = 64 * 1024 * 1024
+
+class RoomSource:
+    """
+    Defines where a room's data is read from.
+    """
+
+    __slots__ = (
+        "tilemap_source",
+        "tilesets_path",
+        "hittables_source"
+    )
+
+    def __init__(
+        self,
+        tilemap_source: str,
+        tilesets_path: str,
+        hittables_source: str | None = None
+    ) -> None:
+        self.tilemap_source: str = tilemap_source
+        self.tilesets_path: str = tilesets_path
+        self.hittables_source: str | None = hittables_source
+
+class RoomData:
+    """
+    Preloaded room content: parsed data plus, optionally, graphics resources.
+    """
+
+    __slots__ = (
+        "tmx_map",
+        "hittables",
+        "tileset",
+        "size"
+    )
+
+    def __init__(
+        self,
+        tmx_map: TmxMap,
+        hittables: list[tuple[int, int, int, int, bool, list[str]]]
+    ) -> None:
+        self.tmx_map: TmxMap = tmx_map
+        self.hittables: list[tuple[int, int, int, int, bool, list[str]]] = hittables
+        self.tileset: Tileset | None = None
+
+        # Estimated memory footprint (in bytes) of map data only.
+        # Tileset textures live in the process-wide tileset cache, shared with other rooms, so they're left out.
+        self.size: int = self.__estimate_size()
+
+    def __estimate_size(self) -> int:
+        size: int = sys.getsizeof(self.hittables) + len(self.hittables) * sys.getsizeof(tuple(range(6)))
+        for (_, layer) in self.tmx_map.layers:
+            # Arrays know their own size, while lists hold one int object per tile.
+            size += getattr(layer, "nbytes", sys.getsizeof(layer) + len(layer) * sys.getsizeof(0))
+
+        return size
+
+    def set_tileset(self, tileset: Tileset) -> None:
+        self.tileset = tileset
+
+    def create_tilemaps(
+        self,
+        x: float = 0.0,
+        y: float = 0.0,
+        layers_spacing: int | None = None,
+        z_offset: int = 0,
+        batch: pyglet.graphics.Batch | None = None,
+        defer_build: bool = False
+    ) -> list[TilemapNode]:
+        """
+        Creates all tilemap layers of the room, reusing the preloaded tileset if any.
+        See [TilemapNode.from_tmx_map] for all parameters.
+        """
+
+        return TilemapNode.from_tmx_map(
+            tmx_map = self.tmx_map,
+            x = x,
+            y = y,
+            layers_spacing = layers_spacing,
+            z_offset = z_offset,
+            batch = batch,
+            defer_build = defer_build,
+            tileset = self.tileset
+        )
+
+    def create_hittables(
+        self,
+        batch: pyglet.graphics.Batch | None = None
+    ) -> list[HittableNode]:
+        """
+        Creates all hittables of the room.
+        """
+
+        return list(HittablesLoader.create(data = self.hittables, batch = batch))
+
+class RoomStreamer(Node):
+    """
+    Room streaming manager.
+
+    Preloads all rooms linked from the current room's doors in the background and keeps them in an LRU cache
+    bounded by memory, so that swapping rooms never requires a cold load.
+    The memory budget only covers map data (layers and hittables): tilesets are shared through the process-wide tileset cache
+    and are not released on eviction, use [Tileset.clear_cache] to free them.
+    The streamer should be updated every frame (e.g. by adding it to the current scene), since finished preloads
+    are collected and graphics resources are created on the main thread during [update].
+
+    Attributes
+    ----------
+    max_memory: int
+        Maximum amount of memory (in bytes) used by cached rooms' map data, tileset textures excluded.
+    preload_textures: bool
+        Whether to also preload graphics resources (tilesets) or not.
+    hits: int
+        Amount of room requests served from the cache (or from an already finished preload).
+    stalls: int
+        Amount of room requests that had to wait for a running preload to finish.
+    misses: int
+        Amount of room requests that required a cold load.
+    evictions: int
+        Amount of rooms evicted from the cache.
+    """
+
+    __slots__ = (
+        "max_memory",
+        "preload_textures",
+        "hits",
+        "stalls",
+        "misses",
+        "evictions",
+        "__rooms",
+        "__current",
+        "__linked",
+        "__cache",
+        "__pending",
+        "__executor"
+    )
+
+    def __init__(
+        self,
+        rooms: dict[str, RoomSource] | None = None,
+        max_memory: int = DEFAULT_MAX_MEMORY,
+        preload_textures: bool = False,
+        workers: int = 1
+    ) -> None:
+        super().__init__()
+
+        self.max_memory: int = max_memory
+        self.preload_textures: bool = preload_textures
+
+        self.hits: int = 0
+        self.stalls: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        # All known rooms by name.
+        self.__rooms: dict[str, RoomSource] = rooms if rooms is not None else {}
+
+        # Current room and rooms linked from it, these are never evicted.
+        self.__current: str | None = None
+        self.__linked: set[str] = set()
+
+        # Cached rooms, from the least to the most recently used.
+        self.__cache: OrderedDict[str, RoomData] = OrderedDict()
+
+        # Rooms currently being preloaded.
+        self.__pending: dict[str, Future] = {}
+
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = workers)
+
+    def add_room(
+        self,
+        name: str,
+        source: RoomSource
+    ) -> None:
+        self.__rooms[name] = source
+
+    def set_current(
+        self,
+        name: str,
+        doors: Sequence[DoorNode] | None = None
+    ) -> None:
+        """
+        Sets [name] as the current room and starts preloading all rooms linked by [doors].
+        Doors leading to rooms that are not registered (e.g. not streamed) are ignored.
+        """
+
+        self.__current = name
+        self.__linked = set(door.destination for door in doors if door.destination in self.__rooms) if doors is not None else set()
+
+        for room in self.__linked:
+            self.preload(room)
+
+    def preload(self, name: str) -> None:
+        """
+        Starts loading room [name] in the background, unless already cached or loading.
+        """
+
+        if name in self.__cache or name in self.__pending:
+            return
+
+        self.__pending[name] = self.__executor.submit(self.__read, self.__get_source(name))
+
+    def get(self, name: str) -> RoomData:
+        """
+        Returns room [name]'s data, loading it straight away if not preloaded or waiting for its preload to finish if still running.
+        """
+
+        room: RoomData
+        if name in self.__cache:
+            self.hits += 1
+            room = self.__cache[name]
+            self.__cache.move_to_end(name)
+        elif name in self.__pending:
+            # Preloading was already started, so just wait for it to complete if still running.
+            future: Future = self.__pending.pop(name)
+            if future.done():
+                self.hits += 1
+            else:
+                self.stalls += 1
+            room = future.result()
+            self.__store(name, room)
+        else:
+            self.misses += 1
+            room = self.__read(self.__get_source(name))
+            self.__store(name, room)
+
+        if self.preload_textures and room.tileset is None:
+            self.__load_tileset(room)
+
+        self.__update_stats()
+
+        return room
+
+    def update(self, dt: float) -> None:
+        super().update(dt = dt)
+
+        # Collect finished preloads.
+        for name, future in list(self.__pending.items()):
+            if not future.done():
+                continue
+
+            del self.__pending[name]
+            self.__store(name, future.result())
+
+        # Create graphics resources on the main thread, one room per frame at most.
+        if self.preload_textures:
+            for room in self.__cache.values():
+                if room.tileset is None:
+                    self.__load_tileset(room)
+                    break
+
+        self.__update_stats()
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stalls": self.stalls,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "cached": len(self.__cache),
+            "pending": len(self.__pending),
+            "memory": sum(room.size for room in self.__cache.values())
+        }
+
+    def clear(self) -> None:
+        """
+        Drops all cached rooms.
+        """
+
+        self.__cache.clear()
+
+    def delete(self) -> None:
+        self.__executor.shutdown(wait = False, cancel_futures = True)
+        self.__pending.clear()
+        self.__cache.clear()
+
+        super().delete()
+
+    def __get_source(self, name: str) -> RoomSource:
+        if name not in self.__rooms:
+            raise ValueError(f"Unknown room {name}, rooms should be registered through add_room before being loaded")
+
+        return self.__rooms[name]
+
+    @staticmethod
+    def __read(source: RoomSource) -> RoomData:
+        """
+        Reads and parses all room files, no graphics resource is created.
+        """
+
+        return RoomData(
+            tmx_map = TmxLoader.fetch(
+                source = source.tilemap_source,
+                tilesets_path = source.tilesets_path
+            ),
+            hittables = HittablesLoader.read(source = source.hittables_source) if source.hittables_source is not None else []
+        )
+
+    @staticmethod
+    def __load_tileset(room: RoomData) -> None:
+        room.set_tileset(Tileset.fetch(
+            sources = room.tmx_map.tileset_sources,
+            tile_width = room.tmx_map.tile_width,
+            tile_height = room.tmx_map.tile_height
+        ))
+
+    def __store(self, name: str, room: RoomData) -> None:
+        self.__cache[name] = room
+        self.__cache.move_to_end(name)
+        self.__evict()
+
+    def __evict(self) -> None:
+        """
+        Evicts least recently used rooms until the cache fits in memory.
+        The current room and all rooms linked to it are never evicted.
+        """
+
+        memory: int = sum(room.size for room in self.__cache.values())
+
+        for name in list(self.__cache.keys()):
+            if memory <= self.max_memory:
+                break
+
+            if name == self.__current or name in self.__linked:
+                continue
+
+            memory -= self.__cache.pop(name).size
+            self.evictions += 1
+
+    def __update_stats(self) -> None:
+        stats: dict[str, int] = self.get_stats()
+        set_stat("rooms", f"{stats['cached']} cached, {stats['pending']} pending, {stats['memory'] // 1024}KB")
+        set_stat("rooms cache", f"{stats['hits']} hits, {stats['stalls']} stalls, {stats['misses']} misses, {stats['evictions']} evictions")
\ No newline at end of file
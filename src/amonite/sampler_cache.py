@@ -0,0 +1,132 @@
+"""
+This file contains the texture cache used to upload sampler images (e.g. palettes) to the GPU once.
+"""
+
+import hashlib
+import pyglet
+import pyglet.gl as gl
+
+from amonite.debug_stats import set_stat
+
+class SamplerTextureCache:
+    """
+    Reference-counted cache of sampler textures.
+
+    Each image is uploaded at most once, on first use, and shared by all its users:
+    images are recognized by identity first and by content hash otherwise, so that
+    the same palette loaded twice still results in a single texture.
+    Textures are freed as soon as their last user releases them.
+    """
+
+    __slots__ = (
+        "__entries",
+        "__identities"
+    )
+
+    def __init__(self) -> None:
+        # Textures by content key, as [texture id (0 if not uploaded yet), references count, image] lists.
+        self.__entries: dict[tuple[int, int, bytes], list] = {}
+
+        # Content keys by image identity, as [image, content key, references count] lists.
+        # Images are referenced in order for their identity to stay valid.
+        self.__identities: dict[int, list] = {}
+
+    def acquire(self, image: pyglet.image.ImageData) -> tuple[int, int, bytes]:
+        """
+        Registers a new user of [image] and returns its key.
+        """
+
+        identity: list | None = self.__identities.get(id(image))
+        if identity is None:
+            # Only hash images the first time they're seen.
+            data: bytes = image.get_data("RGBA", image.width * 4)
+            identity = [image, (image.width, image.height, hashlib.blake2b(data, digest_size = 16).digest()), 0]
+            self.__identities[id(image)] = identity
+
+        identity[2] += 1
+
+        key: tuple[int, int, bytes] = identity[1]
+        entry: list | None = self.__entries.get(key)
+        if entry is None:
+            entry = [0, 0, image]
+            self.__entries[key] = entry
+
+        entry[1] += 1
+
+        self.__update_stats()
+
+        return key
+
+    def release(self, image: pyglet.image.ImageData) -> None:
+        """
+        Unregisters a user of [image], its texture is freed once no user is left.
+        """
+
+        identity: list | None = self.__identities.get(id(image))
+        if identity is None:
+            return
+
+        identity[2] -= 1
+        if identity[2] <= 0:
+            del self.__identities[id(image)]
+
+        entry: list = self.__entries[identity[1]]
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.__entries[identity[1]]
+
+            if entry[0] != 0 and gl.current_context is not None:
+                gl.current_context.delete_texture(entry[0])
+
+        self.__update_stats()
+
+    def get_texture_id(self, key: tuple[int, int, bytes]) -> int:
+        """
+        Returns the id of the texture for [key], uploading its image if not done yet.
+        """
+
+        entry: list = self.__entries[key]
+        if entry[0] == 0:
+            entry[0] = self.__upload(entry[2])
+            entry[2] = None
+
+        return entry[0]
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "textures": len(self.__entries),
+            "uploaded": sum(1 for entry in self.__entries.values() if entry[0] != 0),
+            "references": sum(entry[1] for entry in self.__entries.values())
+        }
+
+    @staticmethod
+    def __upload(image: pyglet.image.ImageData) -> int:
+        texture_id: gl.GLuint = gl.GLuint()
+        gl.glGenTextures(1, texture_id)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
+
+        # Samplers are lookup tables, so never filter nor repeat them.
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+
+        gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+        gl.glTexImage2D(
+            gl.GL_TEXTURE_2D,
+            0,
+            gl.GL_RGBA,
+            image.width,
+            image.height,
+            0,
+            gl.GL_RGBA,
+            gl.GL_UNSIGNED_BYTE,
+            image.get_data("RGBA", image.width * 4)
+        )
+
+        return texture_id.value
+
+    def __update_stats(self) -> None:
+        set_stat("samplers", f"{len(self.__entries)} textures, {len(self.__identities)} images")
+
+SAMPLER_CACHE: SamplerTextureCache = SamplerTextureCache()
\ No newline at end of file
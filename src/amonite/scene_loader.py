@@ -0,0 +1,313 @@
+"""
+This file contains the classes needed to load scene resources without blocking the main thread.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import time
+from typing import Any, Callable, Generator
+import pyglet
+
+from amonite.animation import Animation
+from amonite.loading_indicator_node import LoadingIndicatorNode
+from amonite.node import Node
+from amonite.tilemap_node import TilemapNode, Tileset
+from amonite.tracer import TRACER
+from amonite.utils.hittables_loader import HittableNode, HittablesLoader
+from amonite.utils.tmx_loader import TmxLoader, TmxMap
+
+# Default amount of time (in s) spent each frame creating graphics resources.
+DEFAULT_FRAME_BUDGET: float = 0.004
+
+class LoadingJob:
+    """
+    Single loading job: parsing runs on a worker thread, while building runs on the main thread in small steps.
+    """
+
+    __slots__ = (
+        "future",
+        "build",
+        "on_loaded",
+        "steps",
+        "progress",
+        "done"
+    )
+
+    def __init__(
+        self,
+        future: Future,
+        build: Callable[[Any], Generator[float, None, Any]],
+        on_loaded: Callable[[Any], None] | None = None
+    ) -> None:
+        # Parsing result, provided by the worker thread.
+        self.future: Future = future
+
+        # Generator function that takes the parsing result and creates all graphics resources.
+        # The generator yields its progress (between 0 and 1) and returns the final result.
+        self.build: Callable[[Any], Generator[float, None, Any]] = build
+
+        # Callback for handling the final result.
+        self.on_loaded: Callable[[Any], None] | None = on_loaded
+
+        self.steps: Generator[float, None, Any] | None = None
+        self.progress: float = 0.0
+        self.done: bool = False
+
+class SceneLoader(Node):
+    """
+    Asynchronous scene resources loader.
+
+    File reads and parsing run on worker threads, while graphics resources are created on the main thread
+    (in [update]) under a per-frame time budget, so that the window never freezes while a scene loads.
+    The loader can be added to a scene as a child in order to be updated automatically.
+
+    Attributes
+    ----------
+    frame_budget: float
+        Maximum amount of time (in s) spent creating graphics resources each frame.
+    indicator: LoadingIndicatorNode | None
+        Loading indicator to report the overall progress to.
+    on_done: Callable[[], None] | None
+        Callback called once all queued jobs are done.
+    """
+
+    __slots__ = (
+        "frame_budget",
+        "indicator",
+        "on_done",
+        "__executor",
+        "__jobs"
+    )
+
+    def __init__(
+        self,
+        frame_budget: float = DEFAULT_FRAME_BUDGET,
+        indicator: LoadingIndicatorNode | None = None,
+        on_done: Callable[[], None] | None = None,
+        workers: int | None = None
+    ) -> None:
+        super().__init__()
+
+        self.frame_budget: float = frame_budget
+        self.indicator: LoadingIndicatorNode | None = indicator
+        self.on_done: Callable[[], None] | None = on_done
+
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = workers)
+        self.__jobs: list[LoadingJob] = []
+
+    def load(
+        self,
+        parse: Callable[[], Any],
+        build: Callable[[Any], Generator[float, None, Any]],
+        on_loaded: Callable[[Any], None] | None = None
+    ) -> None:
+        """
+        Queues a generic loading job.
+
+        [parse] runs on a worker thread and must not touch any graphics resource.
+        [build] is a generator function that takes the parsing result, creates all graphics resources
+        yielding its progress (between 0 and 1) and finally returns the result, which is passed to [on_loaded].
+        """
+
+        self.__jobs.append(LoadingJob(
+            future = self.__executor.submit(parse),
+            build = build,
+            on_loaded = on_loaded
+        ))
+
+    def load_tilemap(
+        self,
+        source: str,
+        tilesets_path: str,
+        x: float = 0.0,
+        y: float = 0.0,
+        layers_spacing: int | None = None,
+        z_offset: int = 0,
+        batch: pyglet.graphics.Batch | None = None,
+        on_loaded: Callable[[list[TilemapNode]], None] | None = None
+    ) -> None:
+        """
+        Queues the loading of all tilemap layers from the TMX file provided in [source].
+        Tileset images are decoded on the worker thread as well, only their upload to textures runs on the main thread.
+        See [TilemapNode.from_tmx_file] for all parameters.
+        """
+
+        def parse() -> tuple[TmxMap, list[pyglet.image.ImageData] | None]:
+            tmx_map: TmxMap = TmxLoader.fetch(
+                source = source,
+                tilesets_path = tilesets_path
+            )
+
+            # Cached tilesets are reused as they are, so there's no need to decode their images again.
+            images: list[pyglet.image.ImageData] | None = None
+            if not Tileset.is_cached(
+                sources = tmx_map.tileset_sources,
+                tile_width = tmx_map.tile_width,
+                tile_height = tmx_map.tile_height
+            ):
+                images = Tileset.read_images(sources = tmx_map.tileset_sources)
+
+            return (tmx_map, images)
+
+        def build(data: tuple[TmxMap, list[pyglet.image.ImageData] | None]) -> Generator[float, None, list[TilemapNode]]:
+            (tmx_map, images) = data
+
+            tilemaps: list[TilemapNode] = TilemapNode.from_tmx_map(
+                tmx_map = tmx_map,
+                x = x,
+                y = y,
+                layers_spacing = layers_spacing,
+                z_offset = z_offset,
+                batch = batch,
+                defer_build = True,
+                tileset = Tileset.fetch(
+                    sources = tmx_map.tileset_sources,
+                    tile_width = tmx_map.tile_width,
+                    tile_height = tmx_map.tile_height,
+                    images = images
+                )
+            )
+
+            # Build all layers one after the other.
+            for tilemap_index, tilemap in enumerate(tilemaps):
+                for progress in tilemap.build():
+                    yield (tilemap_index + progress) / len(tilemaps)
+
+            return tilemaps
+
+        self.load(
+            parse = parse,
+            build = build,
+            on_loaded = on_loaded
+        )
+
+    def load_hittables(
+        self,
+        source: str,
+        batch: pyglet.graphics.Batch | None = None,
+        on_loaded: Callable[[list[HittableNode]], None] | None = None
+    ) -> None:
+        """
+        Queues the loading of all hittables from the file provided in [source].
+        """
+
+        def build(data: list[tuple[int, int, int, int, bool, list[str]]]) -> Generator[float, None, list[HittableNode]]:
+            hittables: list[HittableNode] = []
+
+            for hittable in HittablesLoader.create(data = data, batch = batch):
+                hittables.append(hittable)
+                yield len(hittables) / len(data)
+
+            return hittables
+
+        self.load(
+            parse = lambda: HittablesLoader.read(source = source),
+            build = build,
+            on_loaded = on_loaded
+        )
+
+    def load_animation(
+        self,
+        source: str,
+        on_loaded: Callable[[Animation], None] | None = None
+    ) -> None:
+        """
+        Queues the loading of the animation defined by the file provided in [source].
+        """
+
+        def build(source_data: dict[str, Any]) -> Generator[float, None, Animation]:
+            yield 0.0
+
+            return Animation(
+                source = source,
+                source_data = source_data
+            )
+
+        self.load(
+            parse = lambda: Animation.read_definition(source = source),
+            build = build,
+            on_loaded = on_loaded
+        )
+
+    def get_progress(self) -> float:
+        """
+        Returns the overall progress (between 0 and 1) of all queued jobs.
+        Parsing and building account for half of each job.
+        """
+
+        if len(self.__jobs) <= 0:
+            return 1.0
+
+        progress: float = 0.0
+        for job in self.__jobs:
+            if job.done:
+                progress += 1.0
+            elif job.future.done():
+                progress += 0.5 + job.progress * 0.5
+
+        return progress / len(self.__jobs)
+
+    def is_done(self) -> bool:
+        """
+        Tells whether all queued jobs are done or not.
+        """
+
+        return all(job.done for job in self.__jobs)
+
+    def update(self, dt: float) -> None:
+        super().update(dt = dt)
+
+        # Just return if there's nothing left to do.
+        if self.is_done():
+            return
+
+        with TRACER.span("SceneLoader.update", "loader"):
+            self.__build_jobs()
+
+        if self.indicator is not None:
+            self.indicator.set_fill(min(max(self.get_progress(), 0.0), 1.0))
+
+        if self.is_done():
+            self.__jobs.clear()
+
+            if self.on_done is not None:
+                self.on_done()
+
+    def __build_jobs(self) -> None:
+        """
+        Builds all parsed jobs, in order, until the frame budget is exhausted.
+        """
+
+        start_time: float = time.perf_counter()
+
+        # Jobs are built in order, so that results are delivered in the same order they were requested.
+        for job in self.__jobs:
+            if job.done:
+                continue
+
+            # Wait for the worker thread to complete parsing.
+            if not job.future.done():
+                break
+
+            if job.steps is None:
+                # Raises any error that occurred while parsing.
+                job.steps = job.build(job.future.result())
+
+            # Build until done or until the frame budget is exhausted.
+            while not job.done and time.perf_counter() - start_time < self.frame_budget:
+                try:
+                    job.progress = next(job.steps)
+                except StopIteration as stop:
+                    job.done = True
+                    job.progress = 1.0
+                    if job.on_loaded is not None:
+                        job.on_loaded(stop.value)
+
+            if not job.done:
+                break
+
+    def delete(self) -> None:
+        # Drop any pending parsing.
+        self.__executor.shutdown(wait = False, cancel_futures = True)
+        self.__jobs.clear()
+
+        super().delete()
\ No newline at end of file
@@ -6,15 +6,22 @@ import pyglet
 import pyglet.math as pm
 
 from amonite.camera import Camera
+from amonite.debug_draw import DEBUG_DRAW
+from amonite.debug_stats import set_stat
 from amonite.settings import GLOBALS, SETTINGS, Keys
-from amonite.node import Node, PositionNode
+from amonite.node import Node, PositionNode, RenderState
+from amonite.profiler import PROFILER
 from amonite.shapes.rect_node import RectNode
 from amonite.text_node import TextNode
+from amonite.tracer import TRACER
 from amonite.utils.tween import Tween
 
 # Defines at which point the scene should be considered started while the curtain is opening.
 SCENE_START_THRESHOLD: float = 0.4
 
+# Minimum camera movement (in scaled pixels) requiring a new frame when rendering on demand.
+CAMERA_EPSILON: float = 0.01
+
 class Bounds:
     def __init__(
         self,
@@ -49,6 +56,16 @@ class Bounds:
             self.top - self.bottom
         )
 
+class SceneBatch(pyglet.graphics.Batch):
+    """
+    Batch owned by a scene, through which nodes drawing to it can request new frames from the scene (see [Node.mark_dirty]).
+    """
+
+    def __init__(self, render_state: RenderState) -> None:
+        super().__init__()
+
+        self.render_state: RenderState = render_state
+
 class SceneNode(Node):
     def __init__(
         self,
@@ -61,19 +78,27 @@ class SceneNode(Node):
         default_cam_speed: float = 10.0,
         curtain_speed: float = 1.0,
         curtain_z: float = 0.0,
-        cam_bounds: Bounds | None = None
+        cam_bounds: Bounds | None = None,
+        render_on_demand: bool = False
     ):
         self.__view_width: int = view_width
         self.__view_height: int = view_height
 
         self.__on_scene_end: Callable[[], None] | None = on_scene_end
         self.__on_scene_start: Callable[[], None] | None = on_scene_start
-        self.world_batch: pyglet.graphics.Batch = pyglet.graphics.Batch()
-        self.ui_batch: pyglet.graphics.Batch = pyglet.graphics.Batch()
+        # Whether anything visible changed since the last draw, shared by the scene batches.
+        self.render_state: RenderState = RenderState()
+
+        self.world_batch: pyglet.graphics.Batch = SceneBatch(render_state = self.render_state)
+        self.ui_batch: pyglet.graphics.Batch = SceneBatch(render_state = self.render_state)
 
         # Tells whether the scene should be updating its children or not.
         self.__frozen: bool = False
 
+        # Tells whether the scene should only be drawn when something visible changed (see [needs_draw]).
+        # Meant for mostly static screens (menus, dialogs, pause screens).
+        self.render_on_demand: bool = render_on_demand
+
         # Create a new camera.
         self.__camera: Camera | None = Camera(
             window = window
@@ -89,6 +114,9 @@ class SceneNode(Node):
         # list of all children.
         self.__children: list[Node] = []
 
+        # Last view bounds children were culled with.
+        self.__view_bounds: tuple[float, float, float, float] | None = None
+
         # Scene title.
         if title is not None and SETTINGS[Keys.DEBUG]:
             label = TextNode(
@@ -122,19 +150,93 @@ class SceneNode(Node):
             int(self.__view_height * GLOBALS[Keys.SCALING])
         )
 
+    def get_view_bounds(self) -> tuple[float, float, float, float] | None:
+        """
+        Returns the area (in scaled pixels) currently visible through the camera, defined as (x, y, width, height).
+        """
+
+        if self.__camera is None:
+            return None
+
+        scaled_view_size: tuple[int, int] = self.get_scaled_view_size()
+
+        return (
+            self.__camera.position[0],
+            self.__camera.position[1],
+            scaled_view_size[0] / self.__camera.zoom,
+            scaled_view_size[1] / self.__camera.zoom
+        )
+
+    def __cull(self) -> None:
+        """
+        Culls all children against the current view, only if the view changed since the last call.
+        """
+
+        view_bounds: tuple[float, float, float, float] | None = self.get_view_bounds()
+
+        if view_bounds is None or view_bounds == self.__view_bounds:
+            return
+
+        self.__view_bounds = view_bounds
+        for child in self.__children:
+            child.cull(view_bounds = view_bounds)
+
+    def needs_draw(self) -> bool:
+        """
+        Tells whether the scene should be drawn this frame.
+        Always True unless rendering on demand, in which case it's only True if any node marked a visual change since the last draw
+        (see [Node.mark_dirty]).
+        When False, the last drawn frame can be presented again, or drawing and flipping skipped altogether.
+        """
+
+        return not self.render_on_demand or self.render_state.dirty
+
+    def mark_dirty(self) -> None:
+        self.render_state.dirty = True
+
     def draw(self):
-        if self.__camera is not None:
-            with self.__camera:
-                self.world_batch.draw()
+        self.render_state.dirty = False
 
-        # Draw UI elements.
-        self.ui_batch.draw()
+        with TRACER.span("SceneNode.draw"):
+            self.__cull()
 
-        # Draw curtain as last element.
-        if self.__curtain is not None and self.__curtain_opacity_fill >= 0.0:
-            self.__curtain.draw()
+            if self.__camera is not None:
+                with self.__camera, TRACER.span("SceneNode.draw.world"):
+                    self.world_batch.draw()
+
+                    # Draw all debug geometry on top of the world.
+                    if SETTINGS[Keys.DEBUG]:
+                        DEBUG_DRAW.draw()
+
+            # Draw UI elements.
+            with TRACER.span("SceneNode.draw.ui"):
+                self.ui_batch.draw()
+
+            # Draw curtain as last element.
+            if self.__curtain is not None and self.__curtain_opacity_fill >= 0.0:
+                self.__curtain.draw()
+
+            if SETTINGS[Keys.DEBUG]:
+                self.__update_batch_stats()
+
+    def __update_batch_stats(self) -> None:
+        """
+        Publishes the amount of distinct groups (and draw calls) per batch.
+        Sprites sharing the same state share the same group, so fewer groups mean fewer state changes.
+        """
+
+        for (name, batch) in (("world", self.world_batch), ("ui", self.ui_batch)):
+            domains: list[int] = [
+                sum(1 for domain in domain_map.values() if not domain.is_empty)
+                for domain_map in batch.group_map.values()
+            ]
+            set_stat(f"{name} groups", f"{sum(1 for count in domains if count > 0)} groups, {sum(domains)} draws")
 
     def __update_curtain(self, dt):
+        # The curtain is drawn on its own, so its changes are not detected through the scene batches.
+        if self.__curtain_opening or self.__curtain_closing:
+            self.mark_dirty()
+
         if self.__curtain_opening:
             self.__curtain_opacity_fill -= self.__curtain_speed * dt
 
@@ -204,6 +306,10 @@ class SceneNode(Node):
             if self.__cam_impulse.length() < 0.0:
                 self.__cam_impulse = pyglet.math.Vec2(0.0, 0.0)
 
+            # Only request a new frame if the camera visibly moved, since it approaches its target asymptotically.
+            if abs(updated_x - self.__camera.position[0]) > CAMERA_EPSILON or abs(updated_y - self.__camera.position[1]) > CAMERA_EPSILON:
+                self.mark_dirty()
+
             # Actually update camera position.
             self.__camera.position = (
                 updated_x,
@@ -231,24 +337,35 @@ class SceneNode(Node):
     def update(self, dt: float) -> None:
         super().update(dt = dt)
 
-        # Update curtain.
-        self.__update_curtain(dt)
+        with TRACER.span("SceneNode.update"):
+            # Update curtain.
+            self.__update_curtain(dt)
 
-        # Update all children if not frozen.
-        if not self.__frozen:
-            for child in self.__children:
-                child.update(dt = dt)
+            # Update all children if not frozen.
+            if not self.__frozen:
+                if PROFILER.enabled:
+                    for child in self.__children:
+                        PROFILER.update(child, dt = dt)
+                else:
+                    for child in self.__children:
+                        child.update(dt = dt)
 
-        # Update camera.
-        self.__update_camera(dt)
+            # Update camera.
+            with TRACER.span("SceneNode.camera"):
+                self.__update_camera(dt)
 
     def fixed_update(self, dt):
         super().fixed_update(dt = dt)
 
-        # Update all children if not frozen.
-        if not self.__frozen:
-            for child in self.__children:
-                child.fixed_update(dt = dt)
+        with TRACER.span("SceneNode.fixed_update"):
+            # Update all children if not frozen.
+            if not self.__frozen:
+                if PROFILER.enabled:
+                    for child in self.__children:
+                        PROFILER.fixed_update(child, dt = dt)
+                else:
+                    for child in self.__children:
+                        child.fixed_update(dt = dt)
 
     def get_cam_bounds(self) -> Bounds | None:
         return self.__cam_bounds
@@ -327,6 +444,11 @@ class SceneNode(Node):
         # Only add the provided child if not already added.
         if child not in self.__children:
             self.__children.append(child)
+            self.mark_dirty()
+
+            # Cull the new child against the current view straight away.
+            if self.__view_bounds is not None:
+                child.cull(view_bounds = self.__view_bounds)
 
     def remove_child(self, child: Node | PositionNode):
         """
@@ -335,6 +457,7 @@ class SceneNode(Node):
 
         if child in self.__children:
             self.__children.remove(child)
+            self.mark_dirty()
 
     def add_children(
         self,
@@ -345,6 +468,13 @@ class SceneNode(Node):
                 child = child
             )
 
+    def get_children(self) -> list[Node]:
+        """
+        Returns a copy of the list of all scene children.
+        """
+
+        return list(self.__children)
+
     def contains(
         self,
         child: Node | PositionNode
@@ -21,6 +21,9 @@ class Keys(str, Enum):
     CAMERA_SPEED = "camera_speed"
     LAYERS_Z_SPACING = "layers_z_spacing"
     TILEMAP_BUFFER = "tilemap_buffer"
+    TILEMAP_CHUNK_SIZE = "tilemap_chunk_size"
+    BAKE_STATIC_LAYERS = "bake_static_layers"
+    TILESET_ATLAS_EXTRUDE = "tileset_atlas_extrude"
     SOUND = "sound"
     MUSIC = "music"
     SFX = "sfx"
@@ -60,6 +63,16 @@ SETTINGS: dict[str, bool | float | int | str] = {
     Keys.LAYERS_Z_SPACING: 32.0,
     Keys.TILEMAP_BUFFER: 2,
 
+    # Size (in tiles) of tilemap chunks, 0 disables chunking and creates one sprite per tile.
+    Keys.TILEMAP_CHUNK_SIZE: 0,
+
+    # Defines whether non z-sorted tilemap layers are baked into textures or not.
+    # Baked chunks are drawn as one quad per tile row, so each row keeps the z its tiles would have.
+    Keys.BAKE_STATIC_LAYERS: False,
+
+    # Pixels extruded around each tile when packing tilesets into an atlas, 0 disables atlas packing.
+    Keys.TILESET_ATLAS_EXTRUDE: 0,
+
     # Sounds settings.
     Keys.SOUND: True,
     Keys.MUSIC: True,
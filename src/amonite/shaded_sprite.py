@@ -1,7 +1,11 @@
-from pyglet.image import ImageData
+import weakref
 import pyglet
 import pyglet.gl as gl
 
+from amonite.node import mark_batch_dirty
+from amonite.sampler_cache import SAMPLER_CACHE
+from amonite.shaders_utils import get_shader_program
+
 FRAGMENT_SOURCE = """
     #version 150 core
     in vec4 vertex_colors;
@@ -25,9 +29,10 @@ FRAGMENT_SOURCE = """
         }
     }
 """
-vert_shader = pyglet.graphics.shader.Shader(pyglet.sprite.vertex_source, "vertex")
-frag_shader = pyglet.graphics.shader.Shader(FRAGMENT_SOURCE, "fragment")
-depth_shader_program = pyglet.graphics.shader.ShaderProgram(vert_shader, frag_shader)
+depth_shader_program = get_shader_program(pyglet.sprite.vertex_source, FRAGMENT_SOURCE)
+
+# All live sprite groups by state, see [ShadedSpriteGroup.get].
+GROUPS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
 
 class ShadedSpriteGroup(pyglet.sprite.SpriteGroup):
     def __init__(
@@ -46,42 +51,78 @@ class ShadedSpriteGroup(pyglet.sprite.SpriteGroup):
         self.program = program
         self.samplers_2d = samplers_2d
 
+        # Sampler2D uniforms to set, as (uniform name, texture unit, sampler texture key) tuples.
+        # Texture unit 0 is left to the sprite texture.
+        # Sampler textures are uploaded (once) by the shared cache, so binding them is all that's left to do on draw.
+        self.samplers: list[tuple[str, int, tuple]] = []
+        if samplers_2d is not None:
+            for (name, image) in samplers_2d.items():
+                # Make sure the program has a related uniform.
+                if name in program.uniforms:
+                    self.samplers.append((name, len(self.samplers) + 1, SAMPLER_CACHE.acquire(image)))
+
+    @classmethod
+    def get(
+        cls,
+        texture,
+        blend_src: int = gl.GL_SRC_ALPHA,
+        blend_dest: int = gl.GL_ONE_MINUS_SRC_ALPHA,
+        program: pyglet.graphics.shader.ShaderProgram = depth_shader_program,
+        parent: pyglet.graphics.Group | None = None,
+        samplers_2d: dict[str, pyglet.image.ImageData] | None = None
+    ):
+        """
+        Returns the group for the provided state, only creating it if no group with the same state is alive.
+        """
+
+        key: tuple = (
+            cls,
+            program,
+            parent,
+            texture.target,
+            texture.id,
+            blend_src,
+            blend_dest,
+            tuple((name, id(image)) for name, image in samplers_2d.items()) if samplers_2d is not None else ()
+        )
+
+        group: ShadedSpriteGroup | None = GROUPS.get(key)
+        if group is None:
+            group = cls(
+                texture = texture,
+                blend_src = blend_src,
+                blend_dest = blend_dest,
+                program = program,
+                parent = parent,
+                samplers_2d = samplers_2d
+            )
+            GROUPS[key] = group
+
+        return group
+
+    def __eq__(self, other) -> bool:
+        return (
+            super().__eq__(other) and
+            self.samplers == other.samplers
+        )
+
+    def __hash__(self) -> int:
+        return hash((super().__hash__(), tuple(self.samplers)))
+
+    def __del__(self):
+        # Let the cache free sampler textures no longer in use.
+        if self.samplers_2d is not None:
+            for (name, _unit, _key) in self.samplers:
+                SAMPLER_CACHE.release(self.samplers_2d[name])
+
     def set_state(self):
         self.program.use()
 
-        # Set sampler2D uniforms.
-        if self.samplers_2d is not None:
-            sampler_2d_uniforms: list = list(filter(lambda element : element.type == gl.GL_SAMPLER_2D, self.program.uniforms.values()))
-            # Generate sampler2D textures.
-            textures: list = [0] * len(sampler_2d_uniforms)
-            textures_ctype = (gl.GLuint * len(textures))(*textures)
-            gl.glGenTextures(len(sampler_2d_uniforms), textures_ctype)
-
-            # Loop through sampler2D uniforms.
-            for uniform_index, uniform in enumerate(sampler_2d_uniforms):
-                if self.samplers_2d is None:
-                    continue
-
-                # Make sure self has an related uniform value.
-                if uniform.name in self.samplers_2d.keys():
-                    # Prepare the texture to be read by the shader.
-                    image: ImageData = self.samplers_2d[uniform.name]
-                    width: int = image.width
-                    height: int = image.height
-                    image_data: bytes = image.get_data("RGB", width * 3)
-
-                    # Pass the generated texture to GPU memory.
-                    gl.glActiveTexture(gl.GL_TEXTURE0 + uniform_index)
-                    gl.glEnable(gl.GL_TEXTURE_2D)
-                    gl.glBindTexture(gl.GL_TEXTURE_2D, textures_ctype[0])
-                    gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGB, width, height, 0, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, image_data)
-
-                    # Make sure the texture is properly set up.
-                    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
-                    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
-                    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
-                    gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
-                    self.program["palette"] = uniform_index
+        # Bind sampler2D textures.
+        for (name, unit, key) in self.samplers:
+            gl.glActiveTexture(gl.GL_TEXTURE0 + unit)
+            gl.glBindTexture(gl.GL_TEXTURE_2D, SAMPLER_CACHE.get_texture_id(key))
+            self.program[name] = unit
 
         gl.glActiveTexture(gl.GL_TEXTURE0)
         gl.glBindTexture(self.texture.target, self.texture.id)
@@ -93,12 +134,6 @@ class ShadedSpriteGroup(pyglet.sprite.SpriteGroup):
         gl.glDepthFunc(gl.GL_LESS)
 
     def unset_state(self):
-        # Clean up any set sampler2D uniform.
-        if self.samplers_2d is not None:
-            for uniform_index in range(0, len(self.program.uniforms)):
-                gl.glActiveTexture(gl.GL_TEXTURE0 + uniform_index)
-                gl.glDisable(gl.GL_TEXTURE_2D)
-
         gl.glDisable(gl.GL_BLEND)
         gl.glDisable(gl.GL_DEPTH_TEST)
         self.program.stop()
@@ -120,6 +155,9 @@ class ShadedSprite(pyglet.sprite.Sprite):
         program: pyglet.graphics.shader.ShaderProgram | None = None,
         samplers_2d: dict[str, pyglet.image.ImageData] | None = None
     ):
+        # Samplers need to be known by the time the first group is created.
+        self.samplers_2d = samplers_2d
+
         super().__init__(
             img,
             x,
@@ -134,18 +172,45 @@ class ShadedSprite(pyglet.sprite.Sprite):
             program if program is not None else depth_shader_program
         )
 
-        self.samplers_2d = samplers_2d
-
-        # Replace group with a new one that has samplers.
-        self.group = self.group_class(
+    def get_sprite_group(self):
+        # Groups are interned, so that sprites sharing the same state share the same group and batch into a single draw.
+        return self.group_class.get(
             texture = self._texture,
-            blend_src = blend_src,
-            blend_dest = blend_dest,
-            program = self.program,
-            parent = group,
-            samplers_2d = samplers_2d
+            blend_src = self._blend_src,
+            blend_dest = self._blend_dest,
+            program = self._program,
+            parent = self._user_group,
+            samplers_2d = self.samplers_2d
         )
 
+    def _set_texture(self, texture):
+        # Textures are compared by value, so that frames sharing the same (atlas) texture only update texture coordinates
+        # instead of recreating the vertex list.
+        if texture.id != self._texture.id or texture.target != self._texture.target:
+            self._vertex_list.delete()
+            self._texture = texture
+            self._group = self.get_sprite_group()
+            self._create_vertex_list()
+        else:
+            # Frames may differ in size or anchor, in which case the quad needs to be rebuilt as well.
+            resized: bool = (
+                texture.width != self._texture.width or
+                texture.height != self._texture.height or
+                texture.anchor_x != self._texture.anchor_x or
+                texture.anchor_y != self._texture.anchor_y
+            )
+
+            self._texture = texture
+            self._vertex_list.tex_coords[:] = texture.tex_coords
+            if resized:
+                self._vertex_list.position[:] = self._get_vertices()
+
+        self._texture = texture
+
+        # Animation frames change without any node involved, so the owning scene is marked from here.
+        if self._visible:
+            mark_batch_dirty(self._batch)
+
     def get_frames_num(self) -> int:
         """
         Returns the amount of frames in the current animation.
@@ -167,71 +232,4 @@ class ShadedSprite(pyglet.sprite.Sprite):
         Returns the texture currently being displayed.
         """
 
-        return self._texture
-
-    @property
-    def group(self):
-        """Parent graphics group.
-
-        The sprite can change its rendering group, however this can be an
-        expensive operation.
-
-        :type: :py:class:`pyglet.graphics.Group`
-        """
-        return self._group.parent
-
-    @group.setter
-    def group(self, group):
-        if self._group.parent == group:
-            return
-        self._group = self.group_class(
-            texture = self._texture,
-            blend_src = self._group.blend_src,
-            blend_dest = self._group.blend_dest,
-            program = self._group.program,
-            parent = group,
-            samplers_2d = self.samplers_2d
-        )
-
-        if self._batch is not None:
-            self._batch.migrate(self._vertex_list, gl.GL_TRIANGLES, self._group, self._batch)
-
-    # This method is overridden because the group needs to have all samplers by the time it draws to screen.
-    def _set_texture(self, texture):
-        if texture.id is not self._texture.id:
-            self._group = self._group.__class__(
-                texture = texture,
-                blend_src = self._group.blend_src,
-                blend_dest = self._group.blend_dest,
-                program = self._group.program,
-                parent = self._group.parent,
-                samplers_2d = self.samplers_2d
-            )
-            if self._vertex_list is not None:
-                self._vertex_list.delete()
-            self._texture = texture
-            self._create_vertex_list()
-        else:
-            if self._vertex_list is not None:
-                self._vertex_list.tex_coords[:] = texture.tex_coords
-        self._texture = texture
-
-    @property
-    def program(self):
-        return self._program
-
-    @program.setter
-    def program(self, program):
-        if self._program == program:
-            return
-        self._group = self.group_class(
-            texture = self._texture,
-            blend_src = self._group.blend_src,
-            blend_dest = self._group.blend_dest,
-            program = program,
-            parent = self._group,
-            samplers_2d = self.samplers_2d
-        )
-        if self._batch is not None:
-            self._batch.migrate(self._vertex_list, gl.GL_TRIANGLES, self._group, self._batch)
-        self._program = program
\ No newline at end of file
+        return self._texture
\ No newline at end of file
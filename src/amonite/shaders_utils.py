@@ -1,8 +1,14 @@
+from typing import Any
+import pyglet
+
 # import pyglet
 # pyglet.sprite.vertex_source
 # pyglet.sprite.fragment_source
 # pyglet.sprite.fragment_array_source
 
+# All compiled shader programs by (vertex source, fragment source, defines).
+SHADER_PROGRAMS: dict[tuple[str, str, tuple[tuple[str, Any], ...]], pyglet.graphics.shader.ShaderProgram] = {}
+
 default_vertex_source = """#version 150 core
     in vec3 translate;
     in vec4 colors;
@@ -71,4 +77,82 @@ default_fragment_array_source = """#version 150 core
     {
         final_colors = texture(sprite_texture, texture_coords) * vertex_colors;
     }
-"""
\ No newline at end of file
+"""
+
+def add_defines(source: str, defines: dict[str, Any]) -> str:
+    """
+    Returns [source] with a #define directive for each of [defines], placed right after the #version directive.
+    """
+
+    if len(defines) == 0:
+        return source
+
+    directives: str = "".join(f"#define {name} {value}\n" for name, value in defines.items())
+
+    version_index: int = source.find("#version")
+    if version_index < 0:
+        return directives + source
+
+    line_end: int = source.find("\n", version_index)
+    if line_end < 0:
+        return f"{source}\n{directives}"
+
+    return source[:line_end + 1] + directives + source[line_end + 1:]
+
+def get_shader_program(
+    vertex_source: str,
+    fragment_source: str,
+    defines: dict[str, Any] | None = None
+) -> pyglet.graphics.shader.ShaderProgram:
+    """
+    Returns the shader program built from [vertex_source] and [fragment_source] with the provided [defines].
+    Each combination is only compiled once, then shared: per-instance values should be set as uniforms
+    by each user's own group (see [UniformsGroup]) rather than by compiling a dedicated program.
+    """
+
+    key: tuple[str, str, tuple[tuple[str, Any], ...]] = (
+        vertex_source,
+        fragment_source,
+        tuple(sorted(defines.items())) if defines is not None else ()
+    )
+
+    program: pyglet.graphics.shader.ShaderProgram | None = SHADER_PROGRAMS.get(key)
+    if program is None:
+        program = pyglet.graphics.shader.ShaderProgram(
+            pyglet.graphics.shader.Shader(add_defines(vertex_source, dict(key[2])), "vertex"),
+            pyglet.graphics.shader.Shader(add_defines(fragment_source, dict(key[2])), "fragment")
+        )
+        SHADER_PROGRAMS[key] = program
+
+    return program
+
+class UniformsGroup(pyglet.graphics.Group):
+    """
+    Rendering group that applies its own uniform values to a shared shader program.
+    Use it as parent group of all sprites needing per-instance uniforms.
+    Uniforms groups are only equal to themselves, so that their values never leak to other instances.
+    """
+
+    def __init__(
+        self,
+        program: pyglet.graphics.shader.ShaderProgram,
+        uniforms: dict[str, Any] | None = None,
+        order: int = 0,
+        parent: pyglet.graphics.Group | None = None
+    ) -> None:
+        super().__init__(order = order, parent = parent)
+
+        self.program: pyglet.graphics.shader.ShaderProgram = program
+        self.uniforms: dict[str, Any] = uniforms if uniforms is not None else {}
+
+    def set_state(self) -> None:
+        self.program.use()
+
+        for name, value in self.uniforms.items():
+            self.program[name] = value
+
+    def __eq__(self, other) -> bool:
+        return self is other
+
+    def __hash__(self) -> int:
+        return id(self)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Optional, Tuple
 import pyglet
 
+from amonite.node import mark_batch_dirty
 from amonite.settings import GLOBALS, Keys
 from amonite.shapes.shape_node import ShapeNode
 
@@ -33,12 +34,19 @@ class CircleNode(ShapeNode):
         self.__shape.z = z
 
     def delete(self) -> None:
+        self.mark_dirty()
         self.__shape.delete()
 
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__shape.batch)
+
+        super().mark_dirty()
+
     def set_color(self, color: tuple[int, int, int]):
         super().set_color(color)
 
         self.__shape.color = color
+        self.mark_dirty()
 
     def set_position(
         self,
@@ -50,5 +58,8 @@ class CircleNode(ShapeNode):
         self.__shape.x = self.x * float(GLOBALS[Keys.SCALING])
         self.__shape.y = self.y * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def set_alpha(self, alpha: int):
-        self.__shape.opacity = alpha
\ No newline at end of file
+        self.__shape.opacity = alpha
+        self.mark_dirty()
\ No newline at end of file
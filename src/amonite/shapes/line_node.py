@@ -1,6 +1,7 @@
 from typing import Optional
 import pyglet
 
+from amonite.node import mark_batch_dirty
 from amonite.settings import GLOBALS, Keys
 from amonite.shapes.shape_node import ShapeNode
 
@@ -47,12 +48,19 @@ class LineNode(ShapeNode):
         # )
 
     def delete(self) -> None:
+        self.mark_dirty()
         self.__shape.delete()
 
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__shape.batch)
+
+        super().mark_dirty()
+
     def set_color(self, color: tuple[int, int, int]):
         super().set_color(color)
 
         self.__shape.color = color
+        self.mark_dirty()
 
     def set_position(
         self,
@@ -64,6 +72,8 @@ class LineNode(ShapeNode):
         self.__shape.x = position[0] * float(GLOBALS[Keys.SCALING])
         self.__shape.y = position[1] * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def set_delta(
         self,
         delta: tuple[float, float]
@@ -74,8 +84,11 @@ class LineNode(ShapeNode):
         self.__shape.x2 = (self.x + delta[0]) * float(GLOBALS[Keys.SCALING])
         self.__shape.y2 = (self.y + delta[1]) * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def set_alpha(self, alpha: int):
         self.__shape.opacity = alpha
+        self.mark_dirty()
 
     def draw(self) -> None:
         self.__shape.draw()
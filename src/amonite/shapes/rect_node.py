@@ -1,6 +1,7 @@
 from typing import Optional, Tuple
 import pyglet
 
+from amonite.node import mark_batch_dirty
 from amonite.settings import GLOBALS, Keys
 from amonite.shapes.shape_node import ShapeNode
 
@@ -40,12 +41,19 @@ class RectNode(ShapeNode):
         self.__shape.anchor_position = (anchor_x * float(GLOBALS[Keys.SCALING]), anchor_y * float(GLOBALS[Keys.SCALING]))
 
     def delete(self) -> None:
+        self.mark_dirty()
         self.__shape.delete()
 
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__shape.batch)
+
+        super().mark_dirty()
+
     def set_color(self, color: tuple[int, int, int]):
         super().set_color(color)
 
         self.__shape.color = color
+        self.mark_dirty()
 
     def set_position(
         self,
@@ -60,6 +68,8 @@ class RectNode(ShapeNode):
         self.__shape.x = position[0] * float(GLOBALS[Keys.SCALING])
         self.__shape.y = position[1] * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def get_bounds(self) -> tuple[float, float, float, float]:
         """
         Computes and returns the rectangle position and size in the form of a tuple defined as (x, y, width, height).
@@ -80,8 +90,11 @@ class RectNode(ShapeNode):
         self.__shape.width = bounds[2] * float(GLOBALS[Keys.SCALING])
         self.__shape.height = bounds[3] * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def set_alpha(self, alpha: int):
         self.__shape.opacity = alpha
+        self.mark_dirty()
 
     def draw(self) -> None:
         self.__shape.draw()
\ No newline at end of file
@@ -2,6 +2,7 @@ import random
 import pyglet
 
 from amonite.settings import SETTINGS, Keys
+from amonite.tracer import TRACER
 from amonite.utils import utils
 
 # def on_effect_eos(self: pyglet.media.Player) -> None:
@@ -23,11 +24,12 @@ class SoundController:
         if not SETTINGS[Keys.SOUND] or not SETTINGS[Keys.MUSIC]:
             return
 
-        if self.bg_music.source is not None:
-            self.bg_music.delete()
+        with TRACER.span("SoundController.set_music", "audio"):
+            if self.bg_music.source is not None:
+                self.bg_music.delete()
 
-        self.bg_music = music.play()
-        self.bg_music.loop = True
+            self.bg_music = music.play()
+            self.bg_music.loop = True
 
     def pause_music(self) -> None:
         if self.bg_music.source is not None:
@@ -57,6 +59,10 @@ class SoundController:
         if not SETTINGS[Keys.SOUND] or not SETTINGS[Keys.SFX]:
             return
 
+        with TRACER.span("SoundController.play_effect", "audio"):
+            self.__play_effect(sound = sound)
+
+    def __play_effect(self, sound: pyglet.media.StaticSource) -> None:
         # Create a temporary player.
         player: pyglet.media.Player = pyglet.media.Player()
 
@@ -1,9 +1,10 @@
-from typing import Callable
+from typing import Callable, Sequence
+import numpy as np
 import pyglet
 import pyglet.gl as gl
 
 from amonite.shaded_sprite import ShadedSprite
-from amonite.node import PositionNode
+from amonite.node import PositionNode, mark_batch_dirty
 from amonite.settings import GLOBALS, Keys
 from amonite.utils import utils
 
@@ -31,6 +32,8 @@ class SpriteNode(PositionNode):
         The shader program to use to render the sprite.
     samplers_2d: dict[str, pyglet.image.ImageData] | None
         The list of samplers2d as required by the provided shader program.
+    group: pyglet.graphics.Group | None
+        The parent group of the sprite, e.g. to apply per-instance uniforms.
     """
 
     def __init__(
@@ -44,6 +47,7 @@ class SpriteNode(PositionNode):
         z: float = 0,
         shader: pyglet.graphics.shader.ShaderProgram | None = None,
         samplers_2d: dict[str, pyglet.image.ImageData] | None = None,
+        group: pyglet.graphics.Group | None = None
     ) -> None:
         super().__init__(
             x = x,
@@ -63,7 +67,8 @@ class SpriteNode(PositionNode):
             z = -y if y_sort else z,
             program = shader,
             samplers_2d = samplers_2d,
-            batch = batch
+            batch = batch,
+            group = group
         )
         self.sprite.scale = float(GLOBALS[Keys.SCALING])
         self.sprite.push_handlers(self)
@@ -71,8 +76,14 @@ class SpriteNode(PositionNode):
         self.__on_animation_end = on_animation_end
 
     def delete(self) -> None:
+        self.mark_dirty()
         self.sprite.delete()
 
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.sprite.batch)
+
+        super().mark_dirty()
+
     def get_image(self) -> pyglet.image.AbstractImage | pyglet.image.animation.Animation:
         return self.sprite.image
 
@@ -92,6 +103,81 @@ class SpriteNode(PositionNode):
             self.z
         )
 
+        self.mark_dirty()
+
+    @staticmethod
+    def set_positions(
+        nodes: Sequence["SpriteNode"],
+        positions: np.ndarray,
+        z: np.ndarray | float | None = None
+    ) -> None:
+        """
+        Moves all [nodes] at once to [positions], an (n, 2) array of world positions.
+        [z] is only used by nodes which are not y-sorted, each node keeps its own z if not provided.
+
+        Equivalent to calling [set_position] on each node, but all translations are computed in a single vectorized step
+        and written to each vertex buffer in one contiguous update, instead of one small write per sprite.
+        Nodes state is still synced in a Python loop over all nodes, which also moves their components through their own
+        [set_position], so this is best suited to many movers with no components (e.g. crowds, projectiles).
+        """
+
+        count: int = len(nodes)
+        if count == 0:
+            return
+
+        world: np.ndarray = np.asarray(positions, dtype = np.float32).reshape((count, 2))
+        scaling: float = float(GLOBALS[Keys.SCALING])
+
+        # Translations as (x, y, z) rows, in scaled pixels.
+        translate: np.ndarray = np.empty((count, 3), dtype = np.float32)
+        np.multiply(world, scaling, out = translate[:, 0:2])
+
+        y_sort: np.ndarray = np.fromiter((node.__y_sort for node in nodes), dtype = np.bool_, count = count)
+        depths: np.ndarray = np.asarray(z, dtype = np.float32) if z is not None else np.fromiter((node.z for node in nodes), dtype = np.float32, count = count)
+        translate[:, 2] = np.where(y_sort, -world[:, 1], depths)
+
+        # Keep nodes and sprites state in sync and group sprites by the vertex domain holding their translations.
+        domains: dict = {}
+        for (index, (node, (x, y), values)) in enumerate(zip(nodes, world.tolist(), translate.tolist())):
+            node.x = x
+            node.y = y
+            node.z = values[2]
+
+            # Components are moved the same way as by [set_position], without any batching.
+            for component in node.components:
+                if isinstance(component, PositionNode):
+                    component.set_position(
+                        position = (
+                            x + component.start_x,
+                            y + component.start_y
+                        ),
+                        z = node.z + component.start_z
+                    )
+
+            sprite: ShadedSprite = node.sprite
+            (sprite._x, sprite._y, sprite._z) = values
+            mark_batch_dirty(sprite.batch)
+
+            vertex_list = sprite._vertex_list
+            entry: tuple[list[int], list[int]] | None = domains.get(vertex_list.domain)
+            if entry is None:
+                entry = ([], [])
+                domains[vertex_list.domain] = entry
+
+            entry[0].append(index)
+            entry[1].append(vertex_list.start)
+
+        for (domain, (indices, starts)) in domains.items():
+            buffer = domain.attrib_name_buffers["translate"]
+            vertex_starts: np.ndarray = np.array(starts, dtype = np.intp)
+            first: int = int(vertex_starts.min())
+            last: int = int(vertex_starts.max()) + 4
+
+            # Write all 4 vertices of all sprites in the buffer's range, then upload the range once.
+            view: np.ndarray = np.ctypeslib.as_array(buffer.get_region(first, last - first)).reshape((last - first, 3))
+            view[(vertex_starts - first)[:, None] + np.arange(4)] = translate[indices][:, None, :]
+            buffer.invalidate_region(first, last - first)
+
     def set_scale(
         self,
         x_scale: int | None = None,
@@ -103,6 +189,8 @@ class SpriteNode(PositionNode):
         if y_scale is not None:
             self.sprite.scale_y = y_scale
 
+        self.mark_dirty()
+
     def get_image(self) -> pyglet.image.AbstractImage | pyglet.image.animation.Animation:
         """
         Returns the currently set sprite image.
@@ -119,6 +207,7 @@ class SpriteNode(PositionNode):
         """
 
         self.sprite.image = image
+        self.mark_dirty()
 
     def get_frames_num(self) -> int:
         """
@@ -0,0 +1,377 @@
+"""
+This file contains the tilemap used to stream infinite maps by chunks.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import math
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+from amonite.node import PositionNode, mark_batch_dirty
+from amonite.settings import GLOBALS, SETTINGS, Keys
+from amonite.shaded_sprite import ShadedSpriteGroup, depth_shader_program
+from amonite.tile_animator import TILE_ANIMATOR
+from amonite.tilemap_node import Tileset
+from amonite.utils.tmx_loader import TmxMap
+
+# Vertex data of a chunk for a single texture, as (tile indices, translations, texture coordinates) tuples.
+ChunkVertexData = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+class StreamingTilemapNode(PositionNode):
+    """
+    Tilemap layer of an infinite map, only keeping chunks around the camera loaded.
+
+    Vertex data for each chunk is computed in the background and then written into a recycled vertex list on the main thread,
+    so memory and draw cost only depend on the view size, regardless of the world size.
+    The node should be added to the current scene: chunks to load are picked when culling and loaded chunks are uploaded when updating.
+
+    Attributes
+    ----------
+    preload_margin: int
+        Amount of chunks around the view to keep loaded.
+    uploads_per_frame: int
+        Maximum amount of loaded chunks uploaded each update.
+    """
+
+    __slots__ = (
+        "preload_margin",
+        "uploads_per_frame",
+        "__tileset",
+        "__chunks",
+        "__chunk_width",
+        "__chunk_height",
+        "__bottom_row",
+        "__z_offset",
+        "__batch",
+        "__tile_tex_coords",
+        "__tile_textures",
+        "__groups",
+        "__loaded",
+        "__pending",
+        "__pool",
+        "__executor"
+    )
+
+    def __init__(
+        self,
+        tileset: Tileset,
+        chunks: dict[tuple[int, int], np.ndarray],
+        x: float = 0.0,
+        y: float = 0.0,
+        z_offset: int = 0,
+        bottom_row: int | None = None,
+        batch: pyglet.graphics.Batch | None = None,
+        preload_margin: int = 1,
+        uploads_per_frame: int = 2,
+        workers: int = 1
+    ) -> None:
+        """
+        Parameters
+        ----------
+        chunks: dict[tuple[int, int], np.ndarray]
+            Tile indices by chunk position (column, row) of the top left tile, as read by [TmxLoader].
+        bottom_row: int | None
+            Row (exclusive) laid out at [y], computed from [chunks] if not provided.
+        """
+
+        super().__init__(
+            x = x,
+            y = y
+        )
+
+        self.preload_margin: int = preload_margin
+        self.uploads_per_frame: int = uploads_per_frame
+
+        self.__tileset: Tileset = tileset
+        self.__chunks: dict[tuple[int, int], np.ndarray] = chunks
+        self.__z_offset: int = z_offset
+        self.__batch: pyglet.graphics.Batch | None = batch
+
+        # Infinite maps use the same size for all chunks.
+        first_chunk: np.ndarray | None = next(iter(chunks.values()), None)
+        self.__chunk_width: int = first_chunk.shape[1] if first_chunk is not None else 16
+        self.__chunk_height: int = first_chunk.shape[0] if first_chunk is not None else 16
+
+        self.__bottom_row: int = bottom_row if bottom_row is not None else StreamingTilemapNode.get_bottom_row(chunks)
+
+        # Texture coordinates and texture id of each tile, used to compute vertex data in bulk.
+        self.__tile_tex_coords: np.ndarray = np.array([tile.tex_coords for tile in tileset.tiles], dtype = np.float32).reshape((-1, 12))
+        self.__tile_textures: np.ndarray = np.array([tile.owner.id for tile in tileset.tiles], dtype = np.int64)
+
+        # Rendering groups by texture id, shared by all chunks.
+        self.__groups: dict[int, ShadedSpriteGroup] = {tile.owner.id: ShadedSpriteGroup.get(texture = tile.owner) for tile in tileset.tiles}
+
+        # Loaded chunks, as lists of (pool key, vertex list) tuples.
+        self.__loaded: dict[tuple[int, int], list[tuple[tuple[int, int], pyglet.graphics.vertexdomain.VertexList]]] = {}
+
+        # Chunks whose vertex data is being computed.
+        self.__pending: dict[tuple[int, int], Future] = {}
+
+        # Recycled vertex lists by (texture id, capacity in tiles).
+        self.__pool: dict[tuple[int, int], list[pyglet.graphics.vertexdomain.VertexList]] = {}
+
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = workers)
+
+    @staticmethod
+    def get_bottom_row(chunks: dict[tuple[int, int], np.ndarray]) -> int:
+        """
+        Returns the row (exclusive) below all provided [chunks].
+        """
+
+        return max((row + chunk.shape[0] for ((_, row), chunk) in chunks.items()), default = 0)
+
+    def cull(self, view_bounds: tuple[float, float, float, float]) -> None:
+        super().cull(view_bounds = view_bounds)
+
+        scaling: float = float(GLOBALS[Keys.SCALING])
+        tile_width: float = self.__tileset.tile_width * scaling
+        tile_height: float = self.__tileset.tile_height * scaling
+        (view_x, view_y, view_width, view_height) = view_bounds
+
+        # Visible tiles range, rows grow downwards.
+        first_col: int = math.floor((view_x - self.x) / tile_width)
+        last_col: int = math.floor((view_x + view_width - self.x) / tile_width)
+        first_row: int = self.__bottom_row - 1 - math.floor((view_y + view_height - self.y) / tile_height)
+        last_row: int = self.__bottom_row - 1 - math.floor((view_y - self.y) / tile_height)
+
+        # Visible chunks range.
+        first_chunk_col: int = first_col // self.__chunk_width
+        last_chunk_col: int = last_col // self.__chunk_width
+        first_chunk_row: int = first_row // self.__chunk_height
+        last_chunk_row: int = last_row // self.__chunk_height
+
+        # Load all chunks within the preload margin.
+        wanted: set[tuple[int, int]] = set()
+        for chunk_row in range(first_chunk_row - self.preload_margin, last_chunk_row + self.preload_margin + 1):
+            for chunk_col in range(first_chunk_col - self.preload_margin, last_chunk_col + self.preload_margin + 1):
+                key: tuple[int, int] = (chunk_col * self.__chunk_width, chunk_row * self.__chunk_height)
+                if key not in self.__chunks:
+                    continue
+
+                wanted.add(key)
+                if key not in self.__loaded and key not in self.__pending:
+                    self.__pending[key] = self.__executor.submit(self.__compute, key)
+
+        # Unload chunks one chunk past the preload margin, so that moving back and forth on a border doesn't thrash.
+        for key in list(self.__loaded.keys()):
+            loaded_col: int = key[0] // self.__chunk_width
+            loaded_row: int = key[1] // self.__chunk_height
+            if first_chunk_col - self.preload_margin - 1 <= loaded_col <= last_chunk_col + self.preload_margin + 1 and first_chunk_row - self.preload_margin - 1 <= loaded_row <= last_chunk_row + self.preload_margin + 1:
+                continue
+
+            self.__release(key)
+
+        # Drop pending chunks that are not needed anymore.
+        for key in list(self.__pending.keys()):
+            if key not in wanted:
+                self.__pending.pop(key).cancel()
+
+    def update(self, dt: float) -> None:
+        super().update(dt = dt)
+
+        uploads: int = 0
+        for key, future in list(self.__pending.items()):
+            if uploads >= self.uploads_per_frame:
+                break
+
+            if not future.done():
+                continue
+
+            del self.__pending[key]
+            self.__upload(key, future.result())
+            uploads += 1
+
+    def __compute(self, key: tuple[int, int]) -> dict[int, ChunkVertexData]:
+        """
+        Computes the vertex data of chunk [key] by texture id.
+        No graphics resource is touched, so this is safe to call off the main thread.
+        """
+
+        chunk: np.ndarray = self.__chunks[key]
+        scaling: float = float(GLOBALS[Keys.SCALING])
+
+        (rows, cols) = np.nonzero(chunk >= 0)
+        tiles: np.ndarray = chunk[rows, cols]
+
+        # Tiles are laid out exactly like in [TilemapNode].
+        tiles_y: np.ndarray = (self.__bottom_row - 1 - (rows + key[1])) * self.__tileset.tile_height
+        translations: np.ndarray = np.stack(
+            (
+                (self.x + (cols + key[0]) * self.__tileset.tile_width * scaling).astype(np.int32),
+                (self.y + tiles_y * scaling).astype(np.int32),
+                (-((self.y + tiles_y) + self.__z_offset)).astype(np.int32)
+            ),
+            axis = 1
+        )
+
+        textures: np.ndarray = self.__tile_textures[tiles]
+        vertex_data: dict[int, ChunkVertexData] = {}
+        for texture_id in np.unique(textures).tolist():
+            mask: np.ndarray = textures == texture_id
+            vertex_data[texture_id] = (
+                tiles[mask],
+                # Same translation for all 4 vertices of each tile.
+                np.repeat(translations[mask], 4, axis = 0).ravel(),
+                self.__tile_tex_coords[tiles[mask]].ravel()
+            )
+
+        return vertex_data
+
+    def __upload(
+        self,
+        key: tuple[int, int],
+        vertex_data: dict[int, ChunkVertexData]
+    ) -> None:
+        """
+        Writes the provided chunk [vertex_data] into recycled (or new) vertex lists.
+        """
+
+        tileset: Tileset = self.__tileset
+        capacity: int = self.__chunks[key].size
+        quad: np.ndarray = np.array(
+            (0, 0, 0, tileset.tile_width, 0, 0, tileset.tile_width, tileset.tile_height, 0, 0, tileset.tile_height, 0),
+            dtype = np.float32
+        )
+
+        entries: list[tuple[tuple[int, int], pyglet.graphics.vertexdomain.VertexList]] = []
+        for texture_id, (tiles, translations, tex_coords) in vertex_data.items():
+            pool_key: tuple[int, int] = (texture_id, capacity)
+            vertex_list: pyglet.graphics.vertexdomain.VertexList = self.__acquire(pool_key)
+
+            # Unused tiles get no area, so they're never rasterized.
+            positions: np.ndarray = np.zeros(capacity * 12, dtype = np.float32)
+            positions[:len(tiles) * 12] = np.tile(quad, len(tiles))
+            vertex_list.position[:] = positions.tolist()
+
+            padding: np.ndarray = np.zeros((capacity - len(tiles)) * 12, dtype = np.float32)
+            vertex_list.translate[:] = np.concatenate((translations, padding)).tolist()
+            vertex_list.tex_coords[:] = np.concatenate((tex_coords, padding)).tolist()
+
+            for tile_index, tex_index in enumerate(tiles.tolist()):
+                if tex_index in tileset.animations:
+                    TILE_ANIMATOR.add(tileset.animations[tex_index], vertex_list, tile_index * 4, batch = self.__batch)
+
+            entries.append((pool_key, vertex_list))
+
+        self.__loaded[key] = entries
+
+        self.mark_dirty()
+
+    def __acquire(self, pool_key: tuple[int, int]) -> pyglet.graphics.vertexdomain.VertexList:
+        """
+        Returns a recycled vertex list for [pool_key], creating a new one if none is available.
+        """
+
+        pool: list[pyglet.graphics.vertexdomain.VertexList] = self.__pool.get(pool_key, [])
+        if len(pool) > 0:
+            return pool.pop()
+
+        (texture_id, capacity) = pool_key
+        scaling: float = float(GLOBALS[Keys.SCALING]) * self.__tileset.tile_scaling
+
+        return depth_shader_program.vertex_list_indexed(
+            capacity * 4,
+            gl.GL_TRIANGLES,
+            [index + tile_index * 4 for tile_index in range(capacity) for index in (0, 1, 2, 0, 2, 3)],
+            self.__batch,
+            self.__groups[texture_id],
+            position = ("f", (0.0,) * capacity * 12),
+            colors = ("Bn", (255, 255, 255, 255) * capacity * 4),
+            translate = ("f", (0.0,) * capacity * 12),
+            # Tiles are scaled up a bit in order to avoid texture bleeding.
+            scale = ("f", (scaling, scaling) * capacity * 4),
+            rotation = ("f", (0.0,) * capacity * 4),
+            tex_coords = ("f", (0.0,) * capacity * 12)
+        )
+
+    def __release(self, key: tuple[int, int]) -> None:
+        """
+        Unloads chunk [key], hiding and recycling its vertex lists.
+        """
+
+        entries: list[tuple[tuple[int, int], pyglet.graphics.vertexdomain.VertexList]] = self.__loaded.pop(key)
+
+        if len(self.__tileset.animations) > 0:
+            TILE_ANIMATOR.remove([vertex_list for (_, vertex_list) in entries])
+
+        for (pool_key, vertex_list) in entries:
+            vertex_list.position[:] = (0.0,) * (vertex_list.count * 3)
+            self.__pool.setdefault(pool_key, []).append(vertex_list)
+
+        self.mark_dirty()
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "loaded": len(self.__loaded),
+            "pending": len(self.__pending),
+            "pooled": sum(len(pool) for pool in self.__pool.values())
+        }
+
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__batch)
+
+        super().mark_dirty()
+
+    def delete(self) -> None:
+        self.__executor.shutdown(wait = False, cancel_futures = True)
+        self.__pending.clear()
+
+        for key in list(self.__loaded.keys()):
+            self.__release(key)
+
+        for pool in self.__pool.values():
+            for vertex_list in pool:
+                vertex_list.delete()
+
+        self.__pool.clear()
+
+        super().delete()
+
+    @staticmethod
+    def from_tmx_map(
+        tmx_map: TmxMap,
+        x: float = 0.0,
+        y: float = 0.0,
+        # Distance (z-axis) between tilemap layers.
+        layers_spacing: int | None = None,
+        # Starting z-offset for all layers in the map.
+        z_offset: int = 0,
+        batch: pyglet.graphics.Batch | None = None,
+        tileset: Tileset | None = None,
+        preload_margin: int = 1
+    ) -> list:
+        """
+        Constructs a new streaming tilemap for each layer in the given, already parsed, infinite TMX map.
+        See [TilemapNode.from_tmx_file] for layers naming.
+        """
+
+        # Read layers spacing from settings if not provided.
+        spacing: int = layers_spacing if layers_spacing is not None else int(SETTINGS[Keys.LAYERS_Z_SPACING])
+
+        if tileset is None:
+            tileset = Tileset.fetch(
+                sources = tmx_map.tileset_sources,
+                tile_width = tmx_map.tile_width,
+                tile_height = tmx_map.tile_height
+            )
+
+        tileset.set_animations(tmx_map.animations)
+        tileset.set_tile_properties(tmx_map.tile_properties)
+
+        # All layers share the same bottom row, so that they line up.
+        bottom_row: int = max((StreamingTilemapNode.get_bottom_row(chunks) for (_, chunks) in tmx_map.chunks), default = 0)
+
+        return [
+            StreamingTilemapNode(
+                tileset = tileset,
+                chunks = chunks,
+                x = x,
+                y = y,
+                # Only apply layers offset if not a rat layer.
+                z_offset = 0 if "rat" in name else z_offset + spacing * (len(tmx_map.chunks) - layer_index),
+                bottom_row = bottom_row,
+                batch = batch,
+                preload_margin = preload_margin
+            ) for layer_index, (name, chunks) in enumerate(tmx_map.chunks)
+        ]
\ No newline at end of file
@@ -1,7 +1,7 @@
 import pyglet
 
 from amonite.settings import GLOBALS, Keys
-from amonite.node import PositionNode
+from amonite.node import PositionNode, mark_batch_dirty
 
 class TextNode(PositionNode):
     def __init__(
@@ -46,8 +46,14 @@ class TextNode(PositionNode):
         )
 
     def delete(self) -> None:
+        self.mark_dirty()
         self.label.delete()
 
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.label.batch)
+
+        super().mark_dirty()
+
     def set_position(
         self,
         position: tuple[float, float],
@@ -59,17 +65,22 @@ class TextNode(PositionNode):
         self.y = position[1]
         self.label.y = position[1] * float(GLOBALS[Keys.SCALING])
 
+        self.mark_dirty()
+
     def set_alpha(self, alpha: int) -> None:
         self.label.opacity = alpha
+        self.mark_dirty()
 
     def set_color(
         self,
         color: tuple = (0x00, 0x00, 0x00, 0xFF)
     ) -> None:
         self.label.color = color
+        self.mark_dirty()
 
     def set_text(self, text: str) -> None:
         self.label.text = text
+        self.mark_dirty()
 
     def draw(self) -> None:
         self.label.draw()
\ No newline at end of file
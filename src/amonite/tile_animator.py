@@ -0,0 +1,154 @@
+"""
+This file contains the shared ticker used to animate tiles.
+"""
+
+from bisect import bisect_right
+from typing import Iterable
+import pyglet
+
+from amonite.node import mark_batch_dirty
+
+class TileAnimation:
+    """
+    Animation of a single tile ID, shared by all of its instances.
+
+    Attributes
+    ----------
+    frames: list[pyglet.image.TextureRegion]
+        All animation frames, which must share the same texture as the animated tile.
+    frame_index: int
+        Index of the frame currently displayed.
+    instances: list[tuple[pyglet.graphics.vertexdomain.VertexList, int, pyglet.graphics.Batch | None, pyglet.graphics.Group | None]]
+        All animated tile instances as (vertex list, first vertex index, batch, group) tuples.
+    """
+
+    __slots__ = (
+        "frames",
+        "frame_index",
+        "instances",
+        "__ends",
+        "__duration"
+    )
+
+    def __init__(
+        self,
+        frames: list[pyglet.image.TextureRegion],
+        durations: list[float]
+    ) -> None:
+        assert len(frames) == len(durations) and len(frames) > 0, "Tile animations need one duration per frame"
+
+        self.frames: list[pyglet.image.TextureRegion] = frames
+        self.frame_index: int = 0
+        self.instances: list[tuple[pyglet.graphics.vertexdomain.VertexList, int, pyglet.graphics.Batch | None, pyglet.graphics.Group | None]] = []
+
+        # End time (in seconds) of each frame.
+        self.__ends: list[float] = []
+        end: float = 0.0
+        for duration in durations:
+            end += duration
+            self.__ends.append(end)
+
+        self.__duration: float = end
+
+    def get_frame_index(self, time: float) -> int:
+        """
+        Returns the index of the frame displayed at [time] (in seconds).
+        """
+
+        if self.__duration <= 0.0:
+            return 0
+
+        return min(bisect_right(self.__ends, time % self.__duration), len(self.frames) - 1)
+
+class TileAnimator:
+    """
+    Single ticker for all animated tiles.
+
+    All instances of an animated tile ID advance together, and only the texture coordinates of their vertices are updated,
+    so the cost is one clock callback per frame regardless of the amount of animated tiles.
+    """
+
+    __slots__ = (
+        "__animations",
+        "__time",
+        "__scheduled"
+    )
+
+    def __init__(self) -> None:
+        self.__animations: set[TileAnimation] = set()
+        self.__time: float = 0.0
+        self.__scheduled: bool = False
+
+    def add(
+        self,
+        animation: TileAnimation,
+        vertex_list: pyglet.graphics.vertexdomain.VertexList,
+        vertex_index: int = 0,
+        batch: pyglet.graphics.Batch | None = None,
+        group: pyglet.graphics.Group | None = None
+    ) -> None:
+        """
+        Animates the tile whose 4 vertices start at [vertex_index] in [vertex_list].
+        [batch] is the batch drawing [vertex_list], whose scene is marked dirty on frame changes as long as [group] is visible
+        (or not provided), so that hidden tiles don't keep scenes rendering on demand busy.
+        """
+
+        animation.instances.append((vertex_list, vertex_index, batch, group))
+        self.__animations.add(animation)
+
+        # Show the current frame straight away.
+        self.__write(animation, vertex_list, vertex_index)
+
+        if not self.__scheduled:
+            pyglet.clock.schedule(self.__tick)
+            self.__scheduled = True
+
+    def remove(self, vertex_lists: Iterable[pyglet.graphics.vertexdomain.VertexList]) -> None:
+        """
+        Stops animating all tiles in [vertex_lists].
+        """
+
+        removed: set[int] = set(id(vertex_list) for vertex_list in vertex_lists)
+
+        for animation in list(self.__animations):
+            animation.instances = [instance for instance in animation.instances if id(instance[0]) not in removed]
+
+            if len(animation.instances) <= 0:
+                self.__animations.discard(animation)
+
+        if self.__scheduled and len(self.__animations) <= 0:
+            pyglet.clock.unschedule(self.__tick)
+            self.__scheduled = False
+
+    def __tick(self, dt: float) -> None:
+        self.__time += dt
+
+        for animation in self.__animations:
+            frame_index: int = animation.get_frame_index(self.__time)
+            if frame_index == animation.frame_index:
+                continue
+
+            animation.frame_index = frame_index
+            for (vertex_list, vertex_index, batch, group) in animation.instances:
+                self.__write(animation, vertex_list, vertex_index)
+
+                if group is None or group.visible:
+                    mark_batch_dirty(batch)
+
+    @staticmethod
+    def __write(
+        animation: TileAnimation,
+        vertex_list: pyglet.graphics.vertexdomain.VertexList,
+        vertex_index: int
+    ) -> None:
+        """
+        Writes the current frame's texture coordinates to the 4 vertices starting at [vertex_index] in [vertex_list].
+        """
+
+        vertex_list.domain.attrib_name_buffers["tex_coords"].set_region(
+            vertex_list.start + vertex_index,
+            4,
+            animation.frames[animation.frame_index].tex_coords
+        )
+
+TILE_ANIMATOR: TileAnimator = TileAnimator()
\ No newline at end of file
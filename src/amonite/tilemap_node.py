@@ -1,17 +1,31 @@
-from typing import Optional, Sequence
-import xml.etree.ElementTree as xml
+from typing import Any, Generator, Optional, Sequence
+import numpy as np
 import pyglet
 import pyglet.gl as gl
 
-from amonite.shaded_sprite import ShadedSprite
-from amonite.node import PositionNode
+from amonite.debug_draw import DEBUG_DRAW, DebugDrawLayer
+from amonite.shaded_sprite import ShadedSprite, ShadedSpriteGroup, depth_shader_program
+from amonite.node import PositionNode, mark_batch_dirty
 from amonite.scene_node import Bounds
 from amonite.settings import GLOBALS, SETTINGS, Keys
+from amonite.tile_animator import TILE_ANIMATOR, TileAnimation
+from amonite.utils.atlas_builder import AtlasBuilder
+from amonite.utils.tmx_loader import TmxLoader, TmxMap
+from amonite.utils.utils import rect_rect_check
 
 # Tile scaling factor, used to avoid texture bleeding.
 # If tiles are slightly bigger, then they slightly overlap with each other, effectively never causing texture bleeding.
 TILE_SCALING = 1.01
 
+# Default size (in tiles) of baked chunks, used when no chunk size is set.
+BAKE_CHUNK_SIZE = 32
+
+# Color of debug grid lines.
+GRID_COLOR: tuple[int, int, int, int] = (0xFF, 0xFF, 0xFF, 0x22)
+
+# Process-wide cache of all loaded tilesets, keyed by sources, tile geometry and atlas extrusion.
+TILESET_CACHE: dict[tuple[tuple[str, ...], int, int, int, int, int], "Tileset"] = {}
+
 class Tileset:
     __slots__ = (
         "__textures",
@@ -19,7 +33,11 @@ class Tileset:
         "tile_height",
         "margin",
         "spacing",
-        "tiles"
+        "extrude",
+        "tile_scaling",
+        "tiles",
+        "animations",
+        "tile_properties"
     )
 
     def __init__(
@@ -28,17 +46,64 @@ class Tileset:
         tile_width: int,
         tile_height: int,
         margin: int = 0,
-        spacing: int = 0
+        spacing: int = 0,
+        extrude: int = 0,
+        images: list[pyglet.image.ImageData] | None = None
     ):
-        # Load the provided texture.
-        self.__textures = [pyglet.resource.image(source) for source in sources]
+        """
+        Parameters
+        ----------
+        extrude: int
+            If greater than 0, all tiles are packed into a single atlas texture, each surrounded by [extrude] pixels
+            replicating its edges. Tiles can then be drawn at their exact size and all share the same texture.
+        images: list[pyglet.image.ImageData] | None
+            Already decoded images for all [sources] (see [read_images]), only uploaded to textures if provided.
+        """
+
+        # Load the provided texture, unless already decoded.
+        self.__textures = [image.get_texture() for image in images] if images is not None else [pyglet.resource.image(source) for source in sources]
         self.tile_width = tile_width
         self.tile_height = tile_height
         self.margin = margin
         self.spacing = spacing
+        self.extrude = extrude
         self.tiles = []
         self._fetch_tiles()
 
+        # Extruded atlas tiles can't bleed, so there's no need to scale them up.
+        self.tile_scaling: float = TILE_SCALING
+        if extrude > 0:
+            self.tiles = AtlasBuilder.pack(regions = self.tiles, extrude = extrude)
+            self.tile_scaling = 1.0
+
+        # Animations by tile index, shared by all tilemaps using the tileset.
+        self.animations: dict[int, TileAnimation] = {}
+
+        # Custom properties by tile index.
+        self.tile_properties: dict[int, dict[str, Any]] = {}
+
+    def set_animations(self, animations: dict[int, list[tuple[int, float]]]) -> None:
+        """
+        Sets up all provided [animations], defined as tile index -> [(frame tile index, frame duration (s))].
+        Already defined animations are kept, so that their instances keep advancing together.
+        """
+
+        for tile_index, frames in animations.items():
+            if tile_index in self.animations:
+                continue
+
+            self.animations[tile_index] = TileAnimation(
+                frames = [self.tiles[frame_index] for (frame_index, _) in frames],
+                durations = [duration for (_, duration) in frames]
+            )
+
+    def set_tile_properties(self, tile_properties: dict[int, dict[str, Any]]) -> None:
+        """
+        Sets custom properties for all tiles in [tile_properties], defined as tile index -> {name: value}.
+        """
+
+        self.tile_properties.update(tile_properties)
+
     def _fetch_tiles(self):
         """
         Splits the provided texture (in source) by tile width, tile height, margin and spacing
@@ -46,90 +111,222 @@ class Tileset:
         """
 
         for texture in self.__textures:
+            # All tile regions share the same underlying texture, so parameters only need to be set once.
+            gl.glBindTexture(texture.target, texture.id)
+
+            gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+            gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+
+            # Set texture clamping to avoid mis-rendering subpixel edges.
+            gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+            gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+            gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_R, gl.GL_CLAMP_TO_EDGE)
+
+            gl.glBindTexture(texture.target, 0)
+
             for y in range(self.margin, texture.height - self.spacing, self.tile_height + self.spacing):
                 for x in range(self.margin, texture.width - self.spacing, self.tile_width + self.spacing):
                     # Cut the needed region from the given texture and save it.
-                    tile: pyglet.image.TextureRegion = texture.get_region(x, texture.height - y - self.tile_height, self.tile_width, self.tile_height)
+                    self.tiles.append(texture.get_region(x, texture.height - y - self.tile_height, self.tile_width, self.tile_height))
+
+    @staticmethod
+    def read_images(sources: list) -> list[pyglet.image.ImageData]:
+        """
+        Reads and decodes all tileset images in [sources], no graphics resource is created.
+        This allows callers to decode images off the main thread and only upload them on it (see [fetch]).
+        """
+
+        images: list[pyglet.image.ImageData] = []
+        for source in sources:
+            with pyglet.resource.file(source) as file:
+                images.append(pyglet.image.load(source, file = file).get_image_data())
 
-                    gl.glBindTexture(tile.target, tile.id)
+        return images
 
-                    gl.glTexParameteri(tile.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
-                    gl.glTexParameteri(tile.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+    @staticmethod
+    def is_cached(
+        sources: list,
+        tile_width: int,
+        tile_height: int,
+        margin: int = 0,
+        spacing: int = 0,
+        extrude: int | None = None
+    ) -> bool:
+        """
+        Tells whether the tileset defined by [sources] and the provided tile geometry is already cached or not.
+        """
 
-                    # Set texture clamping to avoid mis-rendering subpixel edges.
-                    gl.glTexParameteri(tile.target, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
-                    gl.glTexParameteri(tile.target, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
-                    gl.glTexParameteri(tile.target, gl.GL_TEXTURE_WRAP_R, gl.GL_CLAMP_TO_EDGE)
+        return Tileset.__get_key(sources, tile_width, tile_height, margin, spacing, extrude) in TILESET_CACHE
 
-                    gl.glBindTexture(tile.target, 0)
+    @staticmethod
+    def fetch(
+        sources: list,
+        tile_width: int,
+        tile_height: int,
+        margin: int = 0,
+        spacing: int = 0,
+        extrude: int | None = None,
+        images: list[pyglet.image.ImageData] | None = None
+    ) -> "Tileset":
+        """
+        Returns the tileset defined by [sources] and the provided tile geometry, only loading it if not already cached.
+        Rooms sharing tilesets then share the same texture regions as well.
+        [extrude] is read from settings if not provided.
+        [images] are already decoded images for all [sources], only used if the tileset is not cached yet.
+        """
+
+        key: tuple[tuple[str, ...], int, int, int, int, int] = Tileset.__get_key(sources, tile_width, tile_height, margin, spacing, extrude)
+
+        if key not in TILESET_CACHE:
+            TILESET_CACHE[key] = Tileset(
+                sources = sources,
+                tile_width = tile_width,
+                tile_height = tile_height,
+                margin = margin,
+                spacing = spacing,
+                extrude = key[5],
+                images = images
+            )
+
+        return TILESET_CACHE[key]
+
+    @staticmethod
+    def __get_key(
+        sources: list,
+        tile_width: int,
+        tile_height: int,
+        margin: int,
+        spacing: int,
+        extrude: int | None
+    ) -> tuple[tuple[str, ...], int, int, int, int, int]:
+        atlas_extrude: int = extrude if extrude is not None else int(SETTINGS[Keys.TILESET_ATLAS_EXTRUDE])
+
+        return (tuple(sources), tile_width, tile_height, margin, spacing, atlas_extrude)
+
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        Drops all cached tilesets, textures are freed once no tilemap uses them anymore.
+        """
 
-                    self.tiles.append(tile)
+        TILESET_CACHE.clear()
+
+class TileChunkGroup(ShadedSpriteGroup):
+    """
+    Rendering group for a single tiles chunk.
+    Chunk groups are only equal to themselves, so that each chunk can be hidden without affecting the others.
+    """
+
+    def __eq__(self, other) -> bool:
+        return self is other
+
+    def __hash__(self) -> int:
+        return id(self)
+
+class TileChunk:
+    """
+    Fixed-size block of tiles, drawn with one vertex list per tileset texture (or a single texture drawn as one quad per tile row if baked).
+    """
+
+    __slots__ = (
+        "x",
+        "y",
+        "width",
+        "height",
+        "groups",
+        "vertex_lists",
+        "textures",
+        "visible"
+    )
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        width: float,
+        height: float
+    ) -> None:
+        # Chunk bounds (in scaled pixels).
+        self.x: float = x
+        self.y: float = y
+        self.width: float = width
+        self.height: float = height
+
+        self.groups: list[TileChunkGroup] = []
+        self.vertex_lists: list = []
+
+        # Textures owned by the chunk (baked chunks only).
+        self.textures: list[pyglet.image.Texture] = []
+
+        self.visible: bool = True
+
+    def set_visible(self, visible: bool) -> None:
+        if visible == self.visible:
+            return
+
+        self.visible = visible
+        for group in self.groups:
+            group.visible = visible
+
+    def delete(self) -> None:
+        for vertex_list in self.vertex_lists:
+            vertex_list.delete()
+
+        for texture in self.textures:
+            texture.delete()
+
+        self.vertex_lists.clear()
+        self.textures.clear()
+        self.groups.clear()
 
 class TilemapNode(PositionNode):
     def __init__(
         self,
         tileset: Tileset,
-        data: Sequence[int],
+        data: Sequence[int] | np.ndarray,
         map_width: int,
         map_height: int,
         x: float = 0,
         y: float = 0,
         z_offset: int = 0,
-        batch: Optional[pyglet.graphics.Batch] = None
+        batch: Optional[pyglet.graphics.Batch] = None,
+        defer_build: bool = False,
+        chunk_size: int | None = None,
+        bake: bool = False
     ):
         super().__init__(
             x = x,
             y = y
         )
         self.__tileset = tileset
-        self.__map = data
+
+        # Tile indices by (row, column), starting from the top left corner of the map.
+        self.__map: np.ndarray = np.array(data, dtype = np.int32).reshape((map_height, map_width))
+
+        self.__z_offset = z_offset
+        self.__batch = batch
         self.map_width = map_width
         self.map_height = map_height
 
-        self.__sprites = [
-            ShadedSprite(
-                img = tileset.tiles[tex_index],
-                x = int(x + (index % map_width) * tileset.tile_width * float(GLOBALS[Keys.SCALING])),
-                y = int(y + (map_height - 1 - (index // map_width)) * tileset.tile_height * float(GLOBALS[Keys.SCALING])),
-                z = int(-((y + (map_height - 1 - (index // map_width)) * tileset.tile_height) + z_offset)),
-                batch = batch
-            ) for (index, tex_index) in enumerate(data) if tex_index >= 0
-        ]
+        # Read chunk size from settings if not provided.
+        self.chunk_size: int = chunk_size if chunk_size is not None else int(SETTINGS[Keys.TILEMAP_CHUNK_SIZE])
 
+        # Baked tilemaps render each chunk from a single texture, drawn as one quad per tile row (z-band)
+        # so that every row keeps the same z as its tiles would.
+        self.bake: bool = bake
+        if self.bake and self.chunk_size <= 0:
+            self.chunk_size = BAKE_CHUNK_SIZE
 
-        for spr in self.__sprites:
-            # Tile sprites are scaled up a bit in order to avoid texture bleeding.
-            spr.scale = float(GLOBALS[Keys.SCALING]) * TILE_SCALING
-
-        self.grid_lines = []
-        if SETTINGS[Keys.DEBUG] and SETTINGS[Keys.SHOW_TILES_GRID]:
-            # Horizontal lines.
-            for i in range(map_height + 1):
-                self.grid_lines.append(
-                    pyglet.shapes.Line(
-                        x = 0,
-                        y = i * tileset.tile_height * float(GLOBALS[Keys.SCALING]),
-                        x2 = map_width * tileset.tile_width * float(GLOBALS[Keys.SCALING]),
-                        y2 = i * tileset.tile_height * float(GLOBALS[Keys.SCALING]),
-                        thickness = 1.0,
-                        color = (0xFF, 0xFF, 0xFF, 0x22),
-                        batch = batch
-                    )
-                )
+        # Tile sprites by flat tile index.
+        self.__sprites: dict[int, ShadedSprite] = {}
+        self.__chunks: list[TileChunk] = []
 
-            # Vertical lines.
-            for i in range(map_width + 1):
-                self.grid_lines.append(
-                    pyglet.shapes.Line(
-                        y = 0,
-                        x = i * tileset.tile_width * float(GLOBALS[Keys.SCALING]),
-                        y2 = map_height * tileset.tile_height * float(GLOBALS[Keys.SCALING]),
-                        x2 = i * tileset.tile_width * float(GLOBALS[Keys.SCALING]),
-                        thickness = 1.0,
-                        color = (0xFF, 0xFF, 0xFF, 0x22),
-                        batch = batch
-                    )
-                )
+        # Debug grid lines, as (x, y, x2, y2, r, g, b, a) rows.
+        self.__grid_lines: np.ndarray | None = None
+
+        # Inverted index from property name to the coordinates (column, row) of all tiles defining it.
+        self.__property_index: dict[str, set[tuple[int, int]]] = {}
+        self.__index_properties()
 
         # Compute bounds.
         self.bounds = Bounds(
@@ -139,14 +336,336 @@ class TilemapNode(PositionNode):
             top = (map_height - int(SETTINGS[Keys.TILEMAP_BUFFER])) * tileset.tile_height
         )
 
+        # Build all sprites straight away unless asked not to.
+        if not defer_build:
+            for _ in self.build():
+                pass
+
+    def build(self) -> Generator[float, None, None]:
+        """
+        Creates all tile sprites (or chunks) and grid lines, yielding the build progress (between 0 and 1) after each sprite (or chunk).
+        This allows callers to spread the creation of graphics resources across multiple frames.
+        """
+
+        tileset: Tileset = self.__tileset
+        map_width: int = self.map_width
+        map_height: int = self.map_height
+        tiles_count: int = self.__map.size
+
+        if self.chunk_size > 0:
+            chunks_count: int = ((map_width + self.chunk_size - 1) // self.chunk_size) * ((map_height + self.chunk_size - 1) // self.chunk_size)
+
+            # Image data of all tileset textures, only needed for baking.
+            images: dict[int, pyglet.image.ImageData] = {}
+
+            for row in range(0, map_height, self.chunk_size):
+                for col in range(0, map_width, self.chunk_size):
+                    self.__chunks.append(self.__bake_chunk(col, row, images) if self.bake else self.__build_chunk(col, row))
+
+                    yield len(self.__chunks) / chunks_count
+        else:
+            for (index, tex_index) in enumerate(self.__map.ravel().tolist()):
+                if tex_index < 0:
+                    continue
+
+                self.__create_sprite(index, tex_index)
+
+                yield (index + 1) / tiles_count
+
+        if SETTINGS[Keys.DEBUG]:
+            # Horizontal lines, then vertical lines.
+            rows: np.ndarray = np.arange(map_height + 1, dtype = np.float32) * tileset.tile_height
+            cols: np.ndarray = np.arange(map_width + 1, dtype = np.float32) * tileset.tile_width
+            coords: np.ndarray = np.concatenate((
+                np.stack((np.zeros_like(rows), rows, np.full_like(rows, map_width * tileset.tile_width), rows), axis = 1),
+                np.stack((cols, np.zeros_like(cols), cols, np.full_like(cols, map_height * tileset.tile_height)), axis = 1)
+            ))
+            self.__grid_lines = np.hstack((coords, np.tile(np.array(GRID_COLOR, dtype = np.float32), (len(coords), 1))))
+            DEBUG_DRAW.add_source(self.__draw_grid, Keys.SHOW_TILES_GRID)
+
+        self.mark_dirty()
+
+        yield 1.0
+
+    def __draw_grid(self, layer: DebugDrawLayer) -> None:
+        if self.__grid_lines is not None:
+            layer.lines(self.__grid_lines)
+
+    def __create_sprite(self, index: int, tex_index: int) -> None:
+        """
+        Creates the sprite for the tile at flat [index], showing tile [tex_index].
+        """
+
+        tileset: Tileset = self.__tileset
+
+        sprite: ShadedSprite = ShadedSprite(
+            img = tileset.tiles[tex_index],
+            x = int(self.x + (index % self.map_width) * tileset.tile_width * float(GLOBALS[Keys.SCALING])),
+            y = int(self.y + (self.map_height - 1 - (index // self.map_width)) * tileset.tile_height * float(GLOBALS[Keys.SCALING])),
+            z = int(-((self.y + (self.map_height - 1 - (index // self.map_width)) * tileset.tile_height) + self.__z_offset)),
+            batch = self.__batch
+        )
+
+        # Tile sprites are scaled up a bit in order to avoid texture bleeding.
+        sprite.scale = float(GLOBALS[Keys.SCALING]) * tileset.tile_scaling
+
+        if tex_index in tileset.animations:
+            TILE_ANIMATOR.add(tileset.animations[tex_index], sprite._vertex_list, batch = self.__batch)
+
+        self.__sprites[index] = sprite
+
+    def __build_chunk(self, col: int, row: int) -> TileChunk:
+        """
+        Creates the chunk starting at tile [col], [row] (from the top left corner of the map).
+        Tiles are laid out exactly like tile sprites, but their vertices are written straight into one vertex list per texture.
+        """
+
+        tileset: Tileset = self.__tileset
+        scaling: float = float(GLOBALS[Keys.SCALING])
+        last_col: int = min(col + self.chunk_size, self.map_width)
+        last_row: int = min(row + self.chunk_size, self.map_height)
+
+        chunk: TileChunk = TileChunk(
+            x = self.x + col * tileset.tile_width * scaling,
+            y = self.y + (self.map_height - last_row) * tileset.tile_height * scaling,
+            width = (last_col - col) * tileset.tile_width * scaling,
+            height = (last_row - row) * tileset.tile_height * scaling
+        )
+
+        # Only pick non-empty tiles.
+        region: np.ndarray = self.__map[row:last_row, col:last_col]
+        (rows, cols) = np.nonzero(region >= 0)
+
+        self.__add_tiles(
+            chunk,
+            list(zip((cols + col).tolist(), (rows + row).tolist(), region[rows, cols].tolist()))
+        )
+
+        return chunk
+
+    def __add_tiles(
+        self,
+        chunk: TileChunk,
+        tiles: list[tuple[int, int, int]]
+    ) -> None:
+        """
+        Creates one vertex list per texture in [chunk] for all provided [tiles], as (column, row, tile index) tuples.
+        """
+
+        tileset: Tileset = self.__tileset
+        scaling: float = float(GLOBALS[Keys.SCALING])
+
+        # Vertex data by texture id, as (texture, positions, translations, texture coordinates, animated tiles) tuples.
+        vertex_data: dict[int, tuple[pyglet.image.Texture, list[float], list[float], list[float], list[tuple[int, TileAnimation]]]] = {}
+
+        for (tile_col, tile_row, tex_index) in tiles:
+            tile_y: float = (self.map_height - 1 - tile_row) * tileset.tile_height
+            tile: pyglet.image.TextureRegion = tileset.tiles[tex_index]
+
+            if tile.owner.id not in vertex_data:
+                vertex_data[tile.owner.id] = (tile.owner, [], [], [], [])
+
+            (_, positions, translations, tex_coords, animated) = vertex_data[tile.owner.id]
+
+            # Keep track of animated tiles by their index in the vertex list.
+            if tex_index in tileset.animations:
+                animated.append((len(positions) // 12, tileset.animations[tex_index]))
+
+            positions.extend((0, 0, 0, tile.width, 0, 0, tile.width, tile.height, 0, 0, tile.height, 0))
+            translations.extend((
+                int(self.x + tile_col * tileset.tile_width * scaling),
+                int(self.y + tile_y * scaling),
+                int(-((self.y + tile_y) + self.__z_offset))
+            ) * 4)
+            tex_coords.extend(tile.tex_coords)
+
+        for (texture, positions, translations, tex_coords, animated) in vertex_data.values():
+            tiles_count: int = len(positions) // 12
+
+            group: TileChunkGroup = TileChunkGroup(texture = texture)
+            vertex_list = depth_shader_program.vertex_list_indexed(
+                tiles_count * 4,
+                gl.GL_TRIANGLES,
+                [index + tile_index * 4 for tile_index in range(tiles_count) for index in (0, 1, 2, 0, 2, 3)],
+                self.__batch,
+                group,
+                position = ("f", positions),
+                colors = ("Bn", (255, 255, 255, 255) * tiles_count * 4),
+                translate = ("f", translations),
+                # Tiles are scaled up a bit in order to avoid texture bleeding.
+                scale = ("f", (scaling * tileset.tile_scaling, scaling * tileset.tile_scaling) * tiles_count * 4),
+                rotation = ("f", (0.0,) * tiles_count * 4),
+                tex_coords = ("f", tex_coords)
+            )
+
+            for (tile_index, animation) in animated:
+                TILE_ANIMATOR.add(animation, vertex_list, tile_index * 4, batch = self.__batch, group = group)
+
+            chunk.groups.append(group)
+            chunk.vertex_lists.append(vertex_list)
+
+    def __bake_chunk(
+        self,
+        col: int,
+        row: int,
+        images: dict[int, pyglet.image.ImageData]
+    ) -> TileChunk:
+        """
+        Renders the chunk starting at tile [col], [row] (from the top left corner of the map) into its own texture
+        and creates one quad per tile row to draw it, each at the z of its tiles.
+        [images] caches the image data of tileset textures across calls.
+        """
+
+        tileset: Tileset = self.__tileset
+        scaling: float = float(GLOBALS[Keys.SCALING])
+        last_col: int = min(col + self.chunk_size, self.map_width)
+        last_row: int = min(row + self.chunk_size, self.map_height)
+
+        chunk: TileChunk = TileChunk(
+            x = self.x + col * tileset.tile_width * scaling,
+            y = self.y + (self.map_height - last_row) * tileset.tile_height * scaling,
+            width = (last_col - col) * tileset.tile_width * scaling,
+            height = (last_row - row) * tileset.tile_height * scaling
+        )
+
+        texture: pyglet.image.Texture = pyglet.image.Texture.create(
+            width = (last_col - col) * tileset.tile_width,
+            height = (last_row - row) * tileset.tile_height,
+            min_filter = gl.GL_NEAREST,
+            mag_filter = gl.GL_NEAREST
+        )
+
+        # Set texture clamping to avoid mis-rendering subpixel edges.
+        gl.glBindTexture(texture.target, texture.id)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+        gl.glBindTexture(texture.target, 0)
+
+        # Animated tiles can't be baked, so they're drawn on top of the baked texture instead.
+        animated: list[tuple[int, int, int]] = []
+
+        # Rows holding at least one baked tile.
+        rows: list[int] = []
+        for tile_row in range(row, last_row):
+            for tile_col in range(col, last_col):
+                tex_index: int = int(self.__map[tile_row, tile_col])
+                if tex_index < 0:
+                    continue
+
+                if tex_index in tileset.animations:
+                    animated.append((tile_col, tile_row, tex_index))
+                    continue
+
+                tile: pyglet.image.TextureRegion = tileset.tiles[tex_index]
+
+                # Read each tileset texture back only once.
+                if tile.owner.id not in images:
+                    images[tile.owner.id] = tile.owner.get_image_data()
+
+                # Tiles never overlap within a layer, so they can be copied over with no blending.
+                texture.blit_into(
+                    images[tile.owner.id].get_region(tile.x, tile.y, tile.width, tile.height),
+                    (tile_col - col) * tileset.tile_width,
+                    (last_row - 1 - tile_row) * tileset.tile_height,
+                    0
+                )
+
+                if len(rows) == 0 or rows[-1] != tile_row:
+                    rows.append(tile_row)
+
+        self.__add_tiles(chunk, animated)
+
+        if len(rows) == 0:
+            texture.delete()
+            return chunk
+
+        chunk.textures.append(texture)
+
+        # Quad corners are computed exactly like tile positions, so that neighboring chunks share their edges
+        # and no bleeding fix is needed between them.
+        x_0: int = int(self.x + col * tileset.tile_width * scaling)
+        x_1: int = int(self.x + last_col * tileset.tile_width * scaling)
+        (u_0, v_0, _, u_1, _, _, _, v_1, _, _, _, _) = texture.tex_coords
+        chunk_rows: int = last_row - row
+
+        positions: list[float] = []
+        translations: list[int] = []
+        tex_coords: list[float] = []
+        for tile_row in rows:
+            # Each row is drawn as its own band of the chunk texture, at the same z as its tiles would be.
+            y_0: int = int(self.y + (self.map_height - 1 - tile_row) * tileset.tile_height * scaling)
+            y_1: int = int(self.y + (self.map_height - tile_row) * tileset.tile_height * scaling)
+            z: int = int(-((self.y + (self.map_height - 1 - tile_row) * tileset.tile_height) + self.__z_offset))
+            positions.extend((0, 0, 0, x_1 - x_0, 0, 0, x_1 - x_0, y_1 - y_0, 0, 0, y_1 - y_0, 0))
+            translations.extend((x_0, y_0, z) * 4)
+
+            # Texture rows grow upwards, while tile rows grow downwards.
+            band_0: float = v_0 + (v_1 - v_0) * (last_row - 1 - tile_row) / chunk_rows
+            band_1: float = v_0 + (v_1 - v_0) * (last_row - tile_row) / chunk_rows
+            tex_coords.extend((u_0, band_0, 0.0, u_1, band_0, 0.0, u_1, band_1, 0.0, u_0, band_1, 0.0))
+
+        bands_count: int = len(rows)
+        group: TileChunkGroup = TileChunkGroup(texture = texture)
+        chunk.groups.append(group)
+        chunk.vertex_lists.append(
+            depth_shader_program.vertex_list_indexed(
+                bands_count * 4,
+                gl.GL_TRIANGLES,
+                [index + band_index * 4 for band_index in range(bands_count) for index in (0, 1, 2, 0, 2, 3)],
+                self.__batch,
+                group,
+                position = ("f", positions),
+                colors = ("Bn", (255, 255, 255, 255) * bands_count * 4),
+                translate = ("f", translations),
+                scale = ("f", (1.0, 1.0) * bands_count * 4),
+                rotation = ("f", (0.0,) * bands_count * 4),
+                tex_coords = ("f", tex_coords)
+            )
+        )
+
+        return chunk
+
+    def cull(self, view_bounds: tuple[float, float, float, float]) -> None:
+        super().cull(view_bounds = view_bounds)
+
+        for chunk in self.__chunks:
+            chunk.set_visible(
+                rect_rect_check(
+                    chunk.x,
+                    chunk.y,
+                    chunk.width,
+                    chunk.height,
+                    *view_bounds
+                )
+            )
+
+    def get_visible_chunks_count(self) -> int:
+        return len([chunk for chunk in self.__chunks if chunk.visible])
+
+    def mark_dirty(self) -> None:
+        mark_batch_dirty(self.__batch)
+
+        super().mark_dirty()
+
     def delete(self) -> None:
-        for sprite in self.__sprites:
+        self.mark_dirty()
+
+        # Stop animating all tiles.
+        if len(self.__tileset.animations) > 0:
+            TILE_ANIMATOR.remove([sprite._vertex_list for sprite in self.__sprites.values()])
+            TILE_ANIMATOR.remove([vertex_list for chunk in self.__chunks for vertex_list in chunk.vertex_lists])
+
+        for sprite in self.__sprites.values():
             sprite.delete()
 
-        for line in self.grid_lines:
-            line.delete()
+        for chunk in self.__chunks:
+            chunk.delete()
+
+        DEBUG_DRAW.remove_source(self.__draw_grid)
+        self.__grid_lines = None
 
         self.__sprites.clear()
+        self.__chunks.clear()
 
     @staticmethod
     def from_tmx_file(
@@ -159,7 +678,8 @@ class TilemapNode(PositionNode):
         layers_spacing: int | None = None,
         # Starting z-offset for all layers in the file.
         z_offset: int = 0,
-        batch: pyglet.graphics.Batch | None = None
+        batch: pyglet.graphics.Batch | None = None,
+        bake: bool | None = None
     ) -> list:
         """
         Constructs a new TileMap from the given TMX (XML) file.
@@ -179,56 +699,82 @@ class TilemapNode(PositionNode):
         layers_spacing: int | None
         z_offset: int
         batch: pyglet.graphics.Batch | None
+        bake: bool | None
+            Whether to bake dig and pid layers into textures or not, read from settings if not provided.
         """
 
-        root: xml.Element[str] = xml.parse(f"{pyglet.resource.path[0]}/{source}").getroot()
-
-        map_width: int = int(root.attrib["width"])
-        map_height: int = int(root.attrib["height"])
+        return TilemapNode.from_tmx_map(
+            tmx_map = TmxLoader.fetch(
+                source = source,
+                tilesets_path = tilesets_path
+            ),
+            x = x,
+            y = y,
+            layers_spacing = layers_spacing,
+            z_offset = z_offset,
+            batch = batch,
+            bake = bake
+        )
 
-        tile_width: int = int(root.attrib["tilewidth"])
-        tile_height: int = int(root.attrib["tileheight"])
+    @staticmethod
+    def from_tmx_map(
+        tmx_map: TmxMap,
+        x: float = 0.0,
+        y: float = 0.0,
+        # Distance (z-axis) between tilemap layers.
+        layers_spacing: int | None = None,
+        # Starting z-offset for all layers in the map.
+        z_offset: int = 0,
+        batch: pyglet.graphics.Batch | None = None,
+        defer_build: bool = False,
+        tileset: Tileset | None = None,
+        bake: bool | None = None
+    ) -> list:
+        """
+        Constructs a new TileMap from the given, already parsed, TMX map.
+        See [from_tmx_file] for layers naming.
+        If [defer_build] is True, then no sprite is created until [build] is called on each returned tilemap.
+        If [tileset] is provided, then it's used instead of loading a new one.
+        If [bake] is True, then all layers but rat ones are baked into textures (read from settings if not provided).
+        """
 
-        tilemap_tilesets: list[xml.Element[str]] = root.findall("tileset")
+        # Infinite maps can only be streamed.
+        if tmx_map.infinite:
+            raise ValueError("Infinite maps can only be loaded through StreamingTilemapNode")
 
         # Read layers spacing from settings if not provided.
         spacing = layers_spacing if layers_spacing is not None else int(SETTINGS[Keys.LAYERS_Z_SPACING])
 
-        # Extract a tileset from all the given file.
-        tileset = Tileset(
-            sources = [f"{tilesets_path if tilesets_path is not None else 'tilesets/rughai/'}{ts.attrib['source'].split('/')[-1].split('.')[0]}.png" for ts in tilemap_tilesets],
-            tile_width = tile_width,
-            tile_height = tile_height
-        )
-
-        tilemap_layers = root.findall("layer")
-        layers = []
-        for layer in tilemap_layers:
-            # Check layer name in order to know whether to z-sort tiles or not.
-            layer_name = layer.attrib["name"]
+        # Read baking from settings if not provided.
+        bake_layers: bool = bake if bake is not None else bool(SETTINGS[Keys.BAKE_STATIC_LAYERS])
 
-            layer_data = layer.find("data")
+        # Extract a tileset from all the given file if not provided, reusing cached ones.
+        if tileset is None:
+            tileset = Tileset.fetch(
+                sources = tmx_map.tileset_sources,
+                tile_width = tmx_map.tile_width,
+                tile_height = tmx_map.tile_height
+            )
 
-            if layer_data is None or layer_data.text is None:
-                # The provided file does not contain valid information.
-                raise ValueError("TMX layer data not found")
+        tileset.set_animations(tmx_map.animations)
+        tileset.set_tile_properties(tmx_map.tile_properties)
 
-            # Remove all newline characters and split by comma.
-            layer_content = layer_data.text.replace("\n", "").split(",")
-
-            layers.append((layer_name, layer_content))
+        layers: list[tuple[str, np.ndarray]] = tmx_map.layers
 
         return [
             TilemapNode(
                 tileset = tileset,
-                data = [int(i) - 1 for i in layer[1]],
-                map_width = map_width,
-                map_height = map_height,
+                data = layer[1],
+                map_width = tmx_map.map_width,
+                map_height = tmx_map.map_height,
                 x = x,
                 y = y,
                 # Only apply layers offset if not a rat layer.
                 z_offset = 0 if "rat" in layer[0] else z_offset + spacing * (len(layers) - layer_index),
-                batch = batch
+                batch = batch,
+                defer_build = defer_build,
+                # Rat layers need their tiles to be z-sorted, so they can't be baked.
+                bake = bake_layers and "rat" not in layer[0]
             ) for layer_index, layer in enumerate(layers)
         ]
 
@@ -241,4 +787,159 @@ class TilemapNode(PositionNode):
         )
 
     def get_tile_size(self) -> tuple[int, int]:
-        return (self.__tileset.tile_width, self.__tileset.tile_height)
\ No newline at end of file
+        return (self.__tileset.tile_width, self.__tileset.tile_height)
+
+    def __index_properties(self) -> None:
+        """
+        Builds the inverted index from property names to tile coordinates.
+        """
+
+        self.__property_index.clear()
+
+        if len(self.__tileset.tile_properties) <= 0:
+            return
+
+        # Only visit tiles defining any property.
+        mask: np.ndarray = np.isin(self.__map, list(self.__tileset.tile_properties.keys()))
+        for (row, col) in np.argwhere(mask).tolist():
+            for name in self.__tileset.tile_properties[int(self.__map[row, col])].keys():
+                self.__property_index.setdefault(name, set()).add((col, row))
+
+    def get_tile(self, col: int, row: int) -> int:
+        """
+        Returns the index of the tile at [col], [row] (starting from the top left corner of the map), -1 if empty.
+        """
+
+        return int(self.__map[row, col])
+
+    def get_tile_coords(self, x: float, y: float) -> tuple[int, int] | None:
+        """
+        Returns the coordinates (column, row) of the tile at world position [x], [y], or None if outside of the map.
+        """
+
+        col: int = int((x - self.x) // self.__tileset.tile_width)
+        row: int = self.map_height - 1 - int((y - self.y) // self.__tileset.tile_height)
+
+        if col < 0 or col >= self.map_width or row < 0 or row >= self.map_height:
+            return None
+
+        return (col, row)
+
+    def get_tile_at(self, x: float, y: float) -> int:
+        """
+        Returns the index of the tile at world position [x], [y], -1 if empty or outside of the map.
+        """
+
+        coords: tuple[int, int] | None = self.get_tile_coords(x, y)
+
+        return self.get_tile(*coords) if coords is not None else -1
+
+    def set_tile(self, col: int, row: int, tex_index: int) -> None:
+        """
+        Sets the tile at [col], [row] (starting from the top left corner of the map) to [tex_index] (-1 to clear it)
+        and updates its graphics, if already built.
+        """
+
+        previous: int = int(self.__map[row, col])
+        if previous == tex_index:
+            return
+
+        self.__map[row, col] = tex_index
+
+        # Update the properties index.
+        for name in self.__tileset.tile_properties.get(previous, {}).keys():
+            self.__property_index[name].discard((col, row))
+        for name in self.__tileset.tile_properties.get(tex_index, {}).keys():
+            self.__property_index.setdefault(name, set()).add((col, row))
+
+        if len(self.__chunks) > 0:
+            # Rebuild the whole chunk containing the tile.
+            chunks_per_row: int = (self.map_width + self.chunk_size - 1) // self.chunk_size
+            chunk_index: int = (row // self.chunk_size) * chunks_per_row + col // self.chunk_size
+            chunk_col: int = (col // self.chunk_size) * self.chunk_size
+            chunk_row: int = (row // self.chunk_size) * self.chunk_size
+
+            chunk: TileChunk = self.__chunks[chunk_index]
+            if len(self.__tileset.animations) > 0:
+                TILE_ANIMATOR.remove(chunk.vertex_lists)
+            chunk.delete()
+
+            new_chunk: TileChunk = self.__bake_chunk(chunk_col, chunk_row, {}) if self.bake else self.__build_chunk(chunk_col, chunk_row)
+            new_chunk.set_visible(chunk.visible)
+            self.__chunks[chunk_index] = new_chunk
+        else:
+            index: int = row * self.map_width + col
+
+            if index in self.__sprites:
+                sprite: ShadedSprite = self.__sprites.pop(index)
+                if len(self.__tileset.animations) > 0:
+                    TILE_ANIMATOR.remove([sprite._vertex_list])
+                sprite.delete()
+
+            if tex_index >= 0:
+                self.__create_sprite(index, tex_index)
+
+        self.mark_dirty()
+
+    def get_region(
+        self,
+        col: int,
+        row: int,
+        width: int,
+        height: int
+    ) -> np.ndarray:
+        """
+        Returns a read-only view of the tiles in the provided region, as a (height, width) array of tile indices.
+        [col] and [row] define the top left corner of the region.
+        """
+
+        region: np.ndarray = self.__map[row:row + height, col:col + width]
+        region.flags.writeable = False
+
+        return region
+
+    def get_tile_properties(self, col: int, row: int) -> dict[str, Any]:
+        """
+        Returns the custom properties of the tile at [col], [row].
+        """
+
+        return self.__tileset.tile_properties.get(int(self.__map[row, col]), {})
+
+    def find_tiles(
+        self,
+        name: str,
+        value: Any = None
+    ) -> list[tuple[int, int]]:
+        """
+        Returns the coordinates (column, row) of all tiles defining property [name], optionally only if equal to [value].
+        """
+
+        coords: set[tuple[int, int]] = self.__property_index.get(name, set())
+
+        if value is None:
+            return list(coords)
+
+        return [(col, row) for (col, row) in coords if self.get_tile_properties(col, row)[name] == value]
+
+    def find_tiles_in_region(
+        self,
+        name: str,
+        col: int,
+        row: int,
+        width: int,
+        height: int,
+        value: Any = None
+    ) -> list[tuple[int, int]]:
+        """
+        Returns the coordinates (column, row) of all tiles in the provided region defining property [name],
+        optionally only if equal to [value].
+        """
+
+        tile_indices: list[int] = [
+            tile_index for tile_index, properties in self.__tileset.tile_properties.items()
+            if name in properties and (value is None or properties[name] == value)
+        ]
+
+        region: np.ndarray = self.__map[row:row + height, col:col + width]
+
+        return [(region_col + col, region_row + row) for (region_row, region_col) in np.argwhere(np.isin(region, tile_indices)).tolist()]
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+This file contains the frame tracer used to record timed spans and export them as Chrome trace events.
+The resulting files can be opened in chrome://tracing or Perfetto.
+"""
+
+from collections import deque
+from contextlib import nullcontext
+import json
+import os
+import threading
+import time
+import pyglet
+
+from amonite.debug_stats import set_stat
+
+# Default maximum amount of recorded spans.
+DEFAULT_CAPACITY: int = 65536
+
+# Shared no-op span, returned while tracing is disabled.
+NULL_SPAN: nullcontext = nullcontext()
+
+class TraceSpan:
+    """
+    Single timed span, records itself in its tracer on exit.
+    """
+
+    __slots__ = (
+        "tracer",
+        "name",
+        "category",
+        "start"
+    )
+
+    def __init__(
+        self,
+        tracer,
+        name: str,
+        category: str
+    ) -> None:
+        self.tracer: FrameTracer = tracer
+        self.name: str = name
+        self.category: str = category
+        self.start: int = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, exception_type, exception_value, traceback) -> None:
+        self.tracer.record(
+            name = self.name,
+            category = self.category,
+            start = self.start,
+            duration = time.perf_counter_ns() - self.start
+        )
+
+class FrameTracer:
+    """
+    Lightweight frame tracer.
+
+    Named spans are stored in a ring buffer, so that the last few seconds can be captured at any time
+    and dumped as Chrome trace-event JSON.
+    While disabled, [span] returns a shared no-op context manager.
+
+    Usage::
+
+        with TRACER.span("my_work"):
+            do_work()
+    """
+
+    __slots__ = (
+        "enabled",
+        "__events"
+    )
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.enabled: bool = False
+
+        # Recorded spans as (name, category, start (ns), duration (ns), thread id) tuples.
+        self.__events: deque[tuple[str, str, int, int, int]] = deque(maxlen = capacity)
+
+    def span(
+        self,
+        name: str,
+        category: str = "amonite"
+    ) -> TraceSpan | nullcontext:
+        """
+        Returns a context manager that records the time spent in its block as a span named [name].
+        """
+
+        if not self.enabled:
+            return NULL_SPAN
+
+        return TraceSpan(
+            tracer = self,
+            name = name,
+            category = category
+        )
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        duration: int
+    ) -> None:
+        """
+        Records a span that started at [start] (ns, from time.perf_counter_ns) and lasted [duration] ns.
+        """
+
+        self.__events.append((name, category, start, duration, threading.get_ident()))
+
+    def capture(self, seconds: float | None = None) -> list[dict]:
+        """
+        Returns all spans recorded in the last [seconds] seconds (or all recorded spans if None) as Chrome trace events.
+        """
+
+        threshold: int = time.perf_counter_ns() - int(seconds * 1e9) if seconds is not None else 0
+        pid: int = os.getpid()
+
+        return [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid
+            } for (name, category, start, duration, tid) in list(self.__events) if start >= threshold
+        ]
+
+    def dump(
+        self,
+        dest: str,
+        seconds: float | None = None
+    ) -> None:
+        """
+        Saves all spans recorded in the last [seconds] seconds to [dest] as a Chrome trace JSON file.
+        """
+
+        with open(file = dest, mode = "w", encoding = "UTF8") as dest_file:
+            dest_file.write(
+                json.dumps(
+                    {
+                        "traceEvents": self.capture(seconds = seconds),
+                        "displayTimeUnit": "ms"
+                    }
+                )
+            )
+
+    def clear(self) -> None:
+        self.__events.clear()
+
+    def bind_hotkey(
+        self,
+        window: pyglet.window.BaseWindow,
+        dest: str = "trace.json",
+        seconds: float = 5.0,
+        key: int = pyglet.window.key.F9
+    ) -> None:
+        """
+        Dumps the last [seconds] seconds to [dest] every time [key] is pressed on [window].
+        The last dump destination is published to debug stats.
+        """
+
+        def on_key_press(symbol: int, modifiers: int) -> None:
+            if symbol == key:
+                self.dump(dest = dest, seconds = seconds)
+                set_stat("trace", f"saved to {dest}")
+
+        window.push_handlers(on_key_press = on_key_press)
+
+TRACER: FrameTracer = FrameTracer()
\ No newline at end of file
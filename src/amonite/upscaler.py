@@ -46,10 +46,10 @@ The method used in this example is:
 4. Unbind the Framebuffer, and blit the Texture scaled to fill the screen.
 """
 
-from ctypes import byref
 import pyglet
 import pyglet.gl as gl
 
+from amonite.post_processing import PostProcessChain, PostProcessPass, RenderTarget, RenderTargetPool
 from amonite.shaded_sprite import ShadedSprite
 from amonite.settings import GLOBALS, Keys
 
@@ -118,12 +118,20 @@ class Upscaler:
         self.__exit__()
 
 class TrueUpscaler:
+    """
+    Renders the scene to a render target at render resolution, runs post-processing passes on it and draws it upscaled to the window.
+
+    All render targets (the main one included) come from a [RenderTargetPool] at render resolution,
+    so window resizes never reallocate them and effects only cost as much as the render resolution.
+    """
+
     def __init__(
         self,
         window: pyglet.window.BaseWindow,
         render_width: int,
         render_height: int,
-        program: pyglet.graphics.shader.ShaderProgram | None = None
+        program: pyglet.graphics.shader.ShaderProgram | None = None,
+        pool: RenderTargetPool | None = None
     ) -> None:
         self.window: pyglet.window.BaseWindow = window
         self.render_width: int = render_width
@@ -134,41 +142,21 @@ class TrueUpscaler:
         self.render_area: tuple[float, float, float, float] = self.__compute_area(window.size, self.aspect)
         window.push_handlers(self)
 
-        # Generate a framebuffer to render to.
-        self.framebuffer_id = gl.GLuint()
-        gl.glGenFramebuffers(1, byref(self.framebuffer_id))
-        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer_id)
+        # Post-processing passes, run on the render target before upscaling it.
+        self.post_processing: PostProcessChain = PostProcessChain(pool = pool)
 
-        # Make sure the frame buffer is complete.
-        assert gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER) != gl.GL_FRAMEBUFFER_COMPLETE, "framebuffer is not complete"
+        # Render target, with a depth buffer at render resolution.
+        self.target: RenderTarget = self.post_processing.pool.acquire(render_width, render_height, depth = True)
+        self.framebuffer_id: gl.GLuint = self.target.framebuffer_id
+        self.depthbuffer_id: gl.GLuint = self.target.depthbuffer_id
+        self.texture: pyglet.image.Texture = self.target.texture
 
-        # Generate a texture to attach to the framebuffer.
-        # image: pyglet.image.ImageData = pyglet.image.create(width = render_width, height = render_height)
-        self.texture: pyglet.image.Texture = pyglet.image.Texture.create(
-            width = render_width,
-            height = render_height
-        )
         self.sprite: ShadedSprite = ShadedSprite(
             img = self.texture,
             blend_src = gl.GL_ONE,
             blend_dest = gl.GL_ONE,
             program = program
         )
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.texture.id)
-        gl.glTexParameteri(self.texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
-        gl.glTexParameteri(self.texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
-
-        # Bind the framebuffer to the destination texture.
-        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, self.texture.id, 0)
-
-        # Setup the depth buffer.
-        self.depthbuffer_id = gl.GLuint()
-        gl.glGenRenderbuffers(1, byref(self.depthbuffer_id))
-        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.depthbuffer_id)
-        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH_COMPONENT, window.width, window.height)
-
-        # Bind the generated depthbuffer to the framebuffer.
-        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depthbuffer_id)
 
     def on_resize(self, width, height):
         self.aspect = self.__compute_aspect(self.window.size)
@@ -210,7 +198,7 @@ class TrueUpscaler:
 
     def begin(self):
         # Bind the destination framebuffer and enable depth testing.
-        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.framebuffer_id)
+        self.target.bind()
         gl.glEnable(gl.GL_DEPTH_TEST)
         # gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_COLOR)
 
@@ -223,10 +211,32 @@ class TrueUpscaler:
         gl.glDisable(gl.GL_DEPTH_TEST)
         # gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE)
 
+        # Run all effects at render resolution, the result is left in the render target.
+        self.post_processing.run(self.target)
+
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        gl.glViewport(0, 0, *self.window.get_framebuffer_size())
+
         self.sprite.draw()
 
     def set_program(
         self,
         program: pyglet.graphics.shader.ShaderProgram
     ):
-        self.sprite.program = program
\ No newline at end of file
+        self.sprite.program = program
+
+    def add_pass(self, post_pass: PostProcessPass) -> None:
+        """
+        Appends [post_pass] to the post-processing passes.
+        """
+
+        self.post_processing.add_pass(post_pass)
+
+    def remove_pass(self, post_pass: PostProcessPass) -> None:
+        self.post_processing.remove_pass(post_pass)
+
+    def delete(self) -> None:
+        self.window.remove_handlers(self)
+        self.sprite.delete()
+        self.post_processing.pool.release(self.target)
+        self.post_processing.delete()
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""
+This file contains the reader and writer for compiled maps (.amap files).
+
+Layout (little-endian):
+- header: magic (4 bytes), version (uint16), JSON metadata length (uint32);
+- JSON metadata, describing the map, its layers, tile animations and properties, its hittables and the source files it was compiled from;
+- raw arrays, each aligned to [AMAP_ALIGNMENT] bytes and located by offsets relative to the start of the section: one int32 tile indices array per layer
+  and one (count, 6) int32 hittables array (x, y, width, height, sensor, tags index).
+
+Arrays are read straight from a memory map, so loading a compiled map requires no parsing at all.
+"""
+
+import json
+import os
+import struct
+from typing import Any
+import numpy as np
+import pyglet
+
+# File extension of compiled maps.
+AMAP_EXTENSION: str = ".amap"
+
+AMAP_MAGIC: bytes = b"AMAP"
+AMAP_VERSION: int = 1
+AMAP_HEADER_FORMAT: str = "<4sHI"
+
+# Alignment (in bytes) of all raw arrays.
+AMAP_ALIGNMENT: int = 16
+
+class AmapFile:
+    """
+    Content of a compiled map.
+    Map and hittables sections are both optional, so each is None if not compiled in.
+    """
+
+    __slots__ = (
+        "sources",
+        "map_width",
+        "map_height",
+        "tile_width",
+        "tile_height",
+        "tilesets",
+        "layers",
+        "animations",
+        "tile_properties",
+        "hittables"
+    )
+
+    def __init__(
+        self,
+        sources: list[str],
+        map_width: int = 0,
+        map_height: int = 0,
+        tile_width: int = 0,
+        tile_height: int = 0,
+        tilesets: list[str] | None = None,
+        layers: list[tuple[str, np.ndarray]] | None = None,
+        animations: dict[int, list[tuple[int, float]]] | None = None,
+        tile_properties: dict[int, dict[str, Any]] | None = None,
+        hittables: list[tuple[int, int, int, int, bool, list[str]]] | None = None
+    ) -> None:
+        # Source files (starting from the defined assets directory) the map was compiled from.
+        self.sources: list[str] = sources
+
+        self.map_width: int = map_width
+        self.map_height: int = map_height
+        self.tile_width: int = tile_width
+        self.tile_height: int = tile_height
+
+        # Tileset image names, with no path.
+        self.tilesets: list[str] | None = tilesets
+
+        self.layers: list[tuple[str, np.ndarray]] | None = layers
+
+        # Animated tiles as tile index -> [(frame tile index, frame duration (s))].
+        self.animations: dict[int, list[tuple[int, float]]] | None = animations
+
+        # Custom tile properties as tile index -> {name: value}.
+        self.tile_properties: dict[int, dict[str, Any]] | None = tile_properties
+        self.hittables: list[tuple[int, int, int, int, bool, list[str]]] | None = hittables
+
+    @staticmethod
+    def get_path(source: str) -> str:
+        """
+        Returns the path of the compiled map for [source] (starting from the defined assets directory).
+        """
+
+        return f"{os.path.splitext(source)[0]}{AMAP_EXTENSION}"
+
+    @staticmethod
+    def fetch(source: str) -> "AmapFile | None":
+        """
+        Reads the compiled map for [source], only if present and newer than all the files it was compiled from.
+        Returns None otherwise.
+        """
+
+        abs_path: str = os.path.join(pyglet.resource.path[0], AmapFile.get_path(source))
+
+        if not os.path.exists(abs_path):
+            return None
+
+        amap: AmapFile = AmapFile.read(abs_path)
+
+        # Discard stale compiled maps.
+        compiled_time: float = os.path.getmtime(abs_path)
+        for amap_source in amap.sources:
+            source_path: str = os.path.join(pyglet.resource.path[0], amap_source)
+            if os.path.exists(source_path) and os.path.getmtime(source_path) > compiled_time:
+                return None
+
+        return amap
+
+    @staticmethod
+    def read(abs_path: str) -> "AmapFile":
+        """
+        Memory-maps and returns the compiled map at [abs_path].
+        """
+
+        data: np.memmap = np.memmap(abs_path, dtype = np.uint8, mode = "r")
+
+        (magic, version, metadata_length) = struct.unpack_from(AMAP_HEADER_FORMAT, data, 0)
+        if magic != AMAP_MAGIC or version != AMAP_VERSION:
+            raise ValueError(f"Invalid compiled map {abs_path}")
+
+        header_size: int = struct.calcsize(AMAP_HEADER_FORMAT)
+        metadata: dict[str, Any] = json.loads(bytes(data[header_size:header_size + metadata_length]).decode("UTF8"))
+
+        # Raw arrays start right after the metadata, aligned.
+        arrays_start: int = header_size + metadata_length
+        arrays_start += -arrays_start % AMAP_ALIGNMENT
+
+        amap: AmapFile = AmapFile(sources = metadata["sources"])
+
+        map_metadata: dict[str, Any] | None = metadata["map"]
+        if map_metadata is not None:
+            amap.map_width = map_metadata["width"]
+            amap.map_height = map_metadata["height"]
+            amap.tile_width = map_metadata["tile_width"]
+            amap.tile_height = map_metadata["tile_height"]
+            amap.tilesets = map_metadata["tilesets"]
+            amap.layers = [
+                (layer["name"], np.frombuffer(data, dtype = "<i4", count = layer["count"], offset = arrays_start + layer["offset"]))
+                for layer in map_metadata["layers"]
+            ]
+            amap.animations = {
+                int(tile_index): [(frame_index, duration) for (frame_index, duration) in frames]
+                for tile_index, frames in map_metadata.get("animations", {}).items()
+            }
+            amap.tile_properties = {
+                int(tile_index): properties
+                for tile_index, properties in map_metadata.get("tile_properties", {}).items()
+            }
+
+        hittables_metadata: dict[str, Any] | None = metadata["hittables"]
+        if hittables_metadata is not None:
+            tags: list[list[str]] = hittables_metadata["tags"]
+            hittables: np.ndarray = np.frombuffer(
+                data,
+                dtype = "<i4",
+                count = hittables_metadata["count"] * 6,
+                offset = arrays_start + hittables_metadata["offset"]
+            ).reshape((-1, 6))
+
+            amap.hittables = [
+                (x, y, width, height, bool(sensor), list(tags[tags_index]))
+                for (x, y, width, height, sensor, tags_index) in hittables.tolist()
+            ]
+
+        return amap
+
+    def write(self, abs_path: str) -> None:
+        """
+        Saves the compiled map to [abs_path].
+        """
+
+        # Raw arrays, offsets are relative to the start of the arrays section.
+        arrays: list[bytes] = []
+        offset: int = 0
+
+        def add_array(array: np.ndarray) -> int:
+            nonlocal offset
+
+            array_offset: int = offset
+            raw: bytes = np.ascontiguousarray(array, dtype = "<i4").tobytes()
+            padding: int = -len(raw) % AMAP_ALIGNMENT
+            arrays.append(raw + bytes(padding))
+            offset += len(raw) + padding
+
+            return array_offset
+
+        map_metadata: dict[str, Any] | None = None
+        if self.layers is not None:
+            map_metadata = {
+                "width": self.map_width,
+                "height": self.map_height,
+                "tile_width": self.tile_width,
+                "tile_height": self.tile_height,
+                "tilesets": self.tilesets if self.tilesets is not None else [],
+                "layers": [{"name": name, "offset": add_array(layer), "count": len(layer)} for (name, layer) in self.layers],
+                "animations": self.animations if self.animations is not None else {},
+                "tile_properties": self.tile_properties if self.tile_properties is not None else {}
+            }
+
+        hittables_metadata: dict[str, Any] | None = None
+        if self.hittables is not None:
+            tags: list[list[str]] = []
+            rows: list[tuple[int, int, int, int, int, int]] = []
+            for (x, y, width, height, sensor, hittable_tags) in self.hittables:
+                if hittable_tags not in tags:
+                    tags.append(hittable_tags)
+                rows.append((x, y, width, height, int(sensor), tags.index(hittable_tags)))
+
+            hittables_metadata = {
+                "offset": add_array(np.array(rows, dtype = "<i4").reshape((-1, 6))),
+                "count": len(rows),
+                "tags": tags
+            }
+
+        metadata: bytes = json.dumps(
+            {
+                "sources": self.sources,
+                "map": map_metadata,
+                "hittables": hittables_metadata
+            }
+        ).encode("UTF8")
+
+        header_size: int = struct.calcsize(AMAP_HEADER_FORMAT)
+        padding: int = -(header_size + len(metadata)) % AMAP_ALIGNMENT
+
+        with open(file = abs_path, mode = "wb") as dest_file:
+            dest_file.write(struct.pack(AMAP_HEADER_FORMAT, AMAP_MAGIC, AMAP_VERSION, len(metadata)))
+            dest_file.write(metadata)
+            dest_file.write(bytes(padding))
+            for raw in arrays:
+                dest_file.write(raw)
\ No newline at end of file
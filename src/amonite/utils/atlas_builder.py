@@ -0,0 +1,86 @@
+import math
+import numpy as np
+import pyglet
+import pyglet.gl as gl
+
+class AtlasBuilder:
+    @staticmethod
+    def pack(
+        regions: list[pyglet.image.TextureRegion],
+        extrude: int = 1
+    ) -> list[pyglet.image.TextureRegion]:
+        """
+        Packs all provided [regions] (possibly from different textures) into a single new texture
+        and returns the packed regions, in the same order.
+        Each region is surrounded by [extrude] pixels replicating its edges, so that sampling slightly outside of it
+        never picks neighboring content: this allows regions to be drawn at their exact size with no bleeding.
+        """
+
+        # Read each source texture back only once, as (height, width, RGBA) arrays with the bottom row first.
+        sources: dict[int, np.ndarray] = {}
+        for region in regions:
+            if region.owner.id in sources:
+                continue
+
+            image_data: pyglet.image.ImageData = region.owner.get_image_data()
+            sources[region.owner.id] = np.frombuffer(
+                image_data.get_data("RGBA", image_data.width * 4),
+                dtype = np.uint8
+            ).reshape((image_data.height, image_data.width, 4))
+
+        # Shelf-pack all cells in rows, aiming for a roughly square atlas.
+        cells: list[tuple[int, int]] = [(region.width + extrude * 2, region.height + extrude * 2) for region in regions]
+        atlas_width: int = max(
+            max(cell[0] for cell in cells),
+            math.ceil(math.sqrt(sum(cell[0] * cell[1] for cell in cells)))
+        )
+
+        positions: list[tuple[int, int]] = []
+        x: int = 0
+        y: int = 0
+        shelf_height: int = 0
+        for (cell_width, cell_height) in cells:
+            if x + cell_width > atlas_width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+
+            positions.append((x, y))
+            x += cell_width
+            shelf_height = max(shelf_height, cell_height)
+
+        atlas_height: int = y + shelf_height
+
+        # Copy all regions, extruding their edges.
+        atlas: np.ndarray = np.zeros((atlas_height, atlas_width, 4), dtype = np.uint8)
+        for region, (cell_x, cell_y), (cell_width, cell_height) in zip(regions, positions, cells):
+            pixels: np.ndarray = sources[region.owner.id][region.y:region.y + region.height, region.x:region.x + region.width]
+
+            atlas[cell_y:cell_y + cell_height, cell_x:cell_x + cell_width] = np.pad(
+                pixels,
+                ((extrude, extrude), (extrude, extrude), (0, 0)),
+                mode = "edge"
+            )
+
+        texture: pyglet.image.Texture = pyglet.image.ImageData(
+            atlas_width,
+            atlas_height,
+            "RGBA",
+            atlas.tobytes()
+        ).get_texture()
+
+        gl.glBindTexture(texture.target, texture.id)
+
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+
+        # Set texture clamping to avoid mis-rendering subpixel edges.
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+
+        gl.glBindTexture(texture.target, 0)
+
+        return [
+            texture.get_region(cell_x + extrude, cell_y + extrude, region.width, region.height)
+            for region, (cell_x, cell_y) in zip(regions, positions)
+        ]
\ No newline at end of file
@@ -1,6 +1,6 @@
 import os
 import json
-from typing import Any
+from typing import Any, Generator
 import pyglet
 
 from amonite import controllers
@@ -9,6 +9,8 @@ from amonite.collision.collision_node import CollisionNode
 from amonite.collision.collision_node import CollisionType
 from amonite.collision.collision_node import CollisionNode
 from amonite.collision.collision_shape import CollisionRect
+from amonite.tracer import TRACER
+from amonite.utils.amap_file import AmapFile
 
 class HittableNode(PositionNode):
     """
@@ -63,55 +65,96 @@ class HittablesLoader:
         Reads and returns the list of walls from the file provided in [source].
         """
 
-        walls_list: list[HittableNode] = []
+        return list(HittablesLoader.create(
+            data = HittablesLoader.read(source = source),
+            batch = batch
+        ))
 
-        abs_path: str = os.path.join(pyglet.resource.path[0], source)
+    @staticmethod
+    def read(
+        source: str,
+        compiled: bool = True
+    ) -> list[tuple[int, int, int, int, bool, list[str]]]:
+        """
+        Reads and returns the raw hittables data from the file provided in [source].
+        Each hittable is described as a (x, y, width, height, sensor, tags) tuple.
+        If [compiled] is True, then an up-to-date compiled map (see [MapCompiler]) is used in place of the file when present.
+        No graphics resource is created, so this is safe to call off the main thread.
+        """
+
+        with TRACER.span("HittablesLoader.read", "loader"):
+            amap: AmapFile | None = AmapFile.fetch(source) if compiled else None
+            if amap is not None and amap.hittables is not None:
+                return amap.hittables
 
-        # Return an empty list if the source file is not found.
-        if not os.path.exists(abs_path):
-            return []
+            hittables_data: list[tuple[int, int, int, int, bool, list[str]]] = []
 
-        print(f"Loading hittables {abs_path}")
+            abs_path: str = os.path.join(pyglet.resource.path[0], source)
 
-        data: dict[str, Any]
+            # Return an empty list if the source file is not found.
+            if not os.path.exists(abs_path):
+                return []
 
-        # Load the json file.
-        with open(file = abs_path, mode = "r", encoding = "UTF8") as source_file:
-            data = json.load(source_file)
+            print(f"Loading hittables {abs_path}")
 
-        # Just return if no data is read.
-        if len(data) <= 0:
-            return []
+            data: dict[str, Any]
 
-        # Loop through defined wall types.
-        for element in data["elements"]:
-            positions: list[str] = element["positions"]
-            sizes: list[str] = element["sizes"]
+            # Load the json file.
+            with open(file = abs_path, mode = "r", encoding = "UTF8") as source_file:
+                data = json.load(source_file)
 
-            assert len(positions) == len(sizes)
+            # Just return if no data is read.
+            if len(data) <= 0:
+                return []
 
-            # Loop through single walls.
-            for i in range(len(positions)):
-                position_string: str = positions[i]
-                size_string: str = sizes[i]
+            # Loop through defined wall types.
+            for element in data["elements"]:
+                positions: list[str] = element["positions"]
+                sizes: list[str] = element["sizes"]
 
-                position: list[int] = list(map(lambda item: int(item), position_string.split(",")))
-                size: list[int] = list(map(lambda item: int(item), size_string.split(",")))
+                assert len(positions) == len(sizes)
 
-                assert len(position) == 2 and len(size) == 2
+                # Loop through single walls.
+                for i in range(len(positions)):
+                    position_string: str = positions[i]
+                    size_string: str = sizes[i]
 
-                # Create a new wall node and add it to the result.
-                walls_list.append(HittableNode(
-                    x = position[0],
-                    y = position[1],
-                    width = int(size[0]),
-                    height = size[1],
-                    sensor = element["sensor"] if "sensor" in element.keys() else False,
-                    tags = element["tags"],
-                    batch = batch
-                ))
+                    position: list[int] = list(map(lambda item: int(item), position_string.split(",")))
+                    size: list[int] = list(map(lambda item: int(item), size_string.split(",")))
 
-        return walls_list
+                    assert len(position) == 2 and len(size) == 2
+
+                    hittables_data.append((
+                        position[0],
+                        position[1],
+                        int(size[0]),
+                        size[1],
+                        element["sensor"] if "sensor" in element.keys() else False,
+                        element["tags"]
+                    ))
+
+            return hittables_data
+
+    @staticmethod
+    def create(
+        data: list[tuple[int, int, int, int, bool, list[str]]],
+        batch: pyglet.graphics.Batch | None = None
+    ) -> Generator[HittableNode, None, None]:
+        """
+        Creates and yields a new hittable node for each entry in [data], as returned by [read].
+        """
+
+        for (x, y, width, height, sensor, tags) in data:
+            # Create a new wall node.
+            yield HittableNode(
+                x = x,
+                y = y,
+                width = width,
+                height = height,
+                sensor = sensor,
+                tags = tags,
+                batch = batch
+            )
 
     @staticmethod
     def store(
@@ -0,0 +1,107 @@
+import os
+import pyglet
+
+from amonite.utils.amap_file import AmapFile
+from amonite.utils.hittables_loader import HittablesLoader
+from amonite.utils.tmx_loader import TmxLoader, TmxMap
+
+class MapCompiler:
+    @staticmethod
+    def compile(
+        tmx_source: str | None = None,
+        hittables_source: str | None = None
+    ) -> list[str]:
+        """
+        Compiles the TMX file provided in [tmx_source] and the hittables file provided in [hittables_source] into
+        a compiled map, which is then loaded by [TmxLoader] and [HittablesLoader] in place of its sources.
+        The compiled map is saved next to [tmx_source] and, if its path differs, next to [hittables_source] as well.
+        Both paths start from the defined assets directory.
+        Returns the paths of all saved files.
+        """
+
+        # Compiled maps are saved next to these.
+        map_sources: list[str] = [source for source in (tmx_source, hittables_source) if source is not None]
+        sources: list[str] = list(map_sources)
+
+        # External tilesets hold data compiled into the map as well (tile animations and properties),
+        # so they're tracked as sources in order for edits to them to invalidate the compiled map.
+        if tmx_source is not None:
+            sources.extend(TmxLoader.get_external_tilesets(source = tmx_source))
+
+        amap: AmapFile = AmapFile(sources = sources)
+
+        if tmx_source is not None:
+            # Parse with an empty tilesets path, so that only image names are kept.
+            tmx_map: TmxMap = TmxLoader.fetch(
+                source = tmx_source,
+                tilesets_path = "",
+                compiled = False
+            )
+
+            # Infinite maps are streamed by chunks, so there are no layers to compile.
+            if tmx_map.infinite:
+                raise ValueError(f"Cannot compile infinite map {tmx_source}")
+
+            amap.map_width = tmx_map.map_width
+            amap.map_height = tmx_map.map_height
+            amap.tile_width = tmx_map.tile_width
+            amap.tile_height = tmx_map.tile_height
+            amap.tilesets = tmx_map.tileset_sources
+            amap.layers = tmx_map.layers
+            amap.animations = tmx_map.animations
+            amap.tile_properties = tmx_map.tile_properties
+
+        if hittables_source is not None:
+            amap.hittables = MapCompiler.merge_rects(HittablesLoader.read(source = hittables_source, compiled = False))
+
+        dests: list[str] = []
+        for source in map_sources:
+            dest: str = AmapFile.get_path(source)
+            if dest in dests:
+                continue
+
+            print(f"Compiling map {dest}")
+            amap.write(os.path.join(pyglet.resource.path[0], dest))
+            dests.append(dest)
+
+        return dests
+
+    @staticmethod
+    def merge_rects(
+        rects: list[tuple[int, int, int, int, bool, list[str]]]
+    ) -> list[tuple[int, int, int, int, bool, list[str]]]:
+        """
+        Merges adjacent [rects] sharing the same sensor flag and tags, first along rows and then along columns.
+        Each rect is described as a (x, y, width, height, sensor, tags) tuple, as returned by [HittablesLoader.read].
+        """
+
+        # Group rects by sensor flag and tags.
+        groups: dict[tuple[bool, tuple[str, ...]], list[list[int]]] = {}
+        for (x, y, width, height, sensor, tags) in rects:
+            groups.setdefault((sensor, tuple(tags)), []).append([x, y, width, height])
+
+        result: list[tuple[int, int, int, int, bool, list[str]]] = []
+        for (sensor, tags), group in groups.items():
+            # Merge horizontally: same row and height, touching edges.
+            group.sort(key = lambda rect: (rect[1], rect[3], rect[0]))
+            merged: list[list[int]] = []
+            for rect in group:
+                last: list[int] | None = merged[-1] if len(merged) > 0 else None
+                if last is not None and last[1] == rect[1] and last[3] == rect[3] and last[0] + last[2] == rect[0]:
+                    last[2] += rect[2]
+                else:
+                    merged.append(rect)
+
+            # Merge vertically: same column and width, touching edges.
+            merged.sort(key = lambda rect: (rect[0], rect[2], rect[1]))
+            group = []
+            for rect in merged:
+                last = group[-1] if len(group) > 0 else None
+                if last is not None and last[0] == rect[0] and last[2] == rect[2] and last[1] + last[3] == rect[1]:
+                    last[3] += rect[3]
+                else:
+                    group.append(rect)
+
+            result.extend((x, y, width, height, sensor, list(tags)) for (x, y, width, height) in group)
+
+        return result
\ No newline at end of file
@@ -0,0 +1,278 @@
+import base64
+import gzip
+import os
+from typing import Any
+import xml.etree.ElementTree as xml
+import zlib
+import numpy as np
+import pyglet
+
+from amonite.tracer import TRACER
+from amonite.utils.amap_file import AmapFile
+
+# Bits used by TMX global tile ids to store flip (and rotation) flags.
+GID_FLAGS_MASK: int = 0xF0000000
+
+class TmxMap:
+    """
+    Parsed content of a TMX file, holds no graphics resource so it can be produced off the main thread.
+    """
+
+    __slots__ = (
+        "map_width",
+        "map_height",
+        "tile_width",
+        "tile_height",
+        "tileset_sources",
+        "layers",
+        "animations",
+        "tile_properties",
+        "infinite",
+        "chunks"
+    )
+
+    def __init__(
+        self,
+        map_width: int,
+        map_height: int,
+        tile_width: int,
+        tile_height: int,
+        tileset_sources: list[str],
+        layers: list[tuple[str, np.ndarray]],
+        animations: dict[int, list[tuple[int, float]]] | None = None,
+        tile_properties: dict[int, dict[str, Any]] | None = None,
+        infinite: bool = False,
+        chunks: list[tuple[str, dict[tuple[int, int], np.ndarray]]] | None = None
+    ) -> None:
+        self.map_width: int = map_width
+        self.map_height: int = map_height
+        self.tile_width: int = tile_width
+        self.tile_height: int = tile_height
+
+        # Paths to all tileset images (starting from the defined assets directory).
+        self.tileset_sources: list[str] = tileset_sources
+
+        # All layers as (name, tile indices) tuples, where -1 marks an empty tile.
+        self.layers: list[tuple[str, np.ndarray]] = layers
+
+        # Animated tiles as tile index -> [(frame tile index, frame duration (s))].
+        self.animations: dict[int, list[tuple[int, float]]] = animations if animations is not None else {}
+
+        # Custom tile properties as tile index -> {name: value}.
+        self.tile_properties: dict[int, dict[str, Any]] = tile_properties if tile_properties is not None else {}
+
+        # Infinite maps have no layers, but chunks instead:
+        # for each layer, (name, tile indices by chunk position (column, row) of the top left tile) tuples.
+        self.infinite: bool = infinite
+        self.chunks: list[tuple[str, dict[tuple[int, int], np.ndarray]]] = chunks if chunks is not None else []
+
+class TmxLoader:
+    @staticmethod
+    def fetch(
+        source: str,
+        tilesets_path: str | None = None,
+        compiled: bool = True
+    ) -> TmxMap:
+        """
+        Reads and returns the map content from the TMX file provided in [source].
+        If [compiled] is True, then an up-to-date compiled map (see [MapCompiler]) is used in place of the TMX file when present.
+        """
+
+        with TRACER.span("TmxLoader.fetch", "loader"):
+            tilesets_dir: str = tilesets_path if tilesets_path is not None else "tilesets/rughai/"
+
+            amap: AmapFile | None = AmapFile.fetch(source) if compiled else None
+            if amap is not None and amap.layers is not None:
+                return TmxMap(
+                    map_width = amap.map_width,
+                    map_height = amap.map_height,
+                    tile_width = amap.tile_width,
+                    tile_height = amap.tile_height,
+                    tileset_sources = [f"{tilesets_dir}{tileset}" for tileset in amap.tilesets or []],
+                    layers = amap.layers,
+                    animations = amap.animations,
+                    tile_properties = amap.tile_properties
+                )
+
+            abs_path: str = f"{pyglet.resource.path[0]}/{source}"
+            root: xml.Element = xml.parse(abs_path).getroot()
+
+            tilemap_tilesets: list[xml.Element] = root.findall("tileset")
+
+            infinite: bool = root.attrib.get("infinite", "0") == "1"
+
+            layers: list[tuple[str, np.ndarray]] = []
+            chunks: list[tuple[str, dict[tuple[int, int], np.ndarray]]] = []
+            for layer in root.findall("layer"):
+                # Check layer name in order to know whether to z-sort tiles or not.
+                layer_name: str = layer.attrib["name"]
+
+                layer_data: xml.Element | None = layer.find("data")
+
+                if layer_data is None:
+                    # The provided file does not contain valid information.
+                    raise ValueError("TMX layer data not found")
+
+                if infinite:
+                    chunks.append((layer_name, TmxLoader.decode_chunks(layer_data)))
+                else:
+                    layers.append((layer_name, TmxLoader.decode(layer_data)))
+
+            animations: dict[int, list[tuple[int, float]]]
+            tile_properties: dict[int, dict[str, Any]]
+            (animations, tile_properties) = TmxLoader.read_tiles(
+                tilesets = tilemap_tilesets,
+                base_path = os.path.dirname(abs_path)
+            )
+
+            return TmxMap(
+                map_width = int(root.attrib["width"]),
+                map_height = int(root.attrib["height"]),
+                tile_width = int(root.attrib["tilewidth"]),
+                tile_height = int(root.attrib["tileheight"]),
+                tileset_sources = [f"{tilesets_dir}{ts.attrib['source'].split('/')[-1].split('.')[0]}.png" for ts in tilemap_tilesets],
+                layers = layers,
+                animations = animations,
+                tile_properties = tile_properties,
+                infinite = infinite,
+                chunks = chunks
+            )
+
+    @staticmethod
+    def get_external_tilesets(source: str) -> list[str]:
+        """
+        Returns the paths (starting from the defined assets directory) of all external TSX files
+        referenced by the TMX file provided in [source], so that changes to them can be tracked.
+        """
+
+        root: xml.Element = xml.parse(f"{pyglet.resource.path[0]}/{source}").getroot()
+
+        return [
+            os.path.normpath(os.path.join(os.path.dirname(source), tileset.attrib["source"])).replace(os.sep, "/")
+            for tileset in root.findall("tileset") if "source" in tileset.attrib
+        ]
+
+    @staticmethod
+    def read_tiles(
+        tilesets: list[xml.Element],
+        base_path: str
+    ) -> tuple[dict[int, list[tuple[int, float]]], dict[int, dict[str, Any]]]:
+        """
+        Reads all tile animations and custom tile properties defined in the provided TMX [tilesets],
+        either embedded or in external TSX files (relative to [base_path]).
+        Returns animations as tile index -> [(frame tile index, frame duration (s))]
+        and properties as tile index -> {name: value}.
+        """
+
+        animations: dict[int, list[tuple[int, float]]] = {}
+        tile_properties: dict[int, dict[str, Any]] = {}
+
+        for tileset in tilesets:
+            # Tile IDs are local to their tileset.
+            first_index: int = int(tileset.attrib.get("firstgid", 1)) - 1
+
+            tileset_root: xml.Element = tileset
+            if "source" in tileset.attrib:
+                tsx_path: str = os.path.join(base_path, tileset.attrib["source"])
+
+                # Skip tilesets whose definition is not available.
+                if not os.path.exists(tsx_path):
+                    continue
+
+                tileset_root = xml.parse(tsx_path).getroot()
+
+            for tile in tileset_root.findall("tile"):
+                tile_index: int = first_index + int(tile.attrib["id"])
+
+                properties: list[xml.Element] = tile.findall("properties/property")
+                if len(properties) > 0:
+                    tile_properties[tile_index] = {
+                        prop.attrib["name"]: TmxLoader.read_property(prop) for prop in properties
+                    }
+
+                animation: xml.Element | None = tile.find("animation")
+                if animation is not None:
+                    animations[tile_index] = [
+                        (first_index + int(frame.attrib["tileid"]), int(frame.attrib["duration"]) / 1000)
+                        for frame in animation.findall("frame")
+                    ]
+
+        return (animations, tile_properties)
+
+    @staticmethod
+    def read_property(prop: xml.Element) -> Any:
+        """
+        Returns the value of the provided TMX property element, converted according to its type.
+        """
+
+        # Multiline string values are stored as text.
+        value: str = prop.attrib["value"] if "value" in prop.attrib else (prop.text or "")
+        value_type: str = prop.attrib.get("type", "string")
+
+        if value_type == "bool":
+            return value == "true"
+        if value_type == "int":
+            return int(value)
+        if value_type == "float":
+            return float(value)
+
+        return value
+
+    @staticmethod
+    def decode_chunks(data: xml.Element) -> dict[tuple[int, int], np.ndarray]:
+        """
+        Decodes all chunks in the provided TMX layer [data] element (infinite maps only).
+        Returns (height, width) arrays of tile indices by chunk position (column, row) of their top left tile.
+        """
+
+        return {
+            (int(chunk.attrib["x"]), int(chunk.attrib["y"])): TmxLoader.decode(
+                data = chunk,
+                encoding = data.attrib.get("encoding"),
+                compression = data.attrib.get("compression")
+            ).reshape((int(chunk.attrib["height"]), int(chunk.attrib["width"])))
+            for chunk in data.findall("chunk")
+        }
+
+    @staticmethod
+    def decode(
+        data: xml.Element,
+        encoding: str | None = None,
+        compression: str | None = None
+    ) -> np.ndarray:
+        """
+        Decodes the provided TMX layer [data] (or chunk) element into an array of tile indices, where -1 marks an empty tile.
+        CSV, base64, base64+zlib and base64+gzip encodings are supported, as well as plain XML tiles.
+        [encoding] and [compression] are read from [data] if not provided.
+        Flip flags are masked out of all global tile ids.
+        """
+
+        encoding = encoding if encoding is not None else data.attrib.get("encoding")
+        compression = compression if compression is not None else data.attrib.get("compression")
+
+        gids: np.ndarray
+        if encoding is None:
+            # Plain XML, one tile element per tile.
+            gids = np.array([int(tile.attrib.get("gid", 0)) for tile in data.findall("tile")], dtype = np.uint32)
+        elif data.text is None:
+            raise ValueError("TMX layer data not found")
+        elif encoding == "csv":
+            # Whitespace (newlines included) around separators is ignored.
+            gids = np.fromstring(data.text, dtype = np.uint32, sep = ",")
+        elif encoding == "base64":
+            raw: bytes = base64.b64decode(data.text.strip())
+
+            if compression == "zlib":
+                raw = zlib.decompress(raw)
+            elif compression == "gzip":
+                raw = gzip.decompress(raw)
+            elif compression is not None:
+                raise ValueError(f"Unsupported TMX layer compression: {compression}")
+
+            # Global tile ids are stored as little-endian unsigned 32-bit integers.
+            gids = np.frombuffer(raw, dtype = "<u4")
+        else:
+            raise ValueError(f"Unsupported TMX layer encoding: {encoding}")
+
+        # Remove flip flags and shift to 0-based indices, so that empty tiles (gid 0) become -1.
+        return (gids & ~np.uint32(GID_FLAGS_MASK)).astype(np.int32) - 1
\ No newline at end of file
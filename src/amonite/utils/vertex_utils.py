@@ -0,0 +1,40 @@
+import ctypes
+import numpy as np
+
+def write_attribute(
+    vertex_list,
+    name: str,
+    data: np.ndarray,
+    count: int | None = None
+) -> None:
+    """
+    Copies [data] straight into attribute [name] of [vertex_list], starting at its first vertex.
+    [count] is the amount of vertices written, all vertices in [vertex_list] by default.
+    [data] must be C-contiguous and match the attribute's type (e.g. float32 for "f", uint8 for "Bn").
+    """
+
+    vertices_count: int = count if count is not None else vertex_list.count
+    buffer = vertex_list.domain.attrib_name_buffers[name]
+
+    region = buffer.get_region(vertex_list.start, vertices_count)
+    ctypes.memmove(region, data.ctypes.data, min(ctypes.sizeof(region), data.nbytes))
+    buffer.invalidate_region(vertex_list.start, vertices_count)
+
+def map_attribute(
+    vertex_list,
+    name: str,
+    count: int | None = None
+) -> np.ndarray:
+    """
+    Returns a writable (vertices, components) array viewing the first [count] vertices of attribute [name] of [vertex_list]
+    (all vertices by default), marking them as changed.
+    The view is only valid until the vertex list (or its domain) is resized, so it should be written straight away and dropped.
+    """
+
+    vertices_count: int = count if count is not None else vertex_list.count
+    buffer = vertex_list.domain.attrib_name_buffers[name]
+
+    view: np.ndarray = np.ctypeslib.as_array(buffer.get_region(vertex_list.start, vertices_count))
+    buffer.invalidate_region(vertex_list.start, vertices_count)
+
+    return view.reshape((vertices_count, buffer.count))
\ No newline at end of file